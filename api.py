@@ -1,9 +1,16 @@
 from flask import Flask, request, jsonify
 from threading import Thread
-import queue
-
-# URL 큐
-url_queue = queue.Queue()
+from core.ingest_queue import enqueue_url, get_queue_depth
+from core.url_canonical import canonicalize_url
+from core.url_index import is_known_url
+from core.pipeline import get_pipeline_metrics
+from core.decision_cache import get_decision_cache_stats, set_decision_override
+from core.gate_model import get_gate_model_stats
+from core.llm_cache import get_llm_cache_stats
+from core.llm_client import get_llm_client_stats
+from core.http_cache import get_http_cache_stats
+from core.extraction_pool import get_extraction_pool_stats
+from core.embedding_cache import get_embedding_cache_stats
 
 flask_app = Flask(__name__)
 
@@ -11,8 +18,54 @@ flask_app = Flask(__name__)
 def add_url():
     """브라우저 확장에서 URL 받기"""
     data = request.json
-    url_queue.put(data)
-    return jsonify({"status": "received"})
+    if not data or not isinstance(data.get('url'), str) or not data['url']:
+        return jsonify({"status": "invalid"}), 400
+
+    # 이미 저장된 글이면 큐에 넣지 않음 (utm, #fragment, www./m. 차이 무시)
+    # 포트 범위 초과, 닫히지 않은 IPv6 주소 등은 ValueError
+    try:
+        data['canonical_url'] = canonicalize_url(data['url'])
+    except ValueError:
+        return jsonify({"status": "invalid"}), 400
+    if is_known_url(data['canonical_url']):
+        return jsonify({"status": "exists"})
+
+    # 영구 큐에 저장 (가득 차면 429)
+    job_id = enqueue_url(data)
+    if job_id is None:
+        return jsonify({"status": "queue_full"}), 429
+
+    return jsonify({"status": "received", "job_id": job_id})
+
+@flask_app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """수집 큐/파이프라인 단계별 메트릭 (병목 확인용)"""
+    return jsonify({
+        "queue_depth": get_queue_depth(),
+        "pipeline": get_pipeline_metrics(),
+        "decision_cache": get_decision_cache_stats(),
+        "gate_model": get_gate_model_stats(),
+        "llm_cache": get_llm_cache_stats(),
+        "llm_clients": get_llm_client_stats(),
+        "http_cache": get_http_cache_stats(),
+        "extraction_pool": get_extraction_pool_stats(),
+        "embedding_cache": get_embedding_cache_stats()
+    })
+
+@flask_app.route('/api/decision-override', methods=['POST'])
+def decision_override():
+    """도메인/경로 패턴의 저장 여부 수동 지정 {'pattern': 'velog.io', 'should_save': true/false/null}"""
+    data = request.json
+    if not data or not isinstance(data.get('pattern'), str) or not data['pattern']:
+        return jsonify({"status": "invalid"}), 400
+
+    # "true"/"false" 문자열이나 0/1은 받지 않음 (JSON true/false/null만)
+    should_save = data.get('should_save')
+    if should_save is not None and not isinstance(should_save, bool):
+        return jsonify({"status": "invalid"}), 400
+
+    set_decision_override(data['pattern'], should_save)
+    return jsonify({"status": "ok"})
 
 def run_flask():
     flask_app.run(host='127.0.0.1', port=8502, debug=False, use_reloader=False)
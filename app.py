@@ -1,16 +1,22 @@
 # uv run streamlit run app.py로 로컬 실행 
 import streamlit as st
+import atexit
 from datetime import datetime
-from threading import Thread
 from apscheduler.schedulers.background import BackgroundScheduler
 from streamlit_autorefresh import st_autorefresh
-from api import start_api, url_queue
+from api import start_api
 from utils.logging import logger
 from utils.ui import load_css, render_card, render_briefing_block
 from core.url_collector import should_save_url, process_url_auto
-from core.vector_store import init_vectorstore 
+from core.vector_store import init_vectorstore, ensure_activity_vector
+from core.ingest_worker import IngestConsumer
+from core.url_index import warm_url_index, is_known_url
+from core.gate_model import warm_gate_model
+from core.pipeline import IngestPipeline
+from config.settings import PIPELINE_ENABLED, PIPELINE_MAX_IN_FLIGHT, DIGEST_LOOKBACK_DAYS
+from core.briefing import generate_briefing, refresh_daily_digests
 from core.storage import init_db, get_activity_metrics, get_activities, get_categories, get_briefings, get_tags
-from core.agent import create_agent_graph, run_agent, set_agent_resource
+from core.agent import create_agent_graph, run_agent_stream, set_agent_resource
 
 EXTERNAL_LOGO_URL = "https://res.cloudinary.com/dofrfwdqh/image/upload/v1763444959/stacknote_logo.png"
 
@@ -39,6 +45,12 @@ def initialize_resources():
     # DB 초기화
     init_db()
 
+    # 저장된 URL 인덱스 (LLM 판단 전 중복 제거)
+    warm_url_index()
+
+    # 저장 판단 로컬 모델 학습 (확신이 높으면 LLM 생략)
+    warm_gate_model()
+
     # Vectorstore 초기화
     vectorstore = init_vectorstore()
     
@@ -255,7 +267,7 @@ def render_feed_tab():
     else:
         st.info("💡 조건에 맞는 활동이 없습니다.")
 
-def render_briefing_tab(agent_graph):
+def render_briefing_tab():
     """Briefing 탭 렌더링"""
     # 브리핑 로드
     briefings = get_briefings_cached(limit=5)
@@ -297,10 +309,8 @@ def render_briefing_tab(agent_graph):
     if generate_button:
         with st.spinner(f"최근 {briefing_days}일 분석 중..."):
             try:
-                run_agent(
-                    f"최근 {briefing_days}일간의 활동을 분석하여 브리핑을 생성해줘.",
-                    agent_graph
-                )
+                # 같은 기간/활동으로 만든 브리핑이 있으면 바로 재사용
+                generate_briefing(days=briefing_days)
                 
                 get_briefings_cached.clear()
                 st.rerun()
@@ -337,132 +347,147 @@ def render_chat_tab(agent_graph, user_query):
             'content': user_query
         })
 
-        # Agent 호출
+        # Agent 호출 (도구 진행 상황과 답변 토큰을 생기는 대로 표시)
         with st.chat_message("assistant"):
-            with st.spinner("요청하신 내용을 분석 중입니다..."):
-                try:
-                    result = run_agent(
-                        user_query, 
-                        agent_graph,
-                        st.session_state.conversation_state
-                    )
-
-                    response = result["response"]
-                    st.session_state.conversation_state = result['state']
-
-                    # 응답 표시 및 저장
-                    st.write(response)
-                    st.session_state.chat_history.append({
-                        'role': 'assistant',
-                        'content': response
-                    })
+            status = st.status("요청하신 내용을 분석 중입니다...", expanded=False)
+            placeholder = st.empty()
+            response = ""
 
-                    # 브리핑 생성 시 캐시 무효화
-                    if any(kw in user_query for kw in ['브리핑', '요약', '분석']):
-                        st.cache_data.clear()
+            try:
+                for event in run_agent_stream(
+                    user_query,
+                    agent_graph,
+                    st.session_state.conversation_state
+                ):
+                    if event['type'] == 'tool_start':
+                        status.update(label=f"🔧 {event['name']} 실행 중...")
+                        status.write(f"🔧 {event['name']} {event['args']}")
+                        # 도구 호출 전에 나온 텍스트는 중간 응답이므로 지움
+                        response = ""
+                        placeholder.empty()
+
+                    elif event['type'] == 'tool_end':
+                        status.write(f"✅ {event['name']} 완료")
+
+                    elif event['type'] == 'token':
+                        response += event['content']
+                        placeholder.markdown(response + "▌")
+
+                    elif event['type'] == 'done':
+                        response = event['response']
+                        st.session_state.conversation_state = event['state']
+
+                # 응답 표시 및 저장
+                placeholder.markdown(response)
+                status.update(label="분석 완료", state="complete")
+                st.session_state.chat_history.append({
+                    'role': 'assistant',
+                    'content': response
+                })
+
+                # 브리핑 생성 시 캐시 무효화
+                if any(kw in user_query for kw in ['브리핑', '요약', '분석']):
+                    st.cache_data.clear()
 
-                except Exception as e:
-                    error_msg = f"오류가 발생했습니다.: {str(e)}"
-                    st.error(error_msg)
-                    logger.error(f"Agent 실행 오류: {e}")
+            except Exception as e:
+                error_msg = f"오류가 발생했습니다.: {str(e)}"
+                status.update(label="오류", state="error")
+                st.error(error_msg)
+                logger.error(f"Agent 실행 오류: {e}")
 
     
 
 # ============================================================================
 # 5. BACKGROUND TASKS
 
-def process_url_queue(vectorstore_instance):
+def process_url_job(url_data, vectorstore_instance):
     """
-    큐에 쌓인 URL들을 처리
+    큐에서 꺼낸 URL 하나를 처리 (워커 스레드에서 실행)
     
     Args:
+        url_data: {'url', 'title', ...} 확장에서 받은 데이터
         vectorstore: 초기화된 vectorstore 인스턴스
         
     Returns:
-        list: 처리된 URL 정보 리스트
+        dict: 처리된 URL 정보, 저장하지 않았으면 None
     """
-    new_items= []
-
-    if url_queue.empty():
-        return new_items # 큐가 비어있으면 즉시 리턴
+    logger.info(f"처리 중: {url_data['url']}")
 
-    logger.info("큐에 데이터 있음! 소비 시작.")
+    # 0. 이미 저장된 URL이면 LLM 호출 없이 종료 (임베딩에 실패했던 URL이면 벡터만 다시 저장)
+    if is_known_url(url_data['url']):
+        if not ensure_activity_vector(vectorstore_instance, url_data['url']):
+            raise RuntimeError(f"벡터 db 저장 실패: {url_data['url']}")
+        logger.info(f"[SKIP] DB에 이미 존재 : {url_data['url']}")
+        return None
 
-    while not url_queue.empty():
-        url_data = url_queue.get()
-        logger.info(f"처리 중: {url_data['url']}")
+    # 1. 저장 여부 판단 (LLM)
+    decision = should_save_url(url_data['url'], url_data.get('title', ''))
 
-        try:
-            # 1. 저장 여부 판단 (LLM)
-            decision = should_save_url(url_data['url'], url_data['title'])
+    if not decision['should_save']:
+        logger.info(f"저장 건너뜀: {decision['reason']}")
+        return None
 
-            if decision['should_save']:
-                # 2. 콘텐츠 추출 및 저장
-                result = process_url_auto(url_data['url'], vectorstore_instance)
-                if result:
-                    new_items.append(result)
-                    logger.info(f"저장 완료: {result['title']}")
-            else:
-                logger.info(f"저장 건너뜀: {decision['reason']}")
+    # 2. 콘텐츠 추출 및 저장
+    result = process_url_auto(url_data['url'], vectorstore_instance)
+    if result:
+        logger.info(f"저장 완료: {result['title']}")
+    return result
 
-        except Exception as e:
-            logger.error(f"URL 처리 중 오류: {e}", exc_info=True)
-        finally:
-            url_queue.task_done() # 큐 항목 처리 완료를 알림
-
-    return new_items
-
-def start_queue_consumer(vectorstore_instance):
+@st.cache_resource
+def start_queue_consumer(_vectorstore_instance):
     """
-    백그라운드 스레드에서 큐를 주기적으로 확인
+    큐 소비자 시작 (프로세스당 한 번)
+    새 URL이 들어오면 바로 깨어나 단계별 파이프라인(PIPELINE_ENABLED) 또는
+    INGEST_WORKERS개의 워커로 병렬 처리
     
     Args:
-        vectorstore: 초기화된 vectorstore 인스턴스
+        _vectorstore_instance: 초기화된 vectorstore 인스턴스 (해시 제외)
     """
-    from time import sleep
-    logger.info("=== 큐 소비자 스레드 시작 ===")
-    
-    while True:
-        try:
-            # 큐에서 새로운 항목을 처리
-            new_items = process_url_queue(vectorstore_instance)
-            
-            if new_items:
-                logger.info(f"성공: {len(new_items)}개의 URL이 큐에서 처리됨.")
-                # 참고: Streamlit UI는 직접 업데이트 불가, DB를 확인해야 함
+    if PIPELINE_ENABLED:
+        pipeline = IngestPipeline(_vectorstore_instance)
+        pipeline.start()
+        atexit.register(pipeline.stop)  # atexit은 역순 실행 → 소비자 먼저 멈춘 뒤 파이프라인 비움
 
-        except Exception as e:
-            logger.error(f"큐 소비자 오류: {e}", exc_info=True)
-            
-        sleep(10) # 5초마다 큐 확인
+        consumer = IngestConsumer(pipeline=pipeline, workers=PIPELINE_MAX_IN_FLIGHT)
+    else:
+        consumer = IngestConsumer(
+            handler=lambda url_data: process_url_job(url_data, _vectorstore_instance)
+        )
+    consumer.start()
+
+    # 종료 시 진행 중인 작업을 마무리
+    atexit.register(consumer.stop, 30)
+    return consumer
 
-def generate_briefing_job(agent_graph):
+def generate_briefing_job():
     """
     일일 브리핑 자동 생성 (APScheduler Job)
-    
-    Args:
-        agent_graph
+    Agent를 거치지 않고 일별 요약으로 바로 생성
     """
     try:
         logger.info(f"자동 브리핑 생성: {datetime.now()}")
 
-        result = run_agent(
-            "어제까지의 활동을 분석하여 일일 브리핑을 생성해줘.",
-            agent_graph
-        )
+        briefing_text = generate_briefing(days=1)
 
-        logger.info(f"브리핑 완료: {result['response'][:100]}...")
+        logger.info(f"브리핑 완료: {briefing_text[:100]}...")
 
     except Exception as e:
         logger.error(f"브리핑 생성 오류: {e}", exc_info=True)
 
-def initialize_scheduler(agent_graph):
+def refresh_digests_job():
     """
-    APScheduler 초기화 및 Job 등록
-    
-    Args:
-        agent_graph
+    일별 요약 갱신 (APScheduler Job, 자정 직후)
+    어제 요약을 확정하고, 그 사이 활동이 바뀐 날짜만 다시 요약
     """
+    try:
+        digests = refresh_daily_digests(days=DIGEST_LOOKBACK_DAYS)
+        logger.info(f"일별 요약 확인 완료: {len(digests)}일")
+
+    except Exception as e:
+        logger.error(f"일별 요약 갱신 오류: {e}", exc_info=True)
+
+def initialize_scheduler():
+    """APScheduler 초기화 및 Job 등록"""
 
     if 'scheduler_started' in st.session_state:
         return  st.session_state.scheduler  # 기존 scheduler 반환
@@ -474,10 +499,17 @@ def initialize_scheduler(agent_graph):
         'cron',
         hour=10,
         minute=0,
-        args=[agent_graph],
         id='daily_briefing'
     )
 
+    scheduler.add_job(
+        refresh_digests_job,
+        'cron',
+        hour=0,
+        minute=5,
+        id='daily_digests'
+    )
+
     scheduler.start()
     st.session_state['scheduler_started'] = True
     st.session_state['scheduler'] = scheduler
@@ -512,7 +544,7 @@ def main():
         render_feed_tab()
     
     with tab2:
-        render_briefing_tab(agent_graph)
+        render_briefing_tab()
 
     with tab3:
         render_chat_tab(agent_graph, user_query)
@@ -523,15 +555,11 @@ def main():
         # API 서버
         start_api()
         
-        # URL 큐 소비자 스레드
-        Thread(
-            target=start_queue_consumer,
-            args=(vectorstore,),
-            daemon=True
-        ).start()
+        # URL 큐 소비자 (워커 풀)
+        start_queue_consumer(vectorstore)
         
         # 브리핑 스케줄러
-        initialize_scheduler(agent_graph)
+        initialize_scheduler()
         
         st.session_state['background_started'] = True
         logger.info("=== 백그라운드 작업 시작 완료 ===")
@@ -0,0 +1,115 @@
+"""
+추출 단계 CPU 시간 마이크로 벤치마크
+
+이전 방식 (extract + extract_metadata, HTML을 두 번 파싱)과
+현재 parse_html (bare_extraction, 한 번 파싱)의 페이지당 CPU 시간 비교
+
+사용법 (프로젝트 루트에서):
+    python benchmarks/bench_extraction.py                 # HTTP 캐시(http_cache.db)에 저장된 페이지
+    python benchmarks/bench_extraction.py ./html_corpus   # 디렉터리의 *.html / *.htm 파일
+    python benchmarks/bench_extraction.py ./html_corpus --repeat 5 --limit 200
+"""
+import argparse
+import gc
+import logging
+import sqlite3
+import statistics
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from trafilatura import extract, extract_metadata  # noqa: E402
+from config.settings import HTTP_CACHE_PATH  # noqa: E402
+from utils import logger  # noqa: E402
+from core.extractor import parse_html  # noqa: E402
+from core.near_duplicate import compute_simhash  # noqa: E402
+
+def load_corpus(path: str, limit: int) -> List[Tuple[str, str]]:
+    """(url, html) 목록: 디렉터리면 파일, 없으면 HTTP 캐시"""
+    pages = []
+    if path:
+        for file in sorted(Path(path).iterdir()):
+            if file.suffix.lower() in (".html", ".htm"):
+                pages.append((f"https://example.com/{file.stem}", file.read_text(encoding="utf-8", errors="replace")))
+    elif Path(HTTP_CACHE_PATH).exists():
+        conn = sqlite3.connect(HTTP_CACHE_PATH)
+        for url, body in conn.execute("SELECT url, body FROM http_cache"):
+            pages.append((url, zlib.decompress(body).decode("utf-8")))
+        conn.close()
+
+    return pages[:limit] if limit else pages
+
+def legacy_extract(url: str, html: str):
+    """이전 parse_html: 본문과 메타데이터를 따로 추출 (파싱 2번)"""
+    content = extract(html, include_comments=False, include_tables=True, no_fallback=False)
+    metadata = extract_metadata(html)
+    compute_simhash(content)
+    return (metadata.title if metadata else None), content
+
+def single_pass_extract(url: str, html: str):
+    result = parse_html(url, html)
+    return (result["title"], result["content"]) if result else (None, None)
+
+def measure(fns, pages, repeat: int) -> List[Tuple[List[float], list]]:
+    """
+    함수별 페이지당 CPU 시간(ms, repeat번 중 최솟값)과 결과
+    같은 페이지에서 함수들을 번갈아 실행 (순서/부하 변화가 한쪽에만 몰리지 않도록)
+    """
+    results = [([], []) for _ in fns]
+    for url, html in pages:
+        best = [float("inf")] * len(fns)
+        outputs = [None] * len(fns)
+        for _ in range(repeat):
+            for i, fn in enumerate(fns):
+                gc.collect()
+                started = time.process_time()
+                outputs[i] = fn(url, html)
+                best[i] = min(best[i], time.process_time() - started)
+
+        for i in range(len(fns)):
+            results[i][0].append(best[i] * 1000)
+            results[i][1].append(outputs[i])
+    return results
+
+def summarize(name: str, timings: List[float]):
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f"{name}: 평균 {statistics.mean(timings):.2f}ms  중앙값 {statistics.median(timings):.2f}ms  "
+        f"p95 {p95:.2f}ms  합계 {sum(timings):.0f}ms"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="추출 CPU 시간 비교 (2번 파싱 vs 1번 파싱)")
+    parser.add_argument("corpus", nargs="?", help="HTML 파일 디렉터리 (없으면 HTTP 캐시 사용)")
+    parser.add_argument("--repeat", type=int, default=3, help="페이지당 반복 횟수 (최솟값 사용)")
+    parser.add_argument("--limit", type=int, default=0, help="최대 페이지 수 (0이면 전체)")
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+    logging.getLogger("trafilatura").setLevel(logging.ERROR)
+    logging.getLogger("htmldate").setLevel(logging.ERROR)
+
+    pages = load_corpus(args.corpus, args.limit)
+    if not pages:
+        print("HTML이 없습니다. 디렉터리를 지정하거나 먼저 페이지를 수집하세요.")
+        return
+
+    print(f"페이지 {len(pages)}개, 반복 {args.repeat}회\n")
+
+    (before, before_out), (after, after_out) = measure((legacy_extract, single_pass_extract), pages, args.repeat)
+    summarize("before (extract + extract_metadata)", before)
+    summarize("after  (bare_extraction)           ", after)
+
+    same_title = sum(1 for b, a in zip(before_out, after_out) if b[0] == a[0])
+    same_content = sum(1 for b, a in zip(before_out, after_out) if b[1] == a[1])
+
+    print(f"\n속도: {sum(before) / sum(after):.2f}배")
+    print(f"제목 일치 {same_title}/{len(pages)}, 본문 일치 {same_content}/{len(pages)}")
+
+if __name__ == "__main__":
+    main()
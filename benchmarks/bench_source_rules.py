@@ -0,0 +1,128 @@
+"""
+소스 유형 분류 벤치마크 (방문 기록 대량 가져오기 기준)
+
+이전 detect_source_type (호출마다 리스트 생성 + 부분 문자열 검색)과
+규칙 엔진 (접미사 트라이 + 합친 경로 정규식, core/source_rules.py)의 처리량 비교
+
+사용법 (프로젝트 루트에서):
+    python benchmarks/bench_source_rules.py               # 합성 URL 1,000,000개
+    python benchmarks/bench_source_rules.py --count 200000
+"""
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core.source_rules import classify_url, classify_urls, get_source_rules  # noqa: E402
+
+def legacy_detect_source_type(url: str) -> str:
+    """이전 구현 (비교용 사본)"""
+    url_lower = url.lower()
+    domain = urlparse(url).netloc.lower()
+
+    VIDEO_DOMAINS = [
+        "youtube.com", "youtu.be", "vimeo.com", "navertv.", "dailymotion.com",
+        "twitch.tv", "kakao.tv", "afreecatv.com", "ted.com/talks",
+        "bilibili.com", "inflearn.com", "fastcampus.co"
+    ]
+    if any(d in domain for d in VIDEO_DOMAINS) or "/video/" in url_lower:
+        return "video"
+
+    BLOG_DOMAINS = [
+        "tistory.com", "velog.io", "medium.com", "brunch.co.kr", "naver.com",
+        "notion.site", "substack.com", "hashnode.dev", "ghost.io",
+        "wordpress.com", "blogspot.com", "dev.to", "teletype.in",
+        "post.naver.com", "mirror.xyz"
+    ]
+    if any(d in domain for d in BLOG_DOMAINS) or "/blog/" in url_lower:
+        return "blog"
+
+    DOC_DOMAINS = [
+        "readthedocs.io", "github.io", "docsify", "developer.", "api.",
+        "python.langchain.com", "docs.", "devdocs.io", "notion.com",
+        "learn.microsoft.com", "developer.mozilla.org", "pkg.go.dev",
+        "pytorch.org", "tensorflow.org", "react.dev", "vuejs.org"
+    ]
+    if any(d in domain for d in DOC_DOMAINS) or "/docs/" in url_lower or "/guide/" in url_lower:
+        return "docs"
+
+    NEWS_DOMAINS = [
+        "news.naver.com", "bbc.com", "nytimes.com", "cnn.com",
+        "reuters.com", "bloomberg.com", "theguardian.com",
+        "ytn.co.kr", "mbc.co.kr", "sbs.co.kr", "kbs.co.kr",
+        "hani.co.kr", "chosun.com", "joongang.co.kr", "donga.com"
+    ]
+    if any(d in domain for d in NEWS_DOMAINS) or "/news/" in url_lower:
+        return "news"
+
+    FORUM_DOMAINS = [
+        "reddit.com", "stackoverflow.com", "okky.kr", "ruliweb.com",
+        "clien.net", "slack.com", "discord.com", "github.com/issues",
+        "medium.com/@", "cafe.naver.com"
+    ]
+    if any(d in domain for d in FORUM_DOMAINS) or "/questions/" in url_lower:
+        return "forum"
+
+    return "article"
+
+KNOWN_HOSTS = [
+    "www.youtube.com", "youtu.be", "blog.naver.com", "news.naver.com", "cafe.naver.com",
+    "search.naver.com", "velog.io", "medium.com", "someone.tistory.com", "docs.python.org",
+    "developer.mozilla.org", "stackoverflow.com", "www.reddit.com", "github.com",
+    "user.github.io", "api.github.com", "www.bbc.com", "www.nytimes.com", "learn.microsoft.com",
+    "fastapi.tiangolo.com", "en.wikipedia.org", "www.google.com", "okky.kr", "dev.to"
+]
+PATH_PARTS = ["posts", "2024", "article", "blog", "docs", "guide", "news", "questions", "video",
+              "issues", "tutorial", "ko", "en", "api", "reference", "watch", "p", "view"]
+
+def make_urls(count: int, seed: int = 0):
+    """실제 방문 기록처럼 자주 가는 호스트가 반복되는 합성 URL"""
+    rng = random.Random(seed)
+    random_hosts = [
+        f"{rng.choice(['www.', 'blog.', 'm.', ''])}site{i}.{rng.choice(['com', 'io', 'co.kr', 'dev', 'org'])}"
+        for i in range(5000)
+    ]
+    urls = []
+    for _ in range(count):
+        host = rng.choice(KNOWN_HOSTS) if rng.random() < 0.6 else rng.choice(random_hosts)
+        path = "/".join(rng.choice(PATH_PARTS) for _ in range(rng.randint(1, 4)))
+        query = f"?id={rng.randint(1, 10 ** 6)}" if rng.random() < 0.3 else ""
+        urls.append(f"https://{host}/{path}/{rng.randint(1, 99999)}{query}")
+    return urls
+
+def timed(label: str, fn, urls):
+    started = time.perf_counter()
+    result = fn(urls)
+    elapsed = time.perf_counter() - started
+    print(f"{label}: {elapsed:.2f}초  ({len(urls) / elapsed:,.0f} URL/초, {elapsed / len(urls) * 1e6:.2f}µs/URL)")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="소스 유형 분류 처리량 비교")
+    parser.add_argument("--count", type=int, default=1_000_000, help="URL 수")
+    args = parser.parse_args()
+
+    urls = make_urls(args.count)
+    get_source_rules()  # 컴파일은 측정에서 제외
+    print(f"URL {len(urls):,}개\n")
+
+    legacy = timed("before (detect_source_type 이전 구현)", lambda u: [legacy_detect_source_type(x) for x in u], urls)
+    single = timed("after  (classify_url 반복)          ", lambda u: [classify_url(x) for x in u], urls)
+    batch = timed("after  (classify_urls 배치)         ", classify_urls, urls)
+
+    assert single == batch
+    changed = Counter(
+        (urlparse(url).hostname, before, after)
+        for url, before, after in zip(urls, legacy, batch) if before != after
+    )
+    print(f"\n결과가 달라진 URL: {sum(changed.values()):,}개 ({sum(changed.values()) / len(urls):.1%})")
+    for (host, before, after), n in changed.most_common(10):
+        print(f"  {host}: {before} → {after} ({n:,})")
+
+if __name__ == "__main__":
+    main()
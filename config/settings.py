@@ -20,9 +20,132 @@ LOG_DIR = APP_DATA_DIR / "logs" # 로그도 데이터와 함께 옮깁니다.
 DB_PATH = DATA_DIR / "stacknote.db"
 CHROMA_PATH = DATA_DIR / "chroma"
 
+LLM_CACHE_PATH = DATA_DIR / "llm_cache.db"
+HTTP_CACHE_PATH = DATA_DIR / "http_cache.db"
+EMBED_CACHE_PATH = DATA_DIR / "embedding_cache.db"
+
+# URL 정규화 사용자 규칙 (JSON, 없으면 기본 규칙만 사용)
+URL_CANONICAL_RULES_PATH = Path(os.getenv("URL_CANONICAL_RULES_PATH", APP_DATA_DIR / "url_canonical_rules.json"))
+
+# 소스 유형 사용자 규칙 (JSON, core/source_rules.json 위에 덧붙임)
+SOURCE_RULES_PATH = Path(os.getenv("SOURCE_RULES_PATH", APP_DATA_DIR / "source_rules.json"))
+
 # Logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG")
 
+# Ingest Queue
+INGEST_QUEUE_MAX_DEPTH = int(os.getenv("INGEST_QUEUE_MAX_DEPTH", "1000"))   # 초과 시 HTTP 429
+INGEST_VISIBILITY_TIMEOUT = int(os.getenv("INGEST_VISIBILITY_TIMEOUT", "300"))  # 초, lease 만료 시 재처리
+INGEST_MAX_ATTEMPTS = int(os.getenv("INGEST_MAX_ATTEMPTS", "3"))
+INGEST_FAILED_RETENTION_DAYS = int(os.getenv("INGEST_FAILED_RETENTION_DAYS", "7"))  # 일, 실패한 작업 보관 기간
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "4"))                # 동시에 처리할 URL 수
+INGEST_PER_HOST_LIMIT = int(os.getenv("INGEST_PER_HOST_LIMIT", "2"))  # 같은 호스트 동시 처리 상한
+
+# Ingest Pipeline (gate → fetch → extract → classify → persist → embed)
+PIPELINE_ENABLED = os.getenv("PIPELINE_ENABLED", "true").lower() == "true"  # false면 워커당 직렬 처리
+PIPELINE_MAX_IN_FLIGHT = int(os.getenv("PIPELINE_MAX_IN_FLIGHT", "32"))   # 파이프라인 전체 동시 작업 수
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "16"))         # 단계 사이 큐 크기
+PIPELINE_GATE_WORKERS = int(os.getenv("PIPELINE_GATE_WORKERS", "16"))  # LLM 판단은 배치로 묶이므로 대기 스레드를 넉넉히
+PIPELINE_FETCH_WORKERS = int(os.getenv("PIPELINE_FETCH_WORKERS", "8"))
+PIPELINE_CLASSIFY_WORKERS = int(os.getenv("PIPELINE_CLASSIFY_WORKERS", "4"))
+PIPELINE_EMBED_BATCH = int(os.getenv("PIPELINE_EMBED_BATCH", "16"))
+PIPELINE_EMBED_WAIT = float(os.getenv("PIPELINE_EMBED_WAIT", "0.5"))    # 초, 배치를 모으는 최대 대기
+PIPELINE_METRICS_LOG_INTERVAL = int(os.getenv("PIPELINE_METRICS_LOG_INTERVAL", "60"))  # 초
+
+# Embedding chunks (문단/제목 경계로 나눠 청크마다 임베딩)
+EMBED_CHUNK_TOKENS = int(os.getenv("EMBED_CHUNK_TOKENS", "800"))        # 청크 하나의 최대 토큰 수 (추정치)
+EMBED_CHUNK_OVERLAP = int(os.getenv("EMBED_CHUNK_OVERLAP", "100"))      # 이전 청크 끝을 다음 청크 앞에 반복
+SEARCH_CHUNK_CANDIDATES = int(os.getenv("SEARCH_CHUNK_CANDIDATES", "4"))  # 검색 시 결과 1개당 가져올 청크 수
+EMBED_BATCH_SIZE = min(100, int(os.getenv("EMBED_BATCH_SIZE", "100")))  # 임베딩 요청 1회당 텍스트 수 (Upstage 최대 100)
+EMBED_WRITE_BATCH = int(os.getenv("EMBED_WRITE_BATCH", "32"))          # 한 번에 저장할 최대 활동 수
+EMBED_WRITE_WAIT = float(os.getenv("EMBED_WRITE_WAIT", "0.2"))         # 초, 저장할 활동을 모으는 최대 대기
+
+# 임베딩 캐시 (모델 + 텍스트 해시 → 벡터)
+EMBED_CACHE_ENABLED = os.getenv("EMBED_CACHE_ENABLED", "true").lower() == "true"
+EMBED_CACHE_MAX_MB = int(os.getenv("EMBED_CACHE_MAX_MB", "1000"))           # float32 벡터 기준
+EMBED_CACHE_EVICT_EVERY = int(os.getenv("EMBED_CACHE_EVICT_EVERY", "100"))  # 저장 N번마다 정리
+REINDEX_BATCH = int(os.getenv("REINDEX_BATCH", "100"))                      # 재구축 시 한 번에 읽을 활동 수
+
+# Near-duplicate detection (SimHash)
+NEAR_DUP_MAX_DISTANCE = int(os.getenv("NEAR_DUP_MAX_DISTANCE", "6"))  # 해밍 거리 (0~7)
+NEAR_DUP_MIN_TOKENS = int(os.getenv("NEAR_DUP_MIN_TOKENS", "50"))     # 이보다 짧은 본문은 비교 안 함
+NEAR_DUP_ACTION = os.getenv("NEAR_DUP_ACTION", "link").lower()       # link: 기존 분류 재사용해 저장 / skip: 저장 안 함
+
+# should_save_url 판단 캐시 (도메인/경로 패턴 단위)
+DECISION_CACHE_TTL_DAYS = int(os.getenv("DECISION_CACHE_TTL_DAYS", "30"))
+DECISION_CACHE_MIN_SAMPLES = int(os.getenv("DECISION_CACHE_MIN_SAMPLES", "3"))        # 최소 판단 횟수
+DECISION_CACHE_CONFIDENCE = float(os.getenv("DECISION_CACHE_CONFIDENCE", "0.9"))     # 같은 판단 비율
+
+# 저장 판단 로컬 모델 (Naive Bayes, 확신이 높을 때만 LLM 대신 판단)
+GATE_MODEL_ENABLED = os.getenv("GATE_MODEL_ENABLED", "true").lower() == "true"
+GATE_MODEL_MIN_SAMPLES = int(os.getenv("GATE_MODEL_MIN_SAMPLES", "30"))     # 클래스별 최소 학습 수
+GATE_MODEL_CONFIDENCE = float(os.getenv("GATE_MODEL_CONFIDENCE", "0.97"))
+GATE_MODEL_WARM_LIMIT = int(os.getenv("GATE_MODEL_WARM_LIMIT", "5000"))     # 시작 시 학습할 최근 행 수
+
+# 저장 판단 LLM 배치 (동시에 들어온 URL을 한 프롬프트로 판단)
+GATE_BATCH_SIZE = int(os.getenv("GATE_BATCH_SIZE", "20"))
+GATE_BATCH_WAIT = float(os.getenv("GATE_BATCH_WAIT", "0.3"))  # 초
+
+# 콘텐츠 분류 LLM 배치 (classify_contents, 여러 문서를 한 프롬프트로 분류)
+CLASSIFY_BATCH_TOKEN_BUDGET = int(os.getenv("CLASSIFY_BATCH_TOKEN_BUDGET", "8000"))  # 요청당 예상 토큰 (입력 + 응답)
+CLASSIFY_BATCH_MAX_DOCS = int(os.getenv("CLASSIFY_BATCH_MAX_DOCS", "8"))
+PIPELINE_CLASSIFY_BATCH = int(os.getenv("PIPELINE_CLASSIFY_BATCH", "8"))
+PIPELINE_CLASSIFY_WAIT = float(os.getenv("PIPELINE_CLASSIFY_WAIT", "1.0"))  # 초
+
+# LLM 응답 캐시 (모델 + 파라미터 + 프롬프트 해시 → 응답)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL_DAYS = int(os.getenv("LLM_CACHE_TTL_DAYS", "90"))      # 마지막 사용 후 보관 기간
+LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "200"))
+LLM_CACHE_EVICT_EVERY = int(os.getenv("LLM_CACHE_EVICT_EVERY", "100"))  # 저장 N번마다 정리
+
+# LLM 클라이언트 (모델별 공유 클라이언트, 속도 제한, 백오프)
+LLM_RATE_PER_MIN = float(os.getenv("LLM_RATE_PER_MIN", os.getenv("PIPELINE_LLM_RATE_PER_MIN", "60")))  # 모델별, 0이면 제한 없음
+LLM_MODEL_RATES = {                                                     # 예: "solar-mini:120,solar-pro2:30"
+    model.strip(): float(rate)
+    for model, rate in (
+        item.split(":") for item in os.getenv("LLM_MODEL_RATES", "").split(",") if ":" in item
+    )
+}
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))        # 모델별 최대 동시 호출
+LLM_LATENCY_TARGET = float(os.getenv("LLM_LATENCY_TARGET", "30"))      # 초, 넘으면 동시성 축소
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))          # 초
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "60"))             # 초
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "20"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "120"))                    # 초
+
+# 브리핑 (활동이 많으면 일별 요약을 만들어 합침)
+BRIEFING_CONTEXT_TOKENS = int(os.getenv("BRIEFING_CONTEXT_TOKENS", "12000"))  # 최종 프롬프트에 넣을 데이터 예산
+BRIEFING_CHUNK_TOKENS = int(os.getenv("BRIEFING_CHUNK_TOKENS", "6000"))      # 요약 호출 하나의 입력 예산
+BRIEFING_MAP_WORKERS = int(os.getenv("BRIEFING_MAP_WORKERS", "4"))           # 일별 요약 병렬 수
+DIGEST_TOP_TAGS = int(os.getenv("DIGEST_TOP_TAGS", "10"))                     # 일별 요약에 저장할 상위 태그 수
+DIGEST_LOOKBACK_DAYS = int(os.getenv("DIGEST_LOOKBACK_DAYS", "30"))           # 자정 작업이 확인할 기간 (브리핑 최대 기간)
+
+# 페이지 다운로드 HTTP 클라이언트 (공유 세션)
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "40"))                # 초, 소켓 읽기 한 번 기준
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))  # 초, 연결 수립
+HTTP_TOTAL_TIMEOUT = float(os.getenv("HTTP_TOTAL_TIMEOUT", "60"))      # 초, 응답 하나를 다 받기까지 (느리게 흘려보내는 서버 차단)
+HTTP_MAX_MB = float(os.getenv("HTTP_MAX_MB", "5"))                   # 본문 최대 크기 (압축 해제 후)
+HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "32"))            # 커넥션 풀을 유지할 호스트 수
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "8"))               # 호스트당 유지할 연결 수
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))                   # 연결 오류/429/5xx 재시도
+HTTP_RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", "0.5"))   # 초, 재시도마다 두 배
+HTTP_MAX_RETRY_AFTER = float(os.getenv("HTTP_MAX_RETRY_AFTER", "10"))  # 초, 429/503 Retry-After 대기 상한
+HTTP_DNS_CACHE_TTL = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))     # 초, 0이면 DNS 캐시 안 함
+HTTP_HTTP2 = os.getenv("HTTP_HTTP2", "false").lower() == "true"      # h2 패키지 필요 (uv sync --extra http2)
+
+# HTTP 응답 캐시 (원본 HTML + ETag/Last-Modified, 재처리 시 조건부 요청)
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"
+HTTP_CACHE_TTL_DAYS = int(os.getenv("HTTP_CACHE_TTL_DAYS", "30"))        # 마지막 사용 후 보관 기간
+HTTP_CACHE_MAX_MB = int(os.getenv("HTTP_CACHE_MAX_MB", "500"))           # 압축 후 크기 기준
+HTTP_CACHE_EVICT_EVERY = int(os.getenv("HTTP_CACHE_EVICT_EVERY", "100")) # 저장 N번마다 정리
+
+# 본문 추출 프로세스 풀 (trafilatura/lxml 파싱을 GIL 밖에서)
+EXTRACT_PROCESSES = int(os.getenv("EXTRACT_PROCESSES", os.getenv("PIPELINE_EXTRACT_PROCESSES", "2")))  # 0이면 호출 스레드에서 직접 파싱
+EXTRACT_MAX_TASKS_PER_CHILD = int(os.getenv("EXTRACT_MAX_TASKS_PER_CHILD", "200"))  # 워커 재시작 주기 (메모리 증가 제한)
+EXTRACT_CPU_LIMIT = int(os.getenv("EXTRACT_CPU_LIMIT", "20"))     # 초, 작업 하나의 CPU 시간 (RLIMIT_CPU, Windows 제외)
+EXTRACT_TIMEOUT = float(os.getenv("EXTRACT_TIMEOUT", "120"))      # 초, 결과 대기 상한 (대기열 시간 포함)
+
 # Development
 DEV_MODE = os.getenv("DEV_MODE", "false").lower() == "true"
 
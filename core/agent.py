@@ -1,19 +1,19 @@
-from typing import Dict, List, Optional, Any, Annotated, Sequence
+from typing import Dict, List, Optional, Any, Annotated, Sequence, Iterator
+from functools import lru_cache
 from typing_extensions import TypedDict
 from datetime import datetime, timedelta
 from langchain_core.tools import tool
 from langgraph.graph import StateGraph, END
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode
-from langchain_core.messages import HumanMessage, SystemMessage, AIMessage, BaseMessage, ToolCall
-from langchain_upstage import ChatUpstage
+from langchain_core.messages import HumanMessage, SystemMessage, AIMessage, AIMessageChunk, BaseMessage, ToolCall, ToolMessage
 from utils.logging import logger
-from config.settings import UPSTAGE_MODEL, UPSTAGE_API_KEY
+from config.settings import UPSTAGE_MODEL
 from core.vector_store import search_similar
+from core.llm_client import get_llm, invoke_llm
+from core.briefing import generate_briefing
 from core.storage import (
     get_activities, 
-    get_activities_for_briefing, 
-    save_briefing, 
     get_activity_by_id, 
     get_setting
 )
@@ -61,92 +61,8 @@ def generate_briefing_tool(days: int=7) -> str:
     최근 며칠간의 저장된 활동을 분석하여 주요 동향, 키워드, 상세 요약을 포함하는 브리핑을 생성합니다. 
     분석할 기간(days)을 숫자로 입력하세요 (예: 1, 7).
     """
-    # 데이터 조회
-    activities = get_activities_for_briefing(days=days)
-
-    period_end = datetime.now().date().isoformat()
-    period_start = (datetime.now() - timedelta(days=days)).date().isoformat()
-
-    if not activities:
-        return f"{period_start}부터 {period_end}까지의 활동 기록이 없어 브리핑을 생성할 수 없습니다."
-
-    # LLM 입력 데이터 포매팅
-    activity_summaries = "\n".join([
-        f"-[{a['created_at']}] {a['title']} (카테고리-{a['category']}) :{a['summary']}"
-        for a in activities
-    ])
-
-    # 프롬프트 구성
-    prompt = f"""
-        당신은 사용자의 지식 저장소 'Stacknote'의 전문 분석가입니다.
-        다음 활동 데이터를 분석하여 아래 지침에 따라 상세한 브리핑을 생성해주세요.
-        
-        <metadata>
-        오늘 날짜: {period_end}
-        분석 기간: 최근 {days}일 ({period_start} ~ {period_end})
-        총 활동 수: {len(activities)}개
-        </metadata>
-        
-        <raw_data>
-        {activity_summaries}
-        </raw_data>
-        
-        <analysis_guidelines>
-        다음 구조로 브리핑을 작성하세요:
-
-        # Stacknote 활동 브리핑 ({period_start} ~ {period_end})
-        ## 1. 주요 동향 요약
-        ### 📅 주간 흐름
-        - 초반/중반/후반으로 나눠 시간에 따른 관심사 변화 분석
-
-        ### 📌 핵심 테마
-        - 가장 두드러진 주제 2-3개를 강조
-        - 각 테마별 구체적인 활동 예시 포함
-
-        ## 2. 카테고리 분포
-        - 카테고리별 비율을 이모지로 시각화
-        - 예: 📊 AI (60%) > Programming (30%) > 기타 (10%)
-
-        ## 3. 핵심 키워드
-        - 가장 중요한 키워드 3-5개
-        - 각 키워드가 어떤 맥락에서 나왔는지 한 줄 설명
-
-        ## 4. 인사이트
-        - 다음 주 학습/작업 방향 제안 (2-3개)
-        - 현재 학습 흐름의 연속선상에서 제안
-        - 구체적인 기술/프로젝트명 언급
-
-        ## 5. 주목할 자료 
-        - 특히 중요하거나 나중에 다시 볼 만한 자료 2-3개
-        - 제목과 간단한 설명
-        </analysis_guidelines>
-
-        <tone>
-        - 긍정적이고 격려하는 톤
-        - "비기술적", "일부만" 같은 부정적 표현 지양
-        - 균형잡힌 활동을 칭찬
-        - 구체적이고 실행 가능한 조언
-        </tone>
-
-        브리핑은 한국어로 작성하며, Markdown 형식을 사용하여 가독성 높게 작성하세요.
-    """
-    llm = ChatUpstage(api_key='up_t4l7XWbZMQVd38iZV9Sp6jgbIQh0a', model='solar-pro2', temperature=0.1)
-
-    # LLM 호출
-    briefing_response = llm.invoke(prompt)
-    briefing_text = briefing_response.content
-
-    # DB에 저장
-    save_briefing(
-        period_start=period_start, 
-        period_end=period_end, 
-        content=briefing_text, 
-        activity_count=len(activities), 
-        metadata={"days": days}
-    )
-
-    # Agent에게 최종 텍스트 반환
-    return briefing_text
+    # 일별 요약을 만들어 합치는 방식으로 생성 (core/briefing.py)
+    return generate_briefing(days=days)
 
 @tool
 def db_query_tool(category: str=None, limit: int=10, date: str=None):
@@ -243,6 +159,18 @@ class AgentState(TypedDict):
 
 
 # ============= Agent 노드 정의 =============
+@lru_cache(maxsize=1)
+def _get_llm_with_tools():
+    """도구가 바인딩된 Agent LLM (공유 클라이언트에 한 번만 bind_tools)"""
+    tools = [
+    vector_search_tool,
+    generate_briefing_tool,
+    db_query_tool, 
+    get_activity_details_tool, 
+    get_user_topics_tool
+    ]
+    return get_llm(UPSTAGE_MODEL).bind_tools(tools)
+
 def llm_call(state: AgentState) -> Dict:
     """
     LLM 호출 노드
@@ -256,17 +184,7 @@ def llm_call(state: AgentState) -> Dict:
     Returns:
         Dict: {"messages": [AIMessage]} - LLM 응답 메시지
     """
-    llm = ChatUpstage(api_key=UPSTAGE_API_KEY, model=UPSTAGE_MODEL)
-
-    # tool binding
-    tools = [
-    vector_search_tool,
-    generate_briefing_tool,
-    db_query_tool, 
-    get_activity_details_tool, 
-    get_user_topics_tool
-    ]
-    llm_with_tools = llm.bind_tools(tools)
+    llm_with_tools = _get_llm_with_tools()
 
     messages = state["messages"]
     if not any(isinstance(m, SystemMessage) for m in messages):
@@ -358,7 +276,7 @@ Step 4: 응답 생성
 """
         messages = [SystemMessage(content=system_prompt)] + list(messages)
 
-    response = llm_with_tools.invoke(messages)
+    response = invoke_llm(llm_with_tools, messages)
 
     return {"messages": [response]}
 
@@ -477,4 +395,69 @@ def run_agent(user_message: str, agent_graph, conversation_state: Optional[Dict]
         return {
             'response': f"죄송합니다. 요청을 처리하는 중 오류가 발생했습니다: {str(e)}",
             'state': conversation_state
+        }
+
+def run_agent_stream(user_message: str, agent_graph, conversation_state: Optional[Dict] = None) -> Iterator[Dict]:
+    """
+    Agent 실행 (스트리밍) - 도구 진행 상황과 최종 답변 토큰을 생기는 대로 전달
+
+    LangGraph stream의 messages(토큰), updates(노드 결과), values(전체 상태) 모드를 함께 사용하며,
+    토큰은 agent 노드의 LLM 출력만 전달 (브리핑 도구 내부 LLM 토큰 제외)
+
+    Args:
+        user_message: 사용자 입력
+        agent_graph: Agent graph
+        conversation_state: 이전 대화 상태
+
+    Yields:
+        {'type': 'tool_start', 'name': str, 'args': dict}   # agent가 도구 호출 결정
+        {'type': 'tool_end', 'name': str}                    # 도구 실행 완료
+        {'type': 'token', 'content': str}                    # 답변 토큰
+        {'type': 'done', 'response': str, 'state': dict}     # 마지막 (run_agent 결과와 같은 형식)
+    """
+    if conversation_state is None:
+        conversation_state = {"messages": []}
+
+    messages = conversation_state.get("messages", [])
+    messages.append(HumanMessage(content=user_message))
+
+    final_state = None
+    try:
+        for mode, chunk in agent_graph.stream(
+            {"messages": messages},
+            stream_mode=["messages", "updates", "values"]
+        ):
+            if mode == "messages":
+                message, metadata = chunk
+                if (
+                    metadata.get("langgraph_node") == "agent"
+                    and isinstance(message, AIMessageChunk)
+                    and isinstance(message.content, str)
+                    and message.content
+                ):
+                    yield {"type": "token", "content": message.content}
+
+            elif mode == "updates":
+                for node, update in chunk.items():
+                    for message in (update or {}).get("messages", []):
+                        if node == "agent" and isinstance(message, AIMessage):
+                            for tool_call in message.tool_calls:
+                                yield {"type": "tool_start", "name": tool_call["name"], "args": tool_call["args"]}
+                        elif node == "tools" and isinstance(message, ToolMessage):
+                            yield {"type": "tool_end", "name": message.name}
+
+            elif mode == "values":
+                final_state = chunk
+
+        response_text = final_state["messages"][-1].content
+        logger.info(f"Agent 응답 생성 완료 (스트리밍): {response_text[:100]}...")
+
+        yield {"type": "done", "response": response_text, "state": final_state}
+
+    except Exception as e:
+        logger.error(f"Agent 실행 중 오류: {e}")
+        yield {
+            "type": "done",
+            "response": f"죄송합니다. 요청을 처리하는 중 오류가 발생했습니다: {str(e)}",
+            "state": conversation_state
         }
\ No newline at end of file
@@ -0,0 +1,313 @@
+"""
+브리핑 생성 (일별 요약 기반 map-reduce)
+브리핑마다 기간 안의 모든 활동을 다시 읽고 분석하지 않도록, 날짜별 요약(daily_digests)을 미리 만들어 두고 합침
+
+- 일별 요약: 그날 활동의 요약 + 카테고리 수 + 상위 태그
+  매일 자정 직후 스케줄러(refresh_daily_digests)가 만들고, 그날 활동의 (id, updated_at)이 바뀐 경우에만 다시 생성
+- 브리핑: 기간 안의 일별 요약(작은 행 몇 개)만 읽음
+  요약들이 BRIEFING_CONTEXT_TOKENS를 넘으면 인접한 날짜끼리 묶어 다시 요약, 예산 안에 들어올 때까지 반복
+- 재사용: 기간 + 포함 활동의 (id, updated_at) fingerprint가 같은 브리핑이 있으면 그대로 반환
+  일부 활동만 바뀌었으면 바뀐 날짜의 요약만 다시 만들고, 나머지 구간 요약은 LLM 캐시에서 재사용
+"""
+import hashlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Tuple
+from config.settings import (
+    BRIEFING_CONTEXT_TOKENS,
+    BRIEFING_CHUNK_TOKENS,
+    BRIEFING_MAP_WORKERS,
+    DIGEST_TOP_TAGS
+)
+from utils import logger
+from utils.text import estimate_tokens
+from .llm_client import get_llm
+from .llm_cache import cached_invoke
+from .storage import (
+    get_daily_activity_signatures,
+    get_activities_by_day,
+    get_daily_digests,
+    save_daily_digest,
+    save_briefing,
+    find_briefing_by_fingerprint
+)
+
+BRIEFING_MODEL = "solar-pro2"
+
+BRIEFING_PROMPT = """
+        당신은 사용자의 지식 저장소 'Stacknote'의 전문 분석가입니다.
+        다음 활동 데이터를 분석하여 아래 지침에 따라 상세한 브리핑을 생성해주세요.
+
+        <metadata>
+        오늘 날짜: {period_end}
+        분석 기간: 최근 {days}일 ({period_start} ~ {period_end})
+        총 활동 수: {activity_count}개
+        </metadata>
+
+        <raw_data>
+        {raw_data}
+        </raw_data>
+
+        <analysis_guidelines>
+        다음 구조로 브리핑을 작성하세요:
+
+        # Stacknote 활동 브리핑 ({period_start} ~ {period_end})
+        ## 1. 주요 동향 요약
+        ### 📅 주간 흐름
+        - 초반/중반/후반으로 나눠 시간에 따른 관심사 변화 분석
+
+        ### 📌 핵심 테마
+        - 가장 두드러진 주제 2-3개를 강조
+        - 각 테마별 구체적인 활동 예시 포함
+
+        ## 2. 카테고리 분포
+        - 카테고리별 비율을 이모지로 시각화
+        - 예: 📊 AI (60%) > Programming (30%) > 기타 (10%)
+
+        ## 3. 핵심 키워드
+        - 가장 중요한 키워드 3-5개
+        - 각 키워드가 어떤 맥락에서 나왔는지 한 줄 설명
+
+        ## 4. 인사이트
+        - 다음 주 학습/작업 방향 제안 (2-3개)
+        - 현재 학습 흐름의 연속선상에서 제안
+        - 구체적인 기술/프로젝트명 언급
+
+        ## 5. 주목할 자료
+        - 특히 중요하거나 나중에 다시 볼 만한 자료 2-3개
+        - 제목과 간단한 설명
+        </analysis_guidelines>
+
+        <tone>
+        - 긍정적이고 격려하는 톤
+        - "비기술적", "일부만" 같은 부정적 표현 지양
+        - 균형잡힌 활동을 칭찬
+        - 구체적이고 실행 가능한 조언
+        </tone>
+
+        브리핑은 한국어로 작성하며, Markdown 형식을 사용하여 가독성 높게 작성하세요.
+    """
+
+DIGEST_PROMPT = """
+<role>
+너는 사용자의 지식 저장소 'Stacknote'의 활동 기록을 요약하는 분석가야.
+</role>
+
+<raw_data>
+{raw_data}
+</raw_data>
+
+<instruction>
+위는 사용자가 {label}에 저장한 활동 {count}개야. 나중에 여러 날의 요약을 모아 브리핑을 만들 수 있도록 다음을 간결하게 정리해줘.
+- 핵심 주제와 관심사 (2-3줄)
+- 주요 키워드 3-5개
+- 특히 중요하거나 다시 볼 만한 자료 1-3개 (제목 그대로)
+10줄 이내의 Markdown 목록으로만 출력해.
+</instruction>
+"""
+
+MERGE_PROMPT = """
+<role>
+너는 사용자의 지식 저장소 'Stacknote'의 활동 기록을 요약하는 분석가야.
+</role>
+
+<digests>
+{digests}
+</digests>
+
+<instruction>
+위는 {label} 기간의 일별 활동 요약이야. 하나의 요약으로 합쳐줘.
+- 기간 안에서 관심사가 어떻게 변했는지 (2-3줄)
+- 주요 키워드 3-5개
+- 특히 중요하거나 다시 볼 만한 자료 2-3개 (제목 그대로)
+12줄 이내의 Markdown 목록으로만 출력해.
+</instruction>
+"""
+
+def generate_briefing(days: int = 7) -> str:
+    """
+    최근 days일 브리핑 생성 후 briefing_history에 저장 (일별 요약을 합쳐서 작성)
+
+    Args:
+        days: 분석 기간 (일)
+
+    Returns:
+        str: 브리핑 Markdown (활동이 없으면 안내 문구, 저장하지 않음)
+    """
+    period_end = datetime.now().date().isoformat()
+    period_start = (datetime.now() - timedelta(days=days)).date().isoformat()
+
+    signatures = get_daily_activity_signatures(period_start)
+    if not signatures:
+        return f"{period_start}부터 {period_end}까지의 활동 기록이 없어 브리핑을 생성할 수 없습니다."
+
+    # 같은 입력으로 만든 브리핑이 있으면 재사용 (LLM 호출/저장 없음)
+    fingerprint = briefing_fingerprint(period_start, period_end, signatures)
+    existing = find_briefing_by_fingerprint(fingerprint)
+    if existing is not None:
+        logger.info(f"기존 브리핑 재사용: ID {existing['id']}")
+        return existing['content']
+
+    digests = refresh_daily_digests(days=days, signatures=signatures)
+
+    days_in_period = sorted(digests)
+    activity_count = sum(digests[day]['activity_count'] for day in days_in_period)
+
+    categories = Counter()
+    tags = Counter()
+    for day in days_in_period:
+        categories.update(digests[day]['category_counts'])
+        tags.update({tag: count for tag, count in digests[day]['top_tags']})
+
+    # reduce: 예산 안에 들어올 때까지 인접 구간끼리 합침
+    sections = [(day, digests[day]['summary']) for day in days_in_period]
+    while len(sections) > 1 and _sections_tokens(sections) > BRIEFING_CONTEXT_TOKENS:
+        groups = _pack(sections, BRIEFING_CHUNK_TOKENS, estimate=lambda s: estimate_tokens(s[1]))
+        if len(groups) == len(sections):
+            groups = [sections[i:i + 2] for i in range(0, len(sections), 2)]
+
+        with ThreadPoolExecutor(max_workers=BRIEFING_MAP_WORKERS) as executor:
+            sections = list(executor.map(_merge_digests, groups))
+
+        logger.info(f"브리핑 reduce: {len(sections)}개 구간")
+
+    category_stats = ", ".join(
+        f"{category} {count}개 ({count / activity_count:.0%})"
+        for category, count in categories.most_common()
+    )
+    tag_stats = ", ".join(f"{tag}({count})" for tag, count in tags.most_common(DIGEST_TOP_TAGS))
+    raw_data = (
+        f"카테고리 통계: {category_stats}\n"
+        f"상위 태그: {tag_stats}\n\n"
+        "기간별 요약:\n" + "\n\n".join(f"### {label}\n{summary}" for label, summary in sections)
+    )
+
+    prompt = BRIEFING_PROMPT.format(
+        period_start=period_start,
+        period_end=period_end,
+        days=days,
+        activity_count=activity_count,
+        raw_data=raw_data
+    )
+
+    # LLM 호출 (같은 기간/데이터로 다시 생성하면 캐시된 응답)
+    briefing_text = cached_invoke(get_llm(BRIEFING_MODEL, temperature=0.1), prompt, "briefing", validate=str.strip)
+
+    save_briefing(
+        period_start=period_start,
+        period_end=period_end,
+        content=briefing_text,
+        activity_count=activity_count,
+        metadata={"days": days, "digest_days": len(days_in_period)},
+        fingerprint=fingerprint
+    )
+
+    logger.info(f"브리핑 생성 완료: {activity_count}개 활동, {len(days_in_period)}일치 요약")
+    return briefing_text
+
+def briefing_fingerprint(period_start: str, period_end: str, signatures: Dict[str, Dict[str, Any]]) -> str:
+    """
+    브리핑 입력 fingerprint (기간 + 날짜별 (id, updated_at) 해시)
+
+    Args:
+        signatures: get_daily_activity_signatures 결과
+    """
+    payload = "|".join(
+        [period_start, period_end] + [f"{day}:{signatures[day]['signature']}" for day in sorted(signatures)]
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def refresh_daily_digests(days: int, signatures: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    최근 days일의 일별 요약을 최신으로 맞춤 (활동이 바뀐 날짜만 병렬로 다시 생성)
+
+    Args:
+        days: 확인할 기간 (일)
+        signatures: 이미 조회한 get_daily_activity_signatures 결과 (없으면 조회)
+
+    Returns:
+        {day: get_daily_digests 형식}, 활동이 있는 날짜만
+    """
+    if signatures is None:
+        start_day = (datetime.now() - timedelta(days=days)).date().isoformat()
+        signatures = get_daily_activity_signatures(start_day)
+    digests = get_daily_digests(list(signatures))
+
+    changed = [
+        day for day, signature in signatures.items()
+        if day not in digests or digests[day]['source_hash'] != signature['signature']
+    ]
+
+    if changed:
+        with ThreadPoolExecutor(max_workers=BRIEFING_MAP_WORKERS) as executor:
+            for day, digest in zip(changed, executor.map(_build_daily_digest, changed)):
+                digest['source_hash'] = signatures[day]['signature']
+                save_daily_digest(
+                    day,
+                    digest['summary'],
+                    digest['activity_count'],
+                    digest['category_counts'],
+                    digest['top_tags'],
+                    digest['source_hash']
+                )
+                digests[day] = digest
+
+        logger.info(f"일별 요약 갱신: {len(changed)}일 (전체 {len(signatures)}일)")
+
+    return {day: digests[day] for day in signatures}
+
+def _build_daily_digest(day: str) -> Dict[str, Any]:
+    """하루 활동 요약 + 통계 (하루 활동도 예산을 넘으면 나눠 요약 후 합침)"""
+    activities = get_activities_by_day(day)
+
+    lines = [_activity_line(a) for a in activities]
+    chunks = _pack(lines, BRIEFING_CHUNK_TOKENS, estimate=estimate_tokens)
+
+    partials = []
+    for i, chunk in enumerate(chunks, 1):
+        label = day if len(chunks) == 1 else f"{day} ({i}/{len(chunks)})"
+        prompt = DIGEST_PROMPT.format(raw_data="\n".join(chunk), label=label, count=len(chunk))
+        partials.append((label, cached_invoke(get_llm(BRIEFING_MODEL, temperature=0.1), prompt, "briefing_digest", validate=str.strip)))
+
+    summary = partials[0][1] if len(partials) == 1 else _merge_digests(partials)[1]
+
+    tags = Counter(tag for a in activities for tag in a['tags'])
+    return {
+        'day': day,
+        'summary': summary,
+        'activity_count': len(activities),
+        'category_counts': dict(Counter(a['category'] or 'Uncategorized' for a in activities)),
+        'top_tags': [[tag, count] for tag, count in tags.most_common(DIGEST_TOP_TAGS)]
+    }
+
+def _activity_line(activity: Dict[str, Any]) -> str:
+    return f"-[{activity['created_at']}] {activity['title']} (카테고리-{activity['category']}) :{activity['summary']}"
+
+def _merge_digests(group: List[Tuple[str, str]]) -> Tuple[str, str]:
+    """여러 구간 요약을 하나로"""
+    if len(group) == 1:
+        return group[0]
+
+    label = f"{group[0][0].split(' ~ ')[0]} ~ {group[-1][0].split(' ~ ')[-1]}"
+    digests = "\n\n".join(f"### {day}\n{summary}" for day, summary in group)
+    prompt = MERGE_PROMPT.format(digests=digests, label=label)
+    return label, cached_invoke(get_llm(BRIEFING_MODEL, temperature=0.1), prompt, "briefing_digest", validate=str.strip)
+
+def _sections_tokens(sections: List[Tuple[str, str]]) -> int:
+    return sum(estimate_tokens(summary) for _, summary in sections)
+
+def _pack(items: List[Any], budget: int, estimate) -> List[List[Any]]:
+    """순서를 유지하며 예산 안에 들어가도록 묶음 (항목 하나가 예산을 넘으면 단독 묶음)"""
+    groups, current, used = [], [], 0
+    for item in items:
+        cost = estimate(item)
+        if current and used + cost > budget:
+            groups.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += cost
+
+    if current:
+        groups.append(current)
+    return groups
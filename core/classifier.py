@@ -2,16 +2,44 @@
 AI 기반 콘텐츠 분류 및 요약
 """
 
-from langchain_upstage import ChatUpstage
-from config.settings import UPSTAGE_API_KEY, UPSTAGE_MODEL
+from config.settings import (
+    CLASSIFY_BATCH_TOKEN_BUDGET,
+    CLASSIFY_BATCH_MAX_DOCS
+)
 from utils import logger
+from utils.text import estimate_tokens, parse_json_response
+from .llm_client import get_llm
+from .llm_cache import cached_invoke
 from typing import Dict, List, Any
 import json
 
+# 토큰 제한 (문서당 본문 미리보기 길이)
+CONTENT_PREVIEW_CHARS = 2000
+
+# 문서 하나의 응답(category/tags/summary)에 필요한 예상 토큰 수
+OUTPUT_TOKENS_PER_DOC = 250
+
+# 단일/배치 프롬프트 공통 규칙
+CLASSIFY_ROLE = """<role>
+너는 사용자가 읽은 웹페이지 콘텐츠를 자동으로 분류, 요약, 태그를 생성하는 전문 지식 관리 AI Agent야.
+</role>"""
+
+CLASSIFY_RULES = """**규칙**:
+1. category는 내용을 대표하는 단어 1개로, 15자 이내로 간결하게 작성해줘. (예: LangChain, RAG, FastAPI, Python, AI, Web, Database 등)
+2. tags는 본문의 핵심 주제와 관련된 구체적인 키워드 3~5개를 생성해줘.
+3. summary는 원본 내용을 왜 보았는지 기억할 수 있도록 핵심만 간결하게 3~4문장으로 요약해줘.
+4. 절대로 output format 외의 다른 텍스트는 출력하지마."""
+
+CLASSIFY_ITEM_FORMAT = """{
+    "category": "주요 카테고리 (내용을 대표하는 단어 1개)",
+    "tags": ["태그1", "태그2", "태그3", "태그4"],
+    "summary": "3-4문장으로 핵심 내용 요약"
+}"""
+
 def classify_content(title: str, content:str) -> Dict[str, Any]:
     """
     콘텐츠를 분석하여 카테고리, 태그, 요약 생성
-    
+
     Args:
         title, content
 
@@ -22,70 +50,38 @@ def classify_content(title: str, content:str) -> Dict[str, Any]:
             'summary': str        # 3-4문장 요약
         }
     """
-    logger.info(f"AI 분류 시작: {title}, {content}")
+    logger.info(f"AI 분류 시작: {title}")
 
+    response_text = ""
     try:
-        llm = ChatUpstage(
-            api_key=UPSTAGE_API_KEY,
-            model=UPSTAGE_MODEL
-        )
-
-        # 토큰 제한
-        content_preview = content[:2000]
-
         # 프롬프트
         prompt = f"""
 제목: {title}
-본문 : {content_preview}
+본문 : {content[:CONTENT_PREVIEW_CHARS]}
 
-<role>
-너는 사용자가 읽은 웹페이지 콘텐츠를 자동으로 분류, 요약, 태그를 생성하는 전문 지식 관리 AI Agent야.
-</role>
+{CLASSIFY_ROLE}
 
 <instruction>
 제공된 '제목'과 '본문'을 분석하여, 사용자가 나중에 쉽게 검색하고 이해할 수 있도록 구조화된 메타데이터를 생성해줘.
 
-**규칙**:
-1. category는 내용을 대표하는 단어 1개로, 15자 이내로 간결하게 작성해줘.
-2. tags는 본문의 핵심 주제와 관련된 구체적인 키워드 3~5개를 생성해줘.
-3. summary는 원본 내용을 왜 보았는지 기억할 수 있도록 핵심만 간결하게 3~4문장으로 요약해줘.
-4. 절대로 output format 외의 다른 텍스트는 출력하지마.
+{CLASSIFY_RULES}
 </instruction>
 
 <output format>
-{{
-    "category": "주요 카테고리 (내용을 대표하는 단어 1개, 예: LangChain, RAG, FastAPI, Python, AI, Web, Database 등)",
-    "tags": ["태그1", "태그2", "태그3", "태그4"],
-    "summary": "3-4문장으로 핵심 내용 요약"
-}}
+{CLASSIFY_ITEM_FORMAT}
 </output format>
 
-다음 형식의 JSON으로만 응답하세요:
-{{
-    "category": "주요 카테고리 (예: LangChain, RAG, FastAPI, Python, AI, Web, Database 등)",
-    "tags": ["태그1", "태그2", "태그3"],
-    "summary": "3-4문장으로 핵심 내용 요약"
-}}
-
-규칙:
-1. category는 내용을 대표하는 단어 1개
-2. tags는 3-5개의 구체적인 키워드
-3. summary는 핵심만 간결하게
-
 JSON만 출력하세요. 다른 텍스트는 출력하지 마세요."""
-        
-        # API 호출
-        response = llm.invoke(prompt)
-        response_text = response.content.strip()
 
-        # json 파싱
-        if response_text.startswith("```"):
-            response_text = response_text.split("```")[1]
-            if response_text.startswith("json"):
-                response_text = response_text[4:]
-            response_text = response_text.strip()
+        # API 호출 (같은 입력이면 캐시된 응답)
+        response_text = cached_invoke(
+            get_llm(), prompt, "classify",
+            validate=lambda text: _is_valid_result(parse_json_response(text))
+        )
 
-        result = json.loads(response_text)
+        result = parse_json_response(response_text)
+        if not _is_valid_result(result):
+            raise ValueError("category/tags/summary 형식이 아님")
 
         logger.info(f"분류 완료: {result['category']}")
         logger.debug(f"태그: {', '.join(result['tags'])}")
@@ -93,24 +89,150 @@ JSON만 출력하세요. 다른 텍스트는 출력하지 마세요."""
 
         return result
 
-    except json.JSONDecodeError as e:
+    except (json.JSONDecodeError, ValueError) as e:
         logger.error(f" JSON 파싱 실패: {e}")
         logger.error(f"응답: {response_text}")
-        
+
         # 폴백
-        return {
-            'category': 'Uncategorized',
-            'tags': ['tech'],
-            'summary': title
-        }
-    
+        return _fallback_result(title)
+
     except Exception as e:
         logger.error(f" AI 분류 실패 : {e}")
 
         # fullback
-        return {
-            'category': 'Uncategorized',
-            'tags': ['tech'],
-            'summary': title
-        }
+        return _fallback_result(title)
+
+def classify_contents(docs: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """
+    여러 콘텐츠를 토큰 예산(CLASSIFY_BATCH_TOKEN_BUDGET) 안에서 묶어 한 번의 LLM 호출로 분류
+    백필/대량 수집용, 응답에서 빠지거나 형식이 깨진 문서는 classify_content로 개별 재시도
+
+    Args:
+        docs: [{'title': str, 'content': str}, ...]
+
+    Returns:
+        docs 순서대로 classify_content와 같은 형식의 결과 리스트
+    """
+    results: List[Dict[str, Any]] = [None] * len(docs)
 
+    for group in _pack_documents(docs):
+        if len(group) == 1:
+            index = group[0]
+            results[index] = classify_content(docs[index]['title'], docs[index]['content'])
+            continue
+
+        batch_results = _classify_batch([docs[i] for i in group])
+
+        retried = 0
+        for position, index in enumerate(group, 1):
+            if position in batch_results:
+                results[index] = batch_results[position]
+            else:
+                # 폴백: 개별 요청
+                retried += 1
+                results[index] = classify_content(docs[index]['title'], docs[index]['content'])
+
+        logger.info(f"배치 분류: {len(group)}개 중 {len(group) - retried}개 한 번에 처리")
+
+    return results
+
+def _pack_documents(docs: List[Dict[str, str]]) -> List[List[int]]:
+    """
+    토큰 예산과 최대 문서 수에 맞춰 문서 인덱스를 묶음 (순서 유지)
+
+    Returns:
+        [[0, 1, 2], [3, 4], ...]
+    """
+    groups, current, used = [], [], 0
+
+    for index, doc in enumerate(docs):
+        cost = (
+            estimate_tokens(doc['title'])
+            + estimate_tokens((doc['content'] or "")[:CONTENT_PREVIEW_CHARS])
+            + OUTPUT_TOKENS_PER_DOC
+        )
+        if current and (used + cost > CLASSIFY_BATCH_TOKEN_BUDGET or len(current) >= CLASSIFY_BATCH_MAX_DOCS):
+            groups.append(current)
+            current, used = [], 0
+
+        current.append(index)
+        used += cost
+
+    if current:
+        groups.append(current)
+    return groups
+
+def _classify_batch(docs: List[Dict[str, str]]) -> Dict[int, Dict[str, Any]]:
+    """
+    문서 여러 개를 한 프롬프트로 분류
+
+    Returns:
+        {번호(1부터): 결과}, 응답에서 빠지거나 형식이 깨진 번호는 포함하지 않음
+    """
+    documents = "\n\n".join(
+        f"<document index=\"{i}\">\n제목: {doc['title']}\n본문 : {(doc['content'] or '')[:CONTENT_PREVIEW_CHARS]}\n</document>"
+        for i, doc in enumerate(docs, 1)
+    )
+
+    prompt = f"""
+{documents}
+
+{CLASSIFY_ROLE}
+
+<instruction>
+위의 각 document의 '제목'과 '본문'을 따로 분석하여, 사용자가 나중에 쉽게 검색하고 이해할 수 있도록 document마다 구조화된 메타데이터를 생성해줘.
+배열에는 모든 document의 index가 한 번씩 들어가야 해.
+
+{CLASSIFY_RULES}
+</instruction>
+
+<output format>
+[
+    {{"index": 번호, "category": "...", "tags": ["...", "..."], "summary": "..."}},
+    ...
+]
+</output format>
+
+JSON 배열만 출력하세요. 다른 텍스트는 출력하지 마세요."""
+
+    results = {}
+    try:
+        response_text = cached_invoke(
+            get_llm(), prompt, "classify",
+            validate=lambda text: isinstance(parse_json_response(text), list)
+        )
+
+        entries = parse_json_response(response_text)
+        if not isinstance(entries, list):
+            raise ValueError("JSON 배열이 아님")
+
+        for entry in entries:
+            if not isinstance(entry, dict) or not _is_valid_result(entry):
+                continue
+            index = entry.get('index')
+            if isinstance(index, int) and 1 <= index <= len(docs):
+                results[index] = {
+                    'category': entry['category'],
+                    'tags': entry['tags'],
+                    'summary': entry['summary']
+                }
+
+    except Exception as e:
+        logger.warning(f"배치 분류 실패, 개별 분류로 전환: {e}")
+
+    return results
+
+def _is_valid_result(result: Any) -> bool:
+    return (
+        isinstance(result, dict)
+        and isinstance(result.get('category'), str)
+        and isinstance(result.get('tags'), list)
+        and isinstance(result.get('summary'), str)
+    )
+
+def _fallback_result(title: str) -> Dict[str, Any]:
+    return {
+        'category': 'Uncategorized',
+        'tags': ['tech'],
+        'summary': title
+    }
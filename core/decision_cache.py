@@ -0,0 +1,159 @@
+"""
+URL 저장 여부 판단 캐시
+같은 도메인(+경로 패턴)에서 LLM 판단이 여러 번 일관되게 나오면 이후 URL은 LLM 없이 결정
+
+- 키: 'host' 와 'host/첫 경로 패턴' (예: velog.io, velog.io/@*, docs.python.org/*)
+- MIN_SAMPLES번 이상 판단되고, 한쪽 비율이 CONFIDENCE 이상이며, TTL 안이면 캐시 적중
+- override 컬럼으로 수동 지정 가능 (항상 저장 / 항상 건너뜀)
+"""
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit
+from typing import Optional, Dict, Any, List
+from config.settings import (
+    DB_PATH,
+    DECISION_CACHE_TTL_DAYS,
+    DECISION_CACHE_MIN_SAMPLES,
+    DECISION_CACHE_CONFIDENCE
+)
+from utils import logger
+
+_ID_SEGMENT_RE = re.compile(r"^(\d+|[0-9a-f]{8,}|[0-9a-f-]{32,36})$", re.IGNORECASE)
+
+# 적중률 (프로세스 단위)
+_stats = {"hits": 0, "misses": 0, "overrides": 0}
+_stats_lock = threading.Lock()
+
+def url_patterns(url: str) -> List[str]:
+    """
+    URL의 캐시 키 (구체적인 것부터)
+
+    Returns:
+        ['host/경로패턴', 'host'] 또는 ['host'] (경로 없음)
+    """
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+
+    segments = [s for s in parts.path.split("/") if s]
+    if not segments:
+        return [host]
+
+    first = segments[0].lower()
+    if first[0] in "@~":
+        first = first[0] + "*"      # 사용자 핸들 (velog.io/@user)
+    elif _ID_SEGMENT_RE.match(first):
+        first = "*"                 # 숫자/해시 ID
+
+    return [f"{host}/{first}", host]
+
+def lookup_decision(url: str) -> Optional[Dict[str, Any]]:
+    """
+    캐시된 판단 조회
+
+    Returns:
+        {'should_save': bool, 'reason': str} 또는 캐시 미스면 None
+    """
+    patterns = url_patterns(url)
+    ttl_seconds = DECISION_CACHE_TTL_DAYS * 86400
+    now = time.time()
+
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute(
+        f"SELECT * FROM url_decisions WHERE pattern IN ({', '.join('?' for _ in patterns)})",
+        patterns
+    )
+    rows = {row['pattern']: row for row in cursor.fetchall()}
+    conn.close()
+
+    # 수동 지정이 자동 판단보다 우선
+    for pattern in patterns:
+        row = rows.get(pattern)
+        if row is not None and row['override'] is not None:
+            _count("overrides")
+            return {"should_save": bool(row['override']), "reason": f"수동 설정 ({pattern})"}
+
+    for pattern in patterns:
+        row = rows.get(pattern)
+        if row is None:
+            continue
+
+        total = row['save_count'] + row['skip_count']
+        if total < DECISION_CACHE_MIN_SAMPLES or now - row['updated_at'] > ttl_seconds:
+            continue
+
+        should_save = row['save_count'] >= row['skip_count']
+        confidence = max(row['save_count'], row['skip_count']) / total
+        if confidence >= DECISION_CACHE_CONFIDENCE:
+            _count("hits")
+            return {
+                "should_save": should_save,
+                "reason": f"캐시된 판단 ({pattern}, {total}회 중 {confidence:.0%}): {row['last_reason']}"
+            }
+
+    _count("misses")
+    return None
+
+def record_decision(url: str, should_save: bool, reason: str = "") -> None:
+    """LLM 판단 결과 기록 (TTL이 지난 통계는 새로 시작)"""
+    now = time.time()
+    ttl_seconds = DECISION_CACHE_TTL_DAYS * 86400
+    save, skip = (1, 0) if should_save else (0, 1)
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    for pattern in url_patterns(url):
+        cursor.execute("""
+            INSERT INTO url_decisions (pattern, save_count, skip_count, last_reason, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(pattern) DO UPDATE SET
+                save_count = CASE WHEN ? - updated_at > ? THEN excluded.save_count
+                                  ELSE save_count + excluded.save_count END,
+                skip_count = CASE WHEN ? - updated_at > ? THEN excluded.skip_count
+                                  ELSE skip_count + excluded.skip_count END,
+                last_reason = excluded.last_reason,
+                updated_at = excluded.updated_at
+        """, (pattern, save, skip, reason, now, now, ttl_seconds, now, ttl_seconds))
+    conn.commit()
+    conn.close()
+
+def set_decision_override(pattern: str, should_save: Optional[bool]) -> None:
+    """
+    수동 지정
+
+    Args:
+        pattern: 'host' 또는 'host/경로패턴' (url_patterns 형식)
+        should_save: True(항상 저장) / False(항상 건너뜀) / None(자동으로 되돌림)
+    """
+    override = None if should_save is None else int(should_save)
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO url_decisions (pattern, override, updated_at)
+        VALUES (?, ?, ?)
+        ON CONFLICT(pattern) DO UPDATE SET override = excluded.override
+    """, (pattern.lower(), override, time.time()))
+    conn.commit()
+    conn.close()
+
+    logger.info(f"판단 수동 설정: {pattern} → {should_save}")
+
+def _count(key: str):
+    with _stats_lock:
+        _stats[key] += 1
+
+def get_decision_cache_stats() -> Dict[str, Any]:
+    """캐시 적중률 (절약한 LLM 호출 수 = hits + overrides)"""
+    with _stats_lock:
+        stats = dict(_stats)
+
+    total = stats["hits"] + stats["misses"] + stats["overrides"]
+    stats["llm_calls_saved"] = stats["hits"] + stats["overrides"]
+    stats["hit_rate"] = round(stats["llm_calls_saved"] / total, 3) if total else 0.0
+    return stats
@@ -0,0 +1,259 @@
+"""
+임베딩 캐시 (content-addressed, SQLite)
+같은 텍스트의 벡터를 저장해 페이지 재수집/청크 설정 변경/벡터 db 재구축 시
+바뀌지 않은 청크는 임베딩 API를 다시 호출하지 않음
+
+- 키: sha256(모델 + 텍스트) 32바이트
+- 값: float32 배열 BLOB (차원 4096 기준 16KB)
+- 저장소: EMBED_CACHE_PATH (stacknote.db와 분리, 지워도 안전)
+- 정리: 전체 크기가 EMBED_CACHE_MAX_MB를 넘으면 가장 오래 안 쓴 항목부터 삭제 (EMBED_CACHE_EVICT_EVERY번 저장마다)
+- 문서(passage) 임베딩만 캐시, 검색 질의는 매번 달라서 그대로 호출
+"""
+import sqlite3
+import hashlib
+import threading
+import time
+from array import array
+from typing import List, Dict, Any, Optional
+from langchain_core.embeddings import Embeddings
+from config.settings import (
+    EMBED_CACHE_ENABLED,
+    EMBED_CACHE_PATH,
+    EMBED_CACHE_MAX_MB,
+    EMBED_CACHE_EVICT_EVERY
+)
+from utils import logger
+
+# SQLite 변수 개수 제한 안에서 한 번에 조회할 키 수
+LOOKUP_BATCH = 500
+
+_initialized = False
+_init_lock = threading.Lock()
+
+_stats = {"hits": 0, "misses": 0}
+_stats_lock = threading.Lock()
+_puts_since_evict = 0
+
+def _connect() -> sqlite3.Connection:
+    global _initialized
+
+    conn = sqlite3.connect(EMBED_CACHE_PATH, timeout=10)
+    if not _initialized:
+        with _init_lock:
+            if not _initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript("""
+                    CREATE TABLE IF NOT EXISTS embedding_cache (
+                        key BLOB PRIMARY KEY,
+                        model TEXT NOT NULL,
+                        dim INTEGER NOT NULL,
+                        vector BLOB NOT NULL,
+                        created_at REAL NOT NULL,
+                        last_used_at REAL NOT NULL
+                    );
+
+                    CREATE INDEX IF NOT EXISTS idx_embedding_cache_last_used
+                    ON embedding_cache(last_used_at);
+                """)
+                conn.commit()
+                _initialized = True
+    return conn
+
+def make_embedding_key(model: str, text: str) -> bytes:
+    """모델 + 텍스트의 sha256"""
+    return hashlib.sha256(f"{model}\n{text}".encode('utf-8')).digest()
+
+def _pack(vector: List[float]) -> bytes:
+    return array('f', vector).tobytes()
+
+def _unpack(blob: bytes) -> List[float]:
+    vector = array('f')
+    vector.frombytes(blob)
+    return vector.tolist()
+
+def get_cached_embeddings(keys: List[bytes]) -> Dict[bytes, List[float]]:
+    """
+    캐시 조회
+
+    Returns:
+        {키: 벡터}, 없는 키는 포함하지 않음
+    """
+    found = {}
+    try:
+        conn = _connect()
+        cursor = conn.cursor()
+        unique = list(dict.fromkeys(keys))
+        for start in range(0, len(unique), LOOKUP_BATCH):
+            batch = unique[start:start + LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            cursor.execute(f"SELECT key, vector FROM embedding_cache WHERE key IN ({placeholders})", batch)
+            for key, blob in cursor.fetchall():
+                found[key] = _unpack(blob)
+
+        if found:
+            now = time.time()
+            cursor.executemany(
+                "UPDATE embedding_cache SET last_used_at = ? WHERE key = ?",
+                [(now, key) for key in found]
+            )
+            conn.commit()
+        conn.close()
+
+    except sqlite3.Error as e:
+        logger.warning(f"임베딩 캐시 조회 실패: {e}")
+
+    return found
+
+def put_cached_embeddings(model: str, entries: Dict[bytes, List[float]]) -> None:
+    """캐시 저장 (EMBED_CACHE_EVICT_EVERY번마다 오래된 항목 정리)"""
+    global _puts_since_evict
+
+    if not entries:
+        return
+
+    now = time.time()
+    try:
+        conn = _connect()
+        conn.executemany("""
+            INSERT OR REPLACE INTO embedding_cache
+                (key, model, dim, vector, created_at, last_used_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [
+            (key, model, len(vector), _pack(vector), now, now)
+            for key, vector in entries.items()
+        ])
+        conn.commit()
+        conn.close()
+
+    except sqlite3.Error as e:
+        logger.warning(f"임베딩 캐시 저장 실패: {e}")
+        return
+
+    with _stats_lock:
+        _puts_since_evict += 1
+        should_evict = _puts_since_evict >= EMBED_CACHE_EVICT_EVERY
+        if should_evict:
+            _puts_since_evict = 0
+
+    if should_evict:
+        evict_embedding_cache()
+
+class CachedEmbeddings(Embeddings):
+    """
+    임베딩 함수 래퍼: embed_documents는 캐시에 없는 텍스트만 원래 임베딩 함수로 요청
+
+    Args:
+        embeddings: 원래 임베딩 함수 (UpstageEmbeddings 등)
+        model: 캐시 키에 들어갈 모델 이름 (모델을 바꾸면 다른 키)
+    """
+
+    def __init__(self, embeddings: Embeddings, model: str):
+        self.embeddings = embeddings
+        self.model = model
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not EMBED_CACHE_ENABLED or not texts:
+            return self.embeddings.embed_documents(texts)
+
+        keys = [make_embedding_key(self.model, text) for text in texts]
+        vectors = get_cached_embeddings(keys)
+
+        # 미스: 같은 텍스트는 한 번만 요청
+        missing: Dict[bytes, str] = {}
+        misses = 0
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+                misses += 1
+
+        _count(len(texts) - misses, misses)
+
+        if missing:
+            embedded = self.embeddings.embed_documents(list(missing.values()))
+            new_entries = dict(zip(missing.keys(), embedded))
+            put_cached_embeddings(self.model, new_entries)
+            vectors.update(new_entries)
+
+            logger.debug(f"[임베딩 캐시] {len(texts)}개 중 {len(texts) - misses}개 적중")
+
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embeddings.embed_query(text)
+
+def evict_embedding_cache() -> int:
+    """
+    전체 크기가 EMBED_CACHE_MAX_MB를 넘으면 오래 안 쓴 항목부터 삭제
+
+    Returns:
+        int: 삭제한 항목 수
+    """
+    max_bytes = EMBED_CACHE_MAX_MB * 1024 * 1024
+    deleted = 0
+
+    try:
+        conn = _connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT COALESCE(SUM(dim), 0) * 4 FROM embedding_cache")
+        total = cursor.fetchone()[0]
+
+        if total > max_bytes:
+            # 목표: 최대 크기의 90%까지 (매번 경계에서 정리하지 않도록)
+            excess = total - int(max_bytes * 0.9)
+            cursor.execute("SELECT key, dim FROM embedding_cache ORDER BY last_used_at")
+            victims = []
+            for key, dim in cursor:
+                if excess <= 0:
+                    break
+                victims.append((key,))
+                excess -= dim * 4
+            cursor.executemany("DELETE FROM embedding_cache WHERE key = ?", victims)
+            deleted = len(victims)
+
+        conn.commit()
+        conn.close()
+
+    except sqlite3.Error as e:
+        logger.warning(f"임베딩 캐시 정리 실패: {e}")
+
+    if deleted:
+        logger.info(f"임베딩 캐시 정리: {deleted}개 삭제")
+    return deleted
+
+def clear_embedding_cache(model: Optional[str] = None) -> int:
+    """캐시 삭제 (model이 없으면 전체)"""
+    conn = _connect()
+    cursor = conn.cursor()
+    if model is None:
+        cursor.execute("DELETE FROM embedding_cache")
+    else:
+        cursor.execute("DELETE FROM embedding_cache WHERE model = ?", (model,))
+    deleted = cursor.rowcount
+    conn.commit()
+    conn.close()
+    return deleted
+
+def _count(hits: int, misses: int):
+    with _stats_lock:
+        _stats["hits"] += hits
+        _stats["misses"] += misses
+
+def get_embedding_cache_stats() -> Dict[str, Any]:
+    """적중/미스 텍스트 수(프로세스 단위)와 저장 항목 수/크기"""
+    with _stats_lock:
+        stats = dict(_stats)
+
+    try:
+        conn = _connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*), COALESCE(SUM(dim), 0) * 4 FROM embedding_cache")
+        stats["entries"], stats["bytes"] = cursor.fetchone()
+        conn.close()
+
+    except sqlite3.Error as e:
+        logger.warning(f"임베딩 캐시 통계 조회 실패: {e}")
+
+    total = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / total, 3) if total else 0.0
+    stats["enabled"] = EMBED_CACHE_ENABLED
+    return stats
@@ -0,0 +1,201 @@
+"""
+본문 추출 프로세스 풀
+trafilatura/lxml 파싱(CPU 작업)을 별도 프로세스에서 실행해 Streamlit/Flask/APScheduler 스레드와 GIL을 나눠 쓰지 않도록 함
+
+- 워커 예열: 시작할 때 trafilatura/lxml을 import하고 작은 문서를 한 번 추출 (첫 작업의 지연 제거)
+- 입출력: HTML 문자열만 보내고 추출 결과 dict만 받음 (lxml 트리는 워커 밖으로 나오지 않음)
+- 워커 재활용: EXTRACT_MAX_TASKS_PER_CHILD개 처리 후 새 프로세스로 교체 (lxml/trafilatura 캐시로 인한 메모리 증가 제한)
+- 작업별 CPU 제한: RLIMIT_CPU로 EXTRACT_CPU_LIMIT초를 넘으면 SIGXCPU → 해당 작업만 실패
+  (RLIMIT_CPU가 없는 Windows에서는 EXTRACT_TIMEOUT초 결과 대기로 대신함)
+- 워커 우선순위를 낮춰(nice) 대량 수집 중에도 UI가 밀리지 않도록 함
+- max_tasks_per_child는 fork와 함께 쓸 수 없으므로 spawn 사용 (PyInstaller 빌드는 run_desktop.py의 freeze_support 필요)
+- 풀은 프로세스 전체가 공유 (파이프라인, 직렬 경로 extract_content) → 프로세스 종료 시(atexit)에만 종료
+"""
+import atexit
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Dict, Any
+from config.settings import (
+    EXTRACT_PROCESSES,
+    EXTRACT_MAX_TASKS_PER_CHILD,
+    EXTRACT_CPU_LIMIT,
+    EXTRACT_TIMEOUT
+)
+from utils import logger
+
+try:
+    import resource
+except ImportError:     # Windows
+    resource = None
+
+WORKER_NICE = 5
+
+WARMUP_HTML = (
+    "<html><head><title>warmup</title></head><body><article>"
+    + "<p>Stacknote extraction worker warmup paragraph.</p>" * 20
+    + "</article></body></html>"
+)
+
+class CpuLimitExceeded(BaseException):
+    """작업이 EXTRACT_CPU_LIMIT초 넘게 CPU를 사용 (parse_html의 except Exception에 잡히지 않도록 BaseException)"""
+
+# ---------- 워커 프로세스 ----------
+
+def _on_cpu_limit(signum, frame):
+    raise CpuLimitExceeded()
+
+def _warm_worker():
+    """워커 초기화: 우선순위 낮춤, SIGXCPU 처리기 등록, 추출 모듈 예열"""
+    if hasattr(os, "nice"):
+        os.nice(WORKER_NICE)
+    if resource is not None:
+        signal.signal(signal.SIGXCPU, _on_cpu_limit)
+
+    from .extractor import parse_html
+    parse_html("https://example.com/warmup", WARMUP_HTML)
+
+def _set_cpu_limit(seconds: Optional[float]):
+    """이 프로세스의 누적 CPU 시간 + seconds에서 SIGXCPU (None이면 해제)"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if seconds is None:
+        limit = hard
+    else:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        limit = int(usage.ru_utime + usage.ru_stime + seconds) + 1
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (limit, hard))
+
+def _parse_job(url: str, html: str, cpu_limit: float) -> Optional[Dict[str, Any]]:
+    from .extractor import parse_html
+
+    limited = resource is not None and cpu_limit > 0
+    if limited:
+        _set_cpu_limit(cpu_limit)
+    try:
+        return parse_html(url, html)
+    finally:
+        if limited:
+            _set_cpu_limit(None)
+
+# ---------- 호출 측 ----------
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_atexit_registered = False
+
+_stats = {"jobs": 0, "cpu_limited": 0, "timeouts": 0, "broken": 0, "total_ms": 0.0}
+_stats_lock = threading.Lock()
+
+def get_extraction_pool() -> Optional[ProcessPoolExecutor]:
+    """공유 추출 프로세스 풀 (처음 호출 시 생성, EXTRACT_PROCESSES가 0이면 None)"""
+    global _pool, _atexit_registered
+    if EXTRACT_PROCESSES <= 0:
+        return None
+
+    if _pool is None:
+        with _pool_lock:
+            if not _atexit_registered:
+                atexit.register(shutdown_extraction_pool)
+                _atexit_registered = True
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=EXTRACT_PROCESSES,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_worker,
+                    max_tasks_per_child=EXTRACT_MAX_TASKS_PER_CHILD or None
+                )
+                logger.info(
+                    f"추출 프로세스 풀 시작: {EXTRACT_PROCESSES}개, "
+                    f"{EXTRACT_MAX_TASKS_PER_CHILD}개마다 재시작, 작업당 CPU {EXTRACT_CPU_LIMIT}초"
+                )
+    return _pool
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    """워커가 비정상 종료된 풀은 버리고 다음 호출에서 새로 생성"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def run_parse_html(url: str, html: str) -> Optional[Dict[str, Any]]:
+    """
+    parse_html을 추출 프로세스 풀에서 실행 (풀이 없으면 호출 스레드에서 직접)
+
+    Args:
+        url: 페이지 URL
+        html: HTML
+
+    Returns:
+        parse_html 결과, 실패/CPU 제한/시간 초과 시 None
+    """
+    from .extractor import parse_html
+
+    # 다른 스레드가 풀을 종료했거나 풀이 깨졌으면(BrokenProcessPool도 RuntimeError) 새 풀로 한 번 더,
+    # 그래도 안 되면(인터프리터 종료 중) 호출 스레드에서 직접
+    future = None
+    for _ in range(2):
+        pool = get_extraction_pool()
+        if pool is None:
+            return parse_html(url, html)
+        try:
+            future = pool.submit(_parse_job, url, html, EXTRACT_CPU_LIMIT)
+            break
+        except RuntimeError as e:
+            logger.info(f"종료된 추출 풀, 다시 시도: {e}")
+            _discard_pool(pool)
+    if future is None:
+        return parse_html(url, html)
+
+    started = time.monotonic()
+    outcome = None
+    result = None
+    try:
+        result = future.result(timeout=EXTRACT_TIMEOUT)
+
+    except FuturesTimeout:
+        future.cancel()
+        outcome = "timeouts"
+        logger.warning(f"추출 시간 초과 ({EXTRACT_TIMEOUT}초): {url}")
+
+    except CpuLimitExceeded:
+        outcome = "cpu_limited"
+        logger.warning(f"추출 CPU 제한 초과 ({EXTRACT_CPU_LIMIT}초): {url}")
+
+    except BrokenProcessPool:
+        outcome = "broken"
+        logger.error(f"추출 워커 비정상 종료, 풀 재생성: {url}")
+        _discard_pool(pool)
+
+    with _stats_lock:
+        _stats["jobs"] += 1
+        _stats["total_ms"] += (time.monotonic() - started) * 1000
+        if outcome:
+            _stats[outcome] += 1
+
+    return result
+
+def shutdown_extraction_pool():
+    """풀 종료 (다음 run_parse_html 호출 시 다시 생성)"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+def get_extraction_pool_stats() -> Dict[str, Any]:
+    """작업 수, 평균 처리 시간(대기 포함), CPU 제한/시간 초과/비정상 종료 횟수"""
+    with _stats_lock:
+        stats = dict(_stats)
+
+    total_ms = stats.pop("total_ms")
+    stats["avg_ms"] = round(total_ms / stats["jobs"], 1) if stats["jobs"] else 0.0
+    stats["processes"] = EXTRACT_PROCESSES
+    stats["cpu_limit_supported"] = resource is not None
+    return stats
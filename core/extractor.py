@@ -3,11 +3,19 @@
 Trafilatura를 사용하여 URL에서 본문과 메타데이터 추출
 """
 
-from trafilatura import extract, extract_metadata
-from urllib.parse import urlparse
+import unicodedata
+from trafilatura import bare_extraction, extract_metadata
+from trafilatura.utils import load_html
 from utils.logging import logger
+from .near_duplicate import compute_simhash
+from .http_client import http_get, ResponseRejected
+from .extraction_pool import run_parse_html
+from .source_rules import classify_url
+from .http_cache import get_cache_entry, conditional_headers, store_response, mark_revalidated, save_extraction
 from typing import Optional, Dict, Any
-import requests
+
+# parse_html 결과 형식/로직이 바뀌면 올림 (HTTP 캐시에 저장된 이전 추출 결과를 쓰지 않도록)
+EXTRACTION_VERSION = 2
 
 def extract_content(url: str) -> Optional[Dict[str, Any]]:
     """
@@ -24,38 +32,117 @@ def extract_content(url: str) -> Optional[Dict[str, Any]]:
         - author : 저자
         - date : 발행일
         - content: 본문
+        - simhash: 본문 SimHash (근사 중복 탐지용, 짧은 본문은 None)
         
         실패 시 None
     """
     logger.info(f"콘텐츠 추출 시작: {url}")
 
+    page = fetch_page(url)
+    if page is None:
+        return None
+
+    # 본문이 바뀌지 않았으면 저장된 추출 결과 재사용
+    if page['extracted'] is not None:
+        return page['extracted']
+
+    # 파싱은 추출 프로세스 풀에서 (호출 스레드가 GIL을 오래 잡지 않도록)
+    extracted = run_parse_html(url, page['html'])
+    if extracted:
+        save_extraction(url, extracted, EXTRACTION_VERSION)
+    return extracted
+
+def fetch_page(url: str) -> Optional[Dict[str, Any]]:
+    """
+    URL의 HTML 다운로드 (I/O 단계, HTTP 캐시 사용)
+    캐시가 만료 전이면 요청하지 않고, 만료됐으면 ETag/Last-Modified로 조건부 요청 (304면 저장된 본문 사용)
+    바이너리/크기 초과/시간 초과 응답은 본문을 받기 전에 거부
+
+    Returns:
+        {
+            'html': str,
+            'extracted': Dict | None   # 본문이 바뀌지 않았고 저장된 추출 결과가 있을 때만
+        }
+        실패 시 None
+    """
+    entry = get_cache_entry(url)
+    if entry is not None and entry['fresh']:
+        logger.debug(f"[HTTP 캐시] 적중: {url}")
+        return _cached_page(entry)
+
     try:
-        # 기본 추출
         # Cloudflare 보호를 trafilatura으로 해결하기 어려워서 requests 병용
         # html = fetch_url(url)
-        headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/120.0.0.0 Safari/537.36"
-            )
-        }
-        response = requests.get(url, headers=headers, timeout=40)
+        # 공유 세션 (keep-alive, 호스트별 커넥션 풀, DNS 캐시, 재시도)
+        response = http_get(url, headers=conditional_headers(entry))
+
+        if response.status_code == 304 and entry is not None:
+            logger.debug(f"[HTTP 캐시] 변경 없음 (304): {url}")
+            mark_revalidated(url, response.headers)
+            return _cached_page(entry)
+
         if response.status_code != 200:
             return None
 
-        html = response.text
+        store_response(url, response.text, response.headers)
+        return {'html': response.text, 'extracted': None}
+
+    except ResponseRejected as e:
+        logger.info(f"다운로드 거부: {e} ({url})")
+        return None
+
+    except Exception as e:
+        logger.error(f"[ERROR]다운로드 실패: {e}")
+        return None
+
+def _cached_page(entry: Dict[str, Any]) -> Dict[str, Any]:
+    extracted = entry['extracted'] if entry['extraction_version'] == EXTRACTION_VERSION else None
+    return {'html': entry['html'], 'extracted': extracted}
+
+def fetch_html(url: str) -> Optional[str]:
+    """
+    URL의 HTML 다운로드 (fetch_page의 HTML만)
+
+    Returns:
+        str: HTML, 실패 시 None
+    """
+    page = fetch_page(url)
+    return page['html'] if page else None
+
+def parse_html(url: str, html: str) -> Optional[Dict[str, Any]]:
+    """
+    HTML에서 본문과 메타데이터 추출 (CPU 단계)
+    프로세스 풀에서 실행될 수 있도록 모듈 최상위 함수로 유지
+
+    HTML은 한 번만 파싱: bare_extraction(with_metadata=True)이 같은 트리에서 본문과 메타데이터를 함께 추출
+    (extract + extract_metadata는 각각 문서 전체를 다시 파싱)
 
-        # 본문 추출
-        content = extract(
-            html,
+    Returns:
+        extract_content와 같은 형식의 Dict, 실패 시 None
+    """
+    try:
+        tree = load_html(html)
+        if tree is None:
+            logger.info(f"HTML 파싱 실패: {url}")
+            return None
+
+        # 본문 + 메타데이터 추출
+        document = bare_extraction(
+            tree,
+            url=url,
+            with_metadata=True,
             include_comments=False,   # 댓글 제외
-            include_tables=True,      # 표 포함
-            no_fallback=False         # 풀백 허용 (추출 정확도 향상)
+            include_tables=True,      # 표 포함 (풀백 허용: fast=False 기본값)
         )
 
-        # 메타데이터 추출
-        metadata = extract_metadata(html)
+        if document is not None:
+            metadata = document
+            # extract()의 txt 출력과 같게 NFC 정규화
+            content = unicodedata.normalize("NFC", document.text) if document.text else None
+        else:
+            # 본문이 너무 짧아 추출 실패 → 제목 등 메타데이터만 (이미 파싱한 트리 재사용)
+            metadata = extract_metadata(tree, default_url=url)
+            content = None
 
         # 도메인 추출
         domain = detect_source_type(url)
@@ -68,6 +155,7 @@ def extract_content(url: str) -> Optional[Dict[str, Any]]:
             "author": metadata.author if metadata else None,
             "date": metadata.date if metadata else None,
             "content": content,
+            "simhash": compute_simhash(content),
         }
 
         logger.info(f"추출 완료: {result['title']}")
@@ -83,65 +171,13 @@ def extract_content(url: str) -> Optional[Dict[str, Any]]:
 
 def detect_source_type(url: str) -> str:
     """
-    URL 기반으로 콘텐츠 소스 유형(blog, docs, news, forum, youtube, article 등)을 감지합니다.
-    단순 패턴 매칭 + 도메인 기반으로 분류.
-    
+    URL 기반으로 콘텐츠 소스 유형(blog, docs, news, forum, video, article 등)을 감지합니다.
+    규칙은 core/source_rules.json (+ 사용자 규칙), 도메인 접미사 + 경로 패턴으로 분류 (core/source_rules.py)
+
     Args:
         url: 웹페이지 URL
 
     Returns:
-        source_type: 'youtube', 'blog', 'docs', 'article', 'unknown'
+        source_type: 'video', 'blog', 'docs', 'news', 'forum', 'article'
     """
-    url_lower = url.lower()
-    domain = urlparse(url).netloc.lower()
-
-    # --- YouTube / 영상 ---
-    VIDEO_DOMAINS = [
-        "youtube.com", "youtu.be", "vimeo.com", "navertv.", "dailymotion.com",
-        "twitch.tv", "kakao.tv", "afreecatv.com", "ted.com/talks",
-        "bilibili.com", "inflearn.com", "fastcampus.co"
-    ]
-    if any(d in domain for d in VIDEO_DOMAINS) or "/video/" in url_lower:
-        return "video"
-
-    # --- 블로그 ---
-    BLOG_DOMAINS = [
-        "tistory.com", "velog.io", "medium.com", "brunch.co.kr", "naver.com",
-        "notion.site", "substack.com", "hashnode.dev", "ghost.io",
-        "wordpress.com", "blogspot.com", "dev.to", "teletype.in",
-        "post.naver.com", "mirror.xyz"
-    ]
-    if any(d in domain for d in BLOG_DOMAINS) or "/blog/" in url_lower:
-        return "blog"
-
-    # --- 문서 / 기술 문서 ---
-    DOC_DOMAINS = [
-        "readthedocs.io", "github.io", "docsify", "developer.", "api.",
-        "python.langchain.com", "docs.", "devdocs.io", "notion.com",
-        "learn.microsoft.com", "developer.mozilla.org", "pkg.go.dev",
-        "pytorch.org", "tensorflow.org", "react.dev", "vuejs.org"
-    ]
-    if any(d in domain for d in DOC_DOMAINS) or "/docs/" in url_lower or "/guide/" in url_lower:
-        return "docs"
-
-    # --- 뉴스 / 미디어 ---
-    NEWS_DOMAINS = [
-        "news.naver.com", "bbc.com", "nytimes.com", "cnn.com",
-        "reuters.com", "bloomberg.com", "theguardian.com",
-        "ytn.co.kr", "mbc.co.kr", "sbs.co.kr", "kbs.co.kr",
-        "hani.co.kr", "chosun.com", "joongang.co.kr", "donga.com"
-    ]
-    if any(d in domain for d in NEWS_DOMAINS) or "/news/" in url_lower:
-        return "news"
-
-    # --- 커뮤니티 / Q&A ---
-    FORUM_DOMAINS = [
-        "reddit.com", "stackoverflow.com", "okky.kr", "ruliweb.com",
-        "clien.net", "slack.com", "discord.com", "github.com/issues",
-        "medium.com/@", "cafe.naver.com"
-    ]
-    if any(d in domain for d in FORUM_DOMAINS) or "/questions/" in url_lower:
-        return "forum"
-
-    # --- 기본값: 일반 기사 또는 기타 콘텐츠 ---
-    return "article"
+    return classify_url(url)
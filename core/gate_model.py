@@ -0,0 +1,190 @@
+"""
+로컬 저장/건너뜀 사전 분류기 (Multinomial Naive Bayes)
+LLM 저장 판단(should_save_url) 앞에서, 확신이 높을 때만 로컬로 결정
+
+- 특징: 호스트/라벨, 경로 토큰, 제목 단어(1-gram, 2-gram), detect_source_type 결과
+- 학습 데이터: gate_labels (LLM/사용자가 내린 저장/건너뜀 판단만)
+  판단 캐시/로컬 모델이 스스로 통과시킨 글로 학습하면 자기 판단을 강화하므로 저장된 활동은 쓰지 않음
+  (gate_labels를 만들 때 그 전에 LLM 판단으로 저장된 활동만 저장(1)으로 채움, core/storage.py _migrate_db)
+- 제목: 학습과 예측 모두 판단 요청 때 받은 탭 제목 (추출한 본문 제목 아님)
+- 시작 시 DB에서 학습(warm_gate_model)하고, 이후 LLM 판단이 나올 때마다 증분 학습(learn)
+"""
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from urllib.parse import urlsplit
+from typing import Optional, Dict, Any, List, Tuple
+from config.settings import (
+    DB_PATH,
+    GATE_MODEL_MIN_SAMPLES,
+    GATE_MODEL_CONFIDENCE,
+    GATE_MODEL_WARM_LIMIT
+)
+from utils import logger
+from .extractor import detect_source_type
+
+_TOKEN_RE = re.compile(r"[^\W\d_]+|\d+")
+
+class NaiveBayesGate:
+    """저장(1)/건너뜀(0) 2-클래스 Multinomial Naive Bayes, 증분 학습 지원"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._doc_counts = [0, 0]                  # 클래스별 문서 수
+        self._feature_counts = [Counter(), Counter()]  # 클래스별 특징 빈도
+        self._feature_totals = [0, 0]              # 클래스별 특징 빈도 합
+        self._vocab = set()
+
+    @property
+    def samples(self) -> Tuple[int, int]:
+        """(건너뜀 학습 수, 저장 학습 수)"""
+        return tuple(self._doc_counts)
+
+    def learn(self, features: List[str], label: int):
+        with self._lock:
+            self._doc_counts[label] += 1
+            self._feature_counts[label].update(features)
+            self._feature_totals[label] += len(features)
+            self._vocab.update(features)
+
+    def predict_proba(self, features: List[str]) -> float:
+        """저장(1)일 확률 (학습에 없던 특징은 무시, 아는 특징이 2개 미만이면 0.5)"""
+        with self._lock:
+            features = [f for f in features if f in self._vocab]
+            total_docs = sum(self._doc_counts)
+            if total_docs == 0 or len(features) < 2:
+                return 0.5
+
+            vocab_size = len(self._vocab) + 1
+            scores = []
+            for label in (0, 1):
+                score = math.log((self._doc_counts[label] + 1) / (total_docs + 2))
+                denominator = self._feature_totals[label] + vocab_size
+                counts = self._feature_counts[label]
+                for feature in features:
+                    score += math.log((counts.get(feature, 0) + 1) / denominator)
+                scores.append(score)
+
+        # 두 클래스 log 점수 → 확률 (overflow 방지)
+        diff = scores[0] - scores[1]
+        if diff > 700:
+            return 0.0
+        return 1.0 / (1.0 + math.exp(diff))
+
+def extract_features(url: str, title: str) -> List[str]:
+    """URL/제목 → 특징 토큰 목록"""
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+
+    features = [f"host:{host}", f"src:{detect_source_type(url)}"]
+    features += [f"label:{label}" for label in host.split(".")[:-1]]
+    features += [f"path:{token}" for token in _TOKEN_RE.findall(parts.path.lower()) if not token.isdigit()]
+
+    words = _TOKEN_RE.findall((title or "").lower())
+    features += [f"t:{word}" for word in words]
+    features += [f"t2:{a}_{b}" for a, b in zip(words, words[1:])]
+
+    return features
+
+_model = NaiveBayesGate()
+_warmed = False
+_stats = {"local_decisions": 0, "deferred_to_llm": 0}
+_stats_lock = threading.Lock()
+
+def warm_gate_model() -> Tuple[int, int]:
+    """
+    DB의 판단 기록(gate_labels)으로 학습 (클래스별 최근 GATE_MODEL_WARM_LIMIT개)
+
+    Returns:
+        (건너뜀 학습 수, 저장 학습 수)
+    """
+    global _model, _warmed
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    query = "SELECT url, title FROM gate_labels WHERE should_save = ? ORDER BY id DESC LIMIT ?"
+    accepted = cursor.execute(query, (1, GATE_MODEL_WARM_LIMIT)).fetchall()
+    rejected = cursor.execute(query, (0, GATE_MODEL_WARM_LIMIT)).fetchall()
+    conn.close()
+
+    model = NaiveBayesGate()
+    for url, title in accepted:
+        model.learn(extract_features(url, title), 1)
+    for url, title in rejected:
+        model.learn(extract_features(url, title), 0)
+
+    _model = model
+    _warmed = True
+
+    logger.info(f"저장 판단 로컬 모델 학습: 저장 {len(accepted)}개, 건너뜀 {len(rejected)}개")
+    return model.samples
+
+def predict_decision(url: str, title: str) -> Optional[Dict[str, Any]]:
+    """
+    로컬 모델 판단 (학습 데이터가 충분하고 확신이 높을 때만)
+
+    Returns:
+        {'should_save': bool, 'reason': str}, 확신이 낮으면 None (LLM 필요)
+    """
+    if not _warmed:
+        warm_gate_model()
+
+    if min(_model.samples) < GATE_MODEL_MIN_SAMPLES:
+        return None
+
+    probability = _model.predict_proba(extract_features(url, title))
+    confidence = max(probability, 1 - probability)
+
+    with _stats_lock:
+        if confidence < GATE_MODEL_CONFIDENCE:
+            _stats["deferred_to_llm"] += 1
+            return None
+        _stats["local_decisions"] += 1
+
+    should_save = probability >= 0.5
+    return {
+        "should_save": should_save,
+        "reason": f"로컬 모델 판단 (확신도 {confidence:.0%})"
+    }
+
+def learn_decision(
+    url: str,
+    title: str,
+    should_save: bool,
+    reason: str = "",
+    source: str = "llm"
+) -> None:
+    """
+    LLM/사용자 판단으로 증분 학습, gate_labels에 기록해 다음 시작 시 학습에 사용
+    (로컬 모델/판단 캐시의 결정은 넘기지 않음)
+
+    Args:
+        title: 판단 요청 때 받은 탭 제목 (predict_decision과 같은 입력)
+        source: 'llm' / 'user'
+    """
+    _model.learn(extract_features(url, title), int(should_save))
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute(
+        "INSERT INTO gate_labels (url, title, should_save, source, reason) VALUES (?, ?, ?, ?, ?)",
+        (url, title, int(should_save), source, reason)
+    )
+    conn.commit()
+    conn.close()
+
+def get_gate_model_stats() -> Dict[str, Any]:
+    """로컬 판단 비율"""
+    with _stats_lock:
+        stats = dict(_stats)
+
+    skip_samples, save_samples = _model.samples
+    total = stats["local_decisions"] + stats["deferred_to_llm"]
+    stats["local_rate"] = round(stats["local_decisions"] / total, 3) if total else 0.0
+    stats["trained_save"] = save_samples
+    stats["trained_skip"] = skip_samples
+    return stats
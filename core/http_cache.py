@@ -0,0 +1,340 @@
+"""
+HTTP 응답 캐시 (페이지 원본 HTML, SQLite)
+같은 URL을 다시 처리할 때(재수집, 백필, 재시도) 페이지를 통째로 다시 받지 않도록 압축한 HTML과 검증자를 저장
+
+- 저장소: HTTP_CACHE_PATH (stacknote.db와 분리, 지워도 안전)
+- Cache-Control: no-store면 저장하지 않음, max-age(또는 Expires) 동안은 요청 없이 캐시 사용,
+  no-cache거나 만료 정보가 없으면 매번 재검증
+- 재검증: If-None-Match(ETag) / If-Modified-Since(Last-Modified)로 조건부 요청 → 304면 저장된 본문 재사용
+- 추출 결과: 본문이 바뀌지 않았으면(304, 만료 전) 저장해 둔 parse_html 결과도 재사용
+- 정리: HTTP_CACHE_TTL_DAYS보다 오래 안 쓴 항목 삭제, 전체 크기가 HTTP_CACHE_MAX_MB를 넘으면
+  가장 오래 안 쓴 항목부터 삭제 (HTTP_CACHE_EVICT_EVERY번 저장마다)
+"""
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Any
+from config.settings import (
+    HTTP_CACHE_ENABLED,
+    HTTP_CACHE_PATH,
+    HTTP_CACHE_TTL_DAYS,
+    HTTP_CACHE_MAX_MB,
+    HTTP_CACHE_EVICT_EVERY
+)
+from utils import logger
+
+_initialized = False
+_init_lock = threading.Lock()
+
+# 적중/재검증/미스 (프로세스 단위)
+_stats = {"fresh": 0, "revalidated": 0, "misses": 0}
+_stats_lock = threading.Lock()
+_puts_since_evict = 0
+
+def _connect() -> sqlite3.Connection:
+    global _initialized
+
+    conn = sqlite3.connect(HTTP_CACHE_PATH, timeout=10)
+    if not _initialized:
+        with _init_lock:
+            if not _initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript("""
+                    CREATE TABLE IF NOT EXISTS http_cache (
+                        url TEXT PRIMARY KEY,
+                        body BLOB NOT NULL,
+                        etag TEXT,
+                        last_modified TEXT,
+                        expires_at REAL NOT NULL,
+                        extracted TEXT,
+                        extraction_version INTEGER,
+                        size INTEGER NOT NULL,
+                        fetched_at REAL NOT NULL,
+                        last_used_at REAL NOT NULL
+                    );
+
+                    CREATE INDEX IF NOT EXISTS idx_http_cache_last_used
+                    ON http_cache(last_used_at);
+                """)
+                conn.commit()
+                _initialized = True
+    return conn
+
+def _parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    """'no-cache, max-age=60' → {'no-cache': None, 'max-age': '60'}"""
+    directives = {}
+    for part in value.split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') if arg else None
+    return directives
+
+def _expires_at(headers) -> Optional[float]:
+    """
+    응답 헤더로 계산한 만료 시각 (epoch)
+
+    Returns:
+        float: 이 시각까지는 요청 없이 캐시 사용 (지금 시각이면 매번 재검증)
+        None: 저장 금지 (no-store)
+    """
+    directives = _parse_cache_control(headers.get("Cache-Control", ""))
+    if "no-store" in directives:
+        return None
+
+    now = time.time()
+    if "no-cache" in directives:
+        return now
+
+    max_age = directives.get("s-maxage") or directives.get("max-age")
+    if max_age is not None:
+        try:
+            age = int(headers.get("Age") or 0)
+            return now + max(0, int(max_age) - age)
+        except ValueError:
+            return now
+
+    expires = headers.get("Expires")
+    if expires:
+        try:
+            # 서버 시계 기준으로 남은 시간 계산 (Date가 없으면 로컬 시계)
+            date = headers.get("Date")
+            server_now = parsedate_to_datetime(date).timestamp() if date else now
+            return now + max(0.0, parsedate_to_datetime(expires).timestamp() - server_now)
+        except (TypeError, ValueError):
+            return now
+
+    return now
+
+def get_cache_entry(url: str) -> Optional[Dict[str, Any]]:
+    """
+    저장된 응답 조회
+
+    Returns:
+        {
+            'html': str,
+            'etag': str | None,
+            'last_modified': str | None,
+            'fresh': bool,                      # 만료 전이면 요청 없이 사용 가능
+            'extracted': Dict | None,           # 저장된 추출 결과
+            'extraction_version': int | None
+        }
+        없으면 None
+    """
+    if not HTTP_CACHE_ENABLED:
+        return None
+
+    entry = None
+    try:
+        conn = _connect()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT body, etag, last_modified, expires_at, extracted, extraction_version
+            FROM http_cache WHERE url = ?
+        """, (url,))
+        row = cursor.fetchone()
+
+        now = time.time()
+        if row is not None:
+            entry = {
+                "html": zlib.decompress(row[0]).decode('utf-8'),
+                "etag": row[1],
+                "last_modified": row[2],
+                "fresh": row[3] > now,
+                "extracted": json.loads(row[4]) if row[4] else None,
+                "extraction_version": row[5]
+            }
+            cursor.execute("UPDATE http_cache SET last_used_at = ? WHERE url = ?", (now, url))
+            conn.commit()
+        conn.close()
+
+    except (sqlite3.Error, zlib.error, ValueError) as e:
+        logger.warning(f"HTTP 캐시 조회 실패: {e}")
+        return None
+
+    if entry is not None and entry["fresh"]:
+        _count("fresh")
+    return entry
+
+def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """저장된 검증자로 조건부 요청 헤더 생성"""
+    headers = {}
+    if entry is not None:
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+def store_response(url: str, text: str, headers) -> None:
+    """
+    200 응답 저장 (본문이 바뀌었으므로 저장된 추출 결과는 버림)
+    no-store이거나, 검증자도 유효 기간도 없어 다시 쓸 수 없는 응답은 저장하지 않음
+    """
+    global _puts_since_evict
+
+    _count("misses")
+    if not HTTP_CACHE_ENABLED:
+        return
+
+    expires_at = _expires_at(headers)
+    etag = headers.get("ETag")
+    last_modified = headers.get("Last-Modified")
+    now = time.time()
+
+    try:
+        conn = _connect()
+        if expires_at is None or (expires_at <= now and not etag and not last_modified):
+            conn.execute("DELETE FROM http_cache WHERE url = ?", (url,))
+        else:
+            body = zlib.compress(text.encode('utf-8'))
+            conn.execute("""
+                INSERT OR REPLACE INTO http_cache
+                    (url, body, etag, last_modified, expires_at, extracted, extraction_version,
+                     size, fetched_at, last_used_at)
+                VALUES (?, ?, ?, ?, ?, NULL, NULL, ?, ?, ?)
+            """, (url, body, etag, last_modified, expires_at, len(body), now, now))
+        conn.commit()
+        conn.close()
+
+    except sqlite3.Error as e:
+        logger.warning(f"HTTP 캐시 저장 실패: {e}")
+        return
+
+    with _stats_lock:
+        _puts_since_evict += 1
+        should_evict = _puts_since_evict >= HTTP_CACHE_EVICT_EVERY
+        if should_evict:
+            _puts_since_evict = 0
+
+    if should_evict:
+        evict_http_cache()
+
+def mark_revalidated(url: str, headers) -> None:
+    """304 응답: 본문은 그대로 두고 만료 시각/검증자만 갱신"""
+    _count("revalidated")
+
+    expires_at = _expires_at(headers)
+    try:
+        conn = _connect()
+        if expires_at is None:
+            conn.execute("DELETE FROM http_cache WHERE url = ?", (url,))
+        else:
+            conn.execute("""
+                UPDATE http_cache
+                SET expires_at = ?,
+                    etag = COALESCE(?, etag),
+                    last_modified = COALESCE(?, last_modified),
+                    fetched_at = ?
+                WHERE url = ?
+            """, (expires_at, headers.get("ETag"), headers.get("Last-Modified"), time.time(), url))
+        conn.commit()
+        conn.close()
+
+    except sqlite3.Error as e:
+        logger.warning(f"HTTP 캐시 갱신 실패: {e}")
+
+def save_extraction(url: str, extracted: Dict[str, Any], version: int) -> None:
+    """
+    저장된 본문의 추출 결과 기록 (본문이 바뀌지 않는 동안 재사용)
+
+    Args:
+        url: 요청 URL
+        extracted: parse_html 결과
+        version: 추출 로직 버전 (바뀌면 저장된 결과를 쓰지 않음)
+    """
+    if not HTTP_CACHE_ENABLED:
+        return
+
+    try:
+        conn = _connect()
+        conn.execute(
+            "UPDATE http_cache SET extracted = ?, extraction_version = ? WHERE url = ?",
+            (json.dumps(extracted, ensure_ascii=False, default=str), version, url)
+        )
+        conn.commit()
+        conn.close()
+
+    except sqlite3.Error as e:
+        logger.warning(f"HTTP 캐시 추출 결과 저장 실패: {e}")
+
+def evict_http_cache() -> int:
+    """
+    TTL이 지난 항목 삭제 후, 전체 크기가 HTTP_CACHE_MAX_MB를 넘으면 오래 안 쓴 항목부터 삭제
+
+    Returns:
+        int: 삭제한 항목 수
+    """
+    max_bytes = HTTP_CACHE_MAX_MB * 1024 * 1024
+    deleted = 0
+
+    try:
+        conn = _connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            "DELETE FROM http_cache WHERE last_used_at < ?",
+            (time.time() - HTTP_CACHE_TTL_DAYS * 86400,)
+        )
+        deleted += cursor.rowcount
+
+        cursor.execute("SELECT COALESCE(SUM(size), 0) FROM http_cache")
+        total = cursor.fetchone()[0]
+
+        if total > max_bytes:
+            # 목표: 최대 크기의 90%까지
+            excess = total - int(max_bytes * 0.9)
+            cursor.execute("SELECT url, size FROM http_cache ORDER BY last_used_at")
+            victims = []
+            for url, size in cursor:
+                if excess <= 0:
+                    break
+                victims.append((url,))
+                excess -= size
+            cursor.executemany("DELETE FROM http_cache WHERE url = ?", victims)
+            deleted += len(victims)
+
+        conn.commit()
+        conn.close()
+
+    except sqlite3.Error as e:
+        logger.warning(f"HTTP 캐시 정리 실패: {e}")
+
+    if deleted:
+        logger.info(f"HTTP 캐시 정리: {deleted}개 삭제")
+    return deleted
+
+def clear_http_cache() -> int:
+    """캐시 전체 삭제"""
+    conn = _connect()
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM http_cache")
+    deleted = cursor.rowcount
+    conn.commit()
+    conn.close()
+    return deleted
+
+def _count(key: str):
+    with _stats_lock:
+        _stats[key] += 1
+
+def get_http_cache_stats() -> Dict[str, Any]:
+    """적중(만료 전)/재검증(304)/미스 횟수와 저장 항목 수/크기"""
+    with _stats_lock:
+        stats = dict(_stats)
+
+    try:
+        conn = _connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM http_cache")
+        stats["entries"], stats["bytes"] = cursor.fetchone()
+        conn.close()
+
+    except sqlite3.Error as e:
+        logger.warning(f"HTTP 캐시 통계 조회 실패: {e}")
+
+    total = stats["fresh"] + stats["revalidated"] + stats["misses"]
+    stats["hit_rate"] = round((stats["fresh"] + stats["revalidated"]) / total, 3) if total else 0.0
+
+    return {"enabled": HTTP_CACHE_ENABLED, **stats}
@@ -0,0 +1,372 @@
+"""
+공유 HTTP 클라이언트 (페이지 다운로드용)
+페이지마다 requests.get으로 새 연결(TCP + TLS + DNS 조회)을 만들지 않도록 프로세스 전체에서 하나의 세션을 공유
+
+- requests.Session + HTTPAdapter: 호스트별 커넥션 풀, keep-alive, 재시도 정책(Retry)
+  (Retry-After 대기는 HTTP_MAX_RETRY_AFTER초까지만, 긴 대기를 요구하면 그만큼만 기다렸다가 재시도하고
+  계속 거부되면 마지막 응답 반환 → 수집 워커가 한 시간씩 묶이지 않도록)
+- DNS 캐시: 이 세션의 어댑터가 쓰는 연결 클래스에서만 (호스트, 포트)별 getaddrinfo 결과를 HTTP_DNS_CACHE_TTL초 동안 재사용
+  (urllib3 전역 create_connection은 건드리지 않음, 최근 DNS_CACHE_MAX_HOSTS개만 유지하는 LRU)
+- HTTP/2 (선택): HTTP_HTTP2=true이고 h2 패키지가 있으면 httpx(http2=True) 클라이언트 사용
+  (httpx는 자체 연결 계층을 쓰므로 DNS 캐시는 적용되지 않음)
+- 스트리밍 다운로드: 본문 전체를 메모리에 올리기 전에 거부 (ResponseRejected)
+  - Content-Type이 텍스트가 아니거나 Content-Length가 HTTP_MAX_MB를 넘으면 본문을 읽지 않음
+  - 첫 SNIFF_BYTES의 매직 바이트로 바이너리(PDF, 이미지, 영상, 압축 파일 등) 판별
+  - 읽은 바이트(압축 해제 후)가 HTTP_MAX_MB를 넘거나 HTTP_TOTAL_TIMEOUT이 지나면 중단
+  - 청크 단위 점진적 디코딩 (charset: BOM → Content-Type → <meta charset> → UTF-8)
+"""
+import codecs
+import re
+import socket
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Iterator
+import httpx
+import requests
+import urllib3.util.connection as urllib3_connection
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.retry import Retry
+from config.settings import (
+    HTTP_TIMEOUT,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_TOTAL_TIMEOUT,
+    HTTP_MAX_MB,
+    HTTP_POOL_HOSTS,
+    HTTP_POOL_SIZE,
+    HTTP_RETRIES,
+    HTTP_RETRY_BACKOFF,
+    HTTP_MAX_RETRY_AFTER,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_HTTP2
+)
+from utils import logger
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    )
+}
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+CHUNK_BYTES = 64 * 1024
+DNS_CACHE_MAX_HOSTS = 1024   # DNS 캐시에 유지할 (호스트, 포트) 수
+SNIFF_BYTES = 4096      # 매직 바이트/<meta charset> 확인 구간
+
+# 본문을 읽을 Content-Type (없거나 application/octet-stream이면 매직 바이트로 판단)
+TEXT_CONTENT_TYPES = {
+    "text/html", "application/xhtml+xml", "text/plain", "text/xml", "application/xml"
+}
+
+BINARY_SIGNATURES = (
+    b"%PDF", b"PK\x03\x04", b"\x89PNG", b"GIF8", b"\xff\xd8\xff", b"RIFF", b"OggS", b"ID3",
+    b"fLaC", b"\x1a\x45\xdf\xa3", b"\x1f\x8b", b"BZh", b"7z\xbc\xaf", b"Rar!", b"\x7fELF",
+    b"MZ", b"wOFF", b"wOF2", b"\x00\x00\x01\x00"
+)
+
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([\w.:-]+)""", re.IGNORECASE)
+
+class ResponseRejected(Exception):
+    """본문을 다 받기 전에 거부한 응답 (바이너리, 크기 초과, 시간 초과)"""
+
+class HttpResponse:
+    """백엔드(requests/httpx)와 무관한 응답"""
+
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str], text: str):
+        self.url = url                  # 리다이렉트 후 최종 URL
+        self.status_code = status_code
+        self.headers = headers          # 대소문자 무시 dict
+        self.text = text
+
+# ---------- DNS 캐시 ----------
+
+_dns_cache: "OrderedDict[tuple, tuple]" = OrderedDict()   # (host, port) → (만료 시각, IP 목록), 최근 사용 순
+_dns_lock = threading.Lock()
+
+def _resolve(host: str, port: int) -> list:
+    key = (host, port)
+    now = time.monotonic()
+
+    with _dns_lock:
+        cached = _dns_cache.get(key)
+        if cached is not None and cached[0] > now:
+            _dns_cache.move_to_end(key)
+            return cached[1]
+
+    addresses = socket.getaddrinfo(host, port, urllib3_connection.allowed_gai_family(), socket.SOCK_STREAM)
+    ips = list(dict.fromkeys(sockaddr[0] for _, _, _, _, sockaddr in addresses))
+    with _dns_lock:
+        _dns_cache[key] = (now + HTTP_DNS_CACHE_TTL, ips)
+        _dns_cache.move_to_end(key)
+        while len(_dns_cache) > DNS_CACHE_MAX_HOSTS:
+            _dns_cache.popitem(last=False)
+    return ips
+
+class _CachedDnsMixin:
+    """
+    연결할 때 캐시된 IP로 접속 (Host 헤더/SNI/인증서 검증은 원래 호스트 이름 그대로)
+    캐시된 주소로 모두 실패하면 캐시를 버리고 원래 방식(매번 조회)으로 연결
+    """
+
+    def _new_conn(self):
+        host = self._dns_host
+        try:
+            ips = _resolve(host, self.port)
+        except socket.gaierror:
+            return super()._new_conn()
+
+        error = None
+        try:
+            for ip in ips:
+                self._dns_host = ip
+                try:
+                    return super()._new_conn()
+                except (ConnectTimeoutError, NewConnectionError) as e:
+                    error = e
+        finally:
+            self._dns_host = host
+
+        with _dns_lock:
+            _dns_cache.pop((host, self.port), None)
+        logger.debug(f"캐시된 DNS 주소로 연결 실패, 다시 조회: {host} ({error})")
+        return super()._new_conn()
+
+class _CachedDnsHTTPConnection(_CachedDnsMixin, HTTPConnection):
+    pass
+
+class _CachedDnsHTTPSConnection(_CachedDnsMixin, HTTPSConnection):
+    pass
+
+class _CachedDnsHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CachedDnsHTTPConnection
+
+class _CachedDnsHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CachedDnsHTTPSConnection
+
+class _CachedDnsAdapter(HTTPAdapter):
+    """이 어댑터의 커넥션 풀에만 DNS 캐시 적용"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CachedDnsHTTPConnectionPool,
+            "https": _CachedDnsHTTPSConnectionPool
+        }
+
+# ---------- 클라이언트 ----------
+
+_session: Optional[requests.Session] = None
+_http2_client = None
+_client_lock = threading.Lock()
+
+class _BoundedRetry(Retry):
+    """Retry-After 대기를 HTTP_MAX_RETRY_AFTER초로 제한하는 Retry"""
+
+    def get_retry_after(self, response) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, HTTP_MAX_RETRY_AFTER)
+
+def _create_session() -> requests.Session:
+    retry = _BoundedRetry(
+        total=HTTP_RETRIES,
+        backoff_factor=HTTP_RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False       # 재시도 후에도 실패하면 마지막 응답 반환
+    )
+    adapter_class = _CachedDnsAdapter if HTTP_DNS_CACHE_TTL > 0 else HTTPAdapter
+    adapter = adapter_class(
+        pool_connections=HTTP_POOL_HOSTS,   # 풀을 유지할 호스트 수
+        pool_maxsize=HTTP_POOL_SIZE,        # 호스트당 유지할 연결 수
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def _create_http2_client():
+    """h2가 설치되어 있으면 httpx HTTP/2 클라이언트, 아니면 None"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("HTTP_HTTP2=true지만 h2 패키지가 없어 HTTP/1.1 세션 사용 (uv sync --extra http2)")
+        return None
+
+    return httpx.Client(
+        http2=True,
+        headers=DEFAULT_HEADERS,
+        follow_redirects=True,
+        timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=HTTP_POOL_HOSTS * HTTP_POOL_SIZE,
+            max_keepalive_connections=HTTP_POOL_HOSTS
+        ),
+        transport=httpx.HTTPTransport(http2=True, retries=HTTP_RETRIES)  # 연결 실패만 재시도
+    )
+
+def get_session() -> requests.Session:
+    """공유 requests 세션 (스레드 안전, 처음 호출 시 생성)"""
+    global _session
+    if _session is None:
+        with _client_lock:
+            if _session is None:
+                _session = _create_session()
+                logger.info(
+                    f"HTTP 세션 생성: 호스트 {HTTP_POOL_HOSTS}개 × 연결 {HTTP_POOL_SIZE}개, "
+                    f"재시도 {HTTP_RETRIES}회, DNS 캐시 {HTTP_DNS_CACHE_TTL}초"
+                )
+    return _session
+
+def _get_http2_client():
+    global _http2_client
+    if _http2_client is None:
+        with _client_lock:
+            if _http2_client is None:
+                _http2_client = _create_http2_client() or False
+    return _http2_client or None
+
+def http_get(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+    max_bytes: Optional[int] = None
+) -> HttpResponse:
+    """
+    공유 클라이언트로 GET (스트리밍, 200 응답만 본문을 읽음)
+
+    Args:
+        url: 요청 URL
+        headers: 추가 헤더
+        timeout: 소켓 읽기 타임아웃 초 (None이면 HTTP_TIMEOUT), 전체 시간은 HTTP_TOTAL_TIMEOUT
+        max_bytes: 본문 최대 크기 (None이면 HTTP_MAX_MB)
+
+    Returns:
+        HttpResponse (200이 아니면 text는 빈 문자열)
+
+    Raises:
+        ResponseRejected: 텍스트가 아니거나 크기/시간 제한 초과
+        requests.RequestException / httpx.HTTPError: 연결 실패 등
+    """
+    read_timeout = timeout or HTTP_TIMEOUT
+    max_bytes = max_bytes or int(HTTP_MAX_MB * 1024 * 1024)
+    deadline = time.monotonic() + HTTP_TOTAL_TIMEOUT
+
+    client = _get_http2_client() if HTTP_HTTP2 else None
+    if client is not None:
+        with client.stream(
+            "GET", url, headers=headers,
+            timeout=httpx.Timeout(read_timeout, connect=HTTP_CONNECT_TIMEOUT)
+        ) as response:
+            text = ""
+            if response.status_code == 200:
+                text = _read_text(response.headers, response.iter_bytes(CHUNK_BYTES), max_bytes, deadline)
+            return HttpResponse(str(response.url), response.status_code, response.headers, text)
+
+    response = get_session().get(
+        url, headers=headers, timeout=(HTTP_CONNECT_TIMEOUT, read_timeout), stream=True
+    )
+    with response:
+        text = ""
+        if response.status_code == 200:
+            text = _read_text(response.headers, _iter_raw(response.raw), max_bytes, deadline)
+        return HttpResponse(response.url, response.status_code, response.headers, text)
+
+def _iter_raw(raw) -> Iterator[bytes]:
+    """urllib3 응답을 도착하는 대로 (CHUNK_BYTES가 찰 때까지 기다리지 않고) 압축 해제해서 반환"""
+    while True:
+        chunk = raw.read1(CHUNK_BYTES, decode_content=True)
+        if not chunk:
+            break
+        yield chunk
+
+def _read_text(headers, chunks: Iterator[bytes], max_bytes: int, deadline: float) -> str:
+    """
+    헤더 확인 후 청크를 읽으며 제한 검사 + 점진적 디코딩
+
+    Raises:
+        ResponseRejected
+    """
+    content_type = headers.get("Content-Type") or ""
+    mime = content_type.split(";")[0].strip().lower()
+    if mime and mime not in TEXT_CONTENT_TYPES and mime != "application/octet-stream":
+        raise ResponseRejected(f"텍스트가 아닌 Content-Type: {mime}")
+
+    length = headers.get("Content-Length")
+    if length and length.isdigit() and int(length) > max_bytes:
+        raise ResponseRejected(f"크기 초과: Content-Length {int(length)} > {max_bytes} bytes")
+
+    head = b""
+    decoder = None
+    parts = []
+    received = 0
+
+    for chunk in chunks:
+        received += len(chunk)
+        if received > max_bytes:
+            raise ResponseRejected(f"크기 초과: {max_bytes} bytes 넘게 수신")
+        if time.monotonic() > deadline:
+            raise ResponseRejected(f"시간 초과: {HTTP_TOTAL_TIMEOUT}초 안에 다 받지 못함 ({received} bytes)")
+
+        if decoder is None:
+            # 앞부분이 SNIFF_BYTES만큼 모이면 바이너리 여부/인코딩 판단
+            head += chunk
+            if len(head) < SNIFF_BYTES:
+                continue
+            decoder = _start_decoding(head, content_type)
+            chunk, head = head, b""
+
+        parts.append(decoder.decode(chunk))
+
+    if decoder is None:
+        decoder = _start_decoding(head, content_type)
+        parts.append(decoder.decode(head))
+    parts.append(decoder.decode(b"", final=True))
+
+    return "".join(parts)
+
+def _start_decoding(head: bytes, content_type: str):
+    """매직 바이트 검사 후 점진적 디코더 생성"""
+    if head.startswith(BINARY_SIGNATURES) or head[4:8] == b"ftyp":
+        raise ResponseRejected(f"바이너리 본문: {head[:8]!r}")
+
+    encoding = _detect_encoding(head, content_type)
+    if not encoding.startswith(("utf-16", "utf-32")) and b"\x00" in head:
+        raise ResponseRejected("바이너리 본문: NUL 바이트 포함")
+
+    return codecs.getincrementaldecoder(encoding)(errors="replace")
+
+def _detect_encoding(head: bytes, content_type: str) -> str:
+    """BOM → Content-Type charset → <meta charset> → UTF-8"""
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if head.startswith((codecs.BOM_UTF32_LE, codecs.BOM_UTF32_BE)):
+        return "utf-32"
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+
+    candidates = []
+    match = re.search(r"charset\s*=\s*[\"']?([\w.:-]+)", content_type, re.IGNORECASE)
+    if match:
+        candidates.append(match.group(1))
+    match = _META_CHARSET.search(head)
+    if match:
+        candidates.append(match.group(1).decode("ascii", "ignore"))
+
+    for name in candidates:
+        try:
+            return codecs.lookup(name).name
+        except LookupError:
+            continue
+    return "utf-8"
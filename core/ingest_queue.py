@@ -0,0 +1,325 @@
+"""
+영구 URL 수집 큐
+stacknote.db의 ingest_jobs 테이블을 작업 큐로 사용 (재시작/크래시 후에도 유지)
+
+상태 흐름:
+    pending --lease--> leased --ack--> (삭제)
+                              --nack--> pending (재시도) / failed (최대 시도 초과)
+                              --release--> pending (처리 전 반환, 시도 횟수 복구)
+    leased 상태에서 visibility timeout이 지나면 다시 lease 대상이 됩니다.
+    처리 중에는 extend_lease로 lease를 연장합니다 (소비자의 heartbeat).
+
+lease마다 새 lease_token을 발급하고 ack/nack/release/extend는 토큰이 같을 때만 적용합니다.
+lease가 만료돼 다른 소비자가 가져간 작업을 이전 소비자가 ack/nack하지 못하도록 하기 위함입니다.
+failed 작업은 INGEST_FAILED_RETENTION_DAYS가 지나면 purge_failed_jobs로 삭제합니다.
+"""
+import sqlite3
+import json
+import secrets
+import time
+import threading
+from urllib.parse import urlparse
+from typing import Optional, Dict, Any, Iterable, Tuple
+from config.settings import (
+    DB_PATH,
+    INGEST_QUEUE_MAX_DEPTH,
+    INGEST_VISIBILITY_TIMEOUT,
+    INGEST_MAX_ATTEMPTS,
+    INGEST_FAILED_RETENTION_DAYS
+)
+from utils import logger
+
+# 새 작업 알림 (같은 프로세스의 소비자를 즉시 깨우기 위함)
+_new_work = threading.Event()
+
+def notify_new_work() -> None:
+    """대기 중인 소비자 깨우기"""
+    _new_work.set()
+
+def wait_for_work(timeout: float) -> bool:
+    """
+    새 작업 알림을 최대 timeout초 동안 대기
+
+    Returns:
+        bool: 알림을 받았으면 True, 시간 초과면 False
+    """
+    notified = _new_work.wait(timeout)
+    _new_work.clear()
+    return notified
+
+def get_job_host(url: str) -> str:
+    """호스트별 동시 처리 제한에 쓰는 키"""
+    return urlparse(url).netloc.lower()
+
+def _connect() -> sqlite3.Connection:
+    """autocommit 모드 연결 (트랜잭션은 BEGIN IMMEDIATE로 직접 관리)"""
+    conn = sqlite3.connect(DB_PATH, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+def enqueue_url(data: Dict[str, Any]) -> Optional[int]:
+    """
+    URL 작업을 큐에 추가
+
+    Args:
+        data: 브라우저 확장에서 받은 데이터 {'url', 'title', 'timestamp', 'canonical_url'(선택)}
+
+    Returns:
+        int: job_id (같은 URL이 이미 대기 중이면 기존 job_id)
+        None: 큐가 가득 참 (INGEST_QUEUE_MAX_DEPTH)
+    """
+    url = data.get('canonical_url') or data['url']  # 대기 중 중복 판단은 정규화 URL 기준
+    now = time.time()
+
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+
+        # 이미 대기/처리 중인 URL이면 다시 넣지 않음
+        existing = conn.execute(
+            "SELECT id FROM ingest_jobs WHERE url = ? AND status != 'failed'",
+            (url,)
+        ).fetchone()
+        if existing:
+            conn.execute("COMMIT")
+            logger.debug(f"[Queue] 이미 대기 중: {url}")
+            return existing['id']
+
+        depth = conn.execute(
+            "SELECT COUNT(id) FROM ingest_jobs WHERE status != 'failed'"
+        ).fetchone()[0]
+        if depth >= INGEST_QUEUE_MAX_DEPTH:
+            conn.execute("COMMIT")
+            logger.warning(f"[Queue] 큐 가득 참 ({depth}/{INGEST_QUEUE_MAX_DEPTH}): {url}")
+            return None
+
+        cursor = conn.execute("""
+            INSERT INTO ingest_jobs (url, payload, status, attempts, available_at)
+            VALUES (?, ?, 'pending', 0, ?)
+        """, (url, json.dumps(data, ensure_ascii=False), now))
+        conn.execute("COMMIT")
+        notify_new_work()
+
+        logger.debug(f"[Queue] 추가: job {cursor.lastrowid} ({url})")
+        return cursor.lastrowid
+
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    finally:
+        conn.close()
+
+def lease_job(
+    visibility_timeout: int = INGEST_VISIBILITY_TIMEOUT,
+    exclude_hosts: Optional[Iterable[str]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    처리할 작업 하나를 lease
+
+    lease된 작업은 visibility_timeout 동안 다른 소비자에게 보이지 않으며,
+    그 안에 ack/nack 되지 않으면 (예: 크래시) 다시 lease 대상이 됩니다.
+
+    Args:
+        visibility_timeout: lease 유지 시간 (초)
+        exclude_hosts: 건너뛸 호스트 (동시 처리 상한에 도달한 호스트)
+
+    Returns:
+        {'id', 'url', 'attempts', 'lease_token', 'data'} 또는 처리할 작업이 없으면 None
+    """
+    now = time.time()
+
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+
+        # 최대 시도 횟수를 넘긴 채 lease가 만료된 작업은 실패 처리
+        conn.execute("""
+            UPDATE ingest_jobs
+            SET status = 'failed', last_error = 'lease expired'
+            WHERE status = 'leased' AND lease_until <= ? AND attempts >= ?
+        """, (now, INGEST_MAX_ATTEMPTS))
+
+        exclude_hosts = set(exclude_hosts or ())
+        candidates = conn.execute("""
+            SELECT id, url, payload, attempts
+            FROM ingest_jobs
+            WHERE (status = 'pending' AND available_at <= ?)
+               OR (status = 'leased' AND lease_until <= ?)
+            ORDER BY id
+        """, (now, now))
+
+        # 커서는 지연 평가되므로 첫 번째 적합한 행에서 멈춤
+        row = next(
+            (c for c in candidates if get_job_host(c['url']) not in exclude_hosts),
+            None
+        )
+        candidates.close()
+
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+
+        lease_token = secrets.token_hex(8)
+        conn.execute("""
+            UPDATE ingest_jobs
+            SET status = 'leased', lease_until = ?, lease_token = ?, attempts = attempts + 1
+            WHERE id = ?
+        """, (now + visibility_timeout, lease_token, row['id']))
+        conn.execute("COMMIT")
+
+        return {
+            'id': row['id'],
+            'url': row['url'],
+            'attempts': row['attempts'] + 1,
+            'lease_token': lease_token,
+            'data': json.loads(row['payload']) if row['payload'] else {'url': row['url']}
+        }
+
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    finally:
+        conn.close()
+
+def _check_lease(applied: bool, job_id: int, action: str) -> bool:
+    if not applied:
+        logger.warning(f"[Queue] lease가 만료돼 다른 소비자가 가져간 작업, {action} 무시: job {job_id}")
+    return applied
+
+def ack_job(job_id: int, lease_token: str) -> bool:
+    """
+    처리 완료된 작업 삭제
+
+    Returns:
+        bool: lease를 아직 가지고 있어서 삭제했으면 True
+    """
+    conn = _connect()
+    try:
+        cursor = conn.execute(
+            "DELETE FROM ingest_jobs WHERE id = ? AND status = 'leased' AND lease_token = ?",
+            (job_id, lease_token)
+        )
+        return _check_lease(cursor.rowcount > 0, job_id, "ack")
+    finally:
+        conn.close()
+
+def nack_job(job_id: int, lease_token: str, error: Optional[str] = None, retry_delay: int = 30) -> bool:
+    """
+    처리 실패한 작업을 되돌림
+
+    최대 시도 횟수(INGEST_MAX_ATTEMPTS) 미만이면 retry_delay * 시도 횟수 후 재시도,
+    넘었으면 failed 상태로 남겨 둡니다.
+
+    Returns:
+        bool: lease를 아직 가지고 있어서 되돌렸으면 True
+    """
+    now = time.time()
+
+    conn = _connect()
+    try:
+        cursor = conn.execute("""
+            UPDATE ingest_jobs
+            SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                available_at = ? + ? * attempts,
+                lease_until = NULL,
+                lease_token = NULL,
+                last_error = ?
+            WHERE id = ? AND status = 'leased' AND lease_token = ?
+        """, (INGEST_MAX_ATTEMPTS, now, retry_delay, error, job_id, lease_token))
+        return _check_lease(cursor.rowcount > 0, job_id, "nack")
+    finally:
+        conn.close()
+
+def release_job(job_id: int, lease_token: str) -> bool:
+    """
+    lease만 하고 처리하지 않은 작업을 되돌림 (소비자 종료 등)
+
+    lease에서 늘린 시도 횟수를 되돌려 재시작이 반복돼도 failed가 되지 않습니다.
+
+    Returns:
+        bool: lease를 아직 가지고 있어서 되돌렸으면 True
+    """
+    conn = _connect()
+    try:
+        cursor = conn.execute("""
+            UPDATE ingest_jobs
+            SET status = 'pending',
+                attempts = MAX(attempts - 1, 0),
+                available_at = ?,
+                lease_until = NULL,
+                lease_token = NULL
+            WHERE id = ? AND status = 'leased' AND lease_token = ?
+        """, (time.time(), job_id, lease_token))
+        return _check_lease(cursor.rowcount > 0, job_id, "release")
+    finally:
+        conn.close()
+
+def extend_lease(
+    leases: Iterable[Tuple[int, str]],
+    visibility_timeout: int = INGEST_VISIBILITY_TIMEOUT
+) -> int:
+    """
+    처리 중인 작업의 lease를 지금부터 visibility_timeout초로 연장 (heartbeat)
+
+    Args:
+        leases: [(job_id, lease_token), ...]
+
+    Returns:
+        int: 연장한 작업 수 (이미 다른 소비자가 가져간 작업은 제외)
+    """
+    leases = list(leases)
+    if not leases:
+        return 0
+
+    lease_until = time.time() + visibility_timeout
+    conn = _connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        extended = 0
+        for job_id, lease_token in leases:
+            cursor = conn.execute("""
+                UPDATE ingest_jobs SET lease_until = ?
+                WHERE id = ? AND status = 'leased' AND lease_token = ?
+            """, (lease_until, job_id, lease_token))
+            extended += cursor.rowcount
+        conn.execute("COMMIT")
+        return extended
+
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    finally:
+        conn.close()
+
+def purge_failed_jobs(retention_days: int = INGEST_FAILED_RETENTION_DAYS) -> int:
+    """
+    추가된 지 retention_days일이 지난 failed 작업 삭제
+    (작업은 최대 시도 횟수만큼 재시도하는 동안만 남아 있으므로 추가 시각을 실패 시각 대신 사용)
+
+    Returns:
+        int: 삭제한 작업 수
+    """
+    conn = _connect()
+    try:
+        cursor = conn.execute(
+            "DELETE FROM ingest_jobs WHERE status = 'failed' AND created_at < datetime('now', ?)",
+            (f"-{retention_days} days",)
+        )
+        if cursor.rowcount:
+            logger.info(f"[Queue] 실패한 작업 {cursor.rowcount}개 삭제 ({retention_days}일 경과)")
+        return cursor.rowcount
+    finally:
+        conn.close()
+
+def get_queue_depth() -> int:
+    """대기 + 처리 중인 작업 수"""
+    conn = _connect()
+    try:
+        return conn.execute(
+            "SELECT COUNT(id) FROM ingest_jobs WHERE status != 'failed'"
+        ).fetchone()[0]
+    finally:
+        conn.close()
@@ -0,0 +1,170 @@
+"""
+URL 수집 작업 소비자
+영구 큐(ingest_queue)에서 작업을 lease 하여 스레드 풀 또는 단계별 파이프라인(core/pipeline.py)에서 병렬 처리
+"""
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional, Set, Tuple
+from config.settings import INGEST_WORKERS, INGEST_PER_HOST_LIMIT, INGEST_VISIBILITY_TIMEOUT
+from utils import logger
+from .ingest_queue import (
+    lease_job,
+    ack_job,
+    nack_job,
+    release_job,
+    extend_lease,
+    purge_failed_jobs,
+    get_job_host,
+    notify_new_work,
+    wait_for_work
+)
+
+class IngestConsumer:
+    """
+    큐 소비자 스레드 + 워커 스레드 풀
+
+    - 새 작업이 들어오면 즉시 깨어남 (폴링 대기 없음)
+    - 전체 동시 처리 수는 workers, 호스트별 동시 처리 수는 per_host_limit로 제한
+    - pipeline이 주어지면 작업을 파이프라인에 넘기고, 완료 콜백에서 ack/nack
+    - 처리 중인 작업은 heartbeat 스레드가 visibility timeout의 1/3마다 lease 연장
+      (파이프라인 대기/LLM 재시도로 오래 걸려도 다른 소비자가 같은 작업을 가져가지 않도록)
+    - stop() 호출 시 진행 중인 작업을 마친 뒤 종료
+      (시작하지 못한 작업은 큐에 그대로 남아 다음 실행 때 처리)
+    """
+
+    def __init__(
+        self,
+        handler: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        pipeline=None,
+        workers: int = INGEST_WORKERS,
+        per_host_limit: int = INGEST_PER_HOST_LIMIT,
+        poll_interval: float = 5.0
+    ):
+        """
+        Args:
+            handler: 작업 데이터({'url', 'title', ...})를 받아 처리하는 함수.
+                     예외를 던지면 nack (재시도), 정상 반환하면 ack
+            pipeline: IngestPipeline (handler 대신 사용)
+            workers: 전체 동시 처리 수
+            per_host_limit: 같은 호스트 동시 처리 수
+            poll_interval: 알림이 없을 때 큐를 다시 확인하는 간격 (재시도 대기 작업용)
+        """
+        self._handler = handler
+        self._pipeline = pipeline
+        self._per_host_limit = per_host_limit
+        self._poll_interval = poll_interval
+
+        self._slots = threading.Semaphore(workers)
+        self._host_counts = Counter()
+        self._in_flight: Set[Tuple[int, str]] = set()   # (job_id, lease_token)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._stopped = threading.Event()       # 진행 중인 작업까지 끝남 (heartbeat 종료)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest-worker")
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """소비자 스레드 시작"""
+        try:
+            purge_failed_jobs()
+        except Exception as e:
+            logger.warning(f"실패한 작업 정리 실패: {e}")
+
+        self._thread = threading.Thread(target=self._run, name="ingest-consumer", daemon=True)
+        self._thread.start()
+        threading.Thread(target=self._heartbeat, name="ingest-heartbeat", daemon=True).start()
+        logger.info("=== 큐 소비자 스레드 시작 ===")
+
+    def stop(self, timeout: Optional[float] = None):
+        """새 작업 lease를 멈추고 진행 중인 작업이 끝날 때까지 대기"""
+        self._stop_event.set()
+        notify_new_work()
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._executor.shutdown(wait=True)
+        self._stopped.set()
+        logger.info("=== 큐 소비자 종료 ===")
+
+    def _heartbeat(self):
+        """처리 중인 작업의 lease 연장"""
+        interval = max(INGEST_VISIBILITY_TIMEOUT / 3, 1)
+        while not self._stopped.wait(interval):
+            with self._lock:
+                leases = list(self._in_flight)
+            try:
+                extended = extend_lease(leases)
+                if extended < len(leases):
+                    logger.warning(f"lease 연장 실패: {len(leases) - extended}개 (이미 만료)")
+            except Exception as e:
+                logger.error(f"lease 연장 오류: {e}")
+
+    def _busy_hosts(self) -> set:
+        """동시 처리 상한에 도달한 호스트"""
+        with self._lock:
+            return {host for host, count in self._host_counts.items() if count >= self._per_host_limit}
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            # 빈 워커 슬롯 확보
+            if not self._slots.acquire(timeout=self._poll_interval):
+                continue
+
+            try:
+                job = lease_job(exclude_hosts=self._busy_hosts())
+            except Exception as e:
+                logger.error(f"큐 소비자 오류: {e}", exc_info=True)
+                job = None
+
+            if job is None or self._stop_event.is_set():
+                self._slots.release()
+                if job is not None:
+                    release_job(job['id'], job['lease_token'])
+                    break
+                # 새 작업 또는 호스트 슬롯 반환 알림까지 대기
+                wait_for_work(self._poll_interval)
+                continue
+
+            host = get_job_host(job['url'])
+            with self._lock:
+                self._host_counts[host] += 1
+                self._in_flight.add((job['id'], job['lease_token']))
+
+            if self._pipeline is not None:
+                self._pipeline.submit(
+                    job['data'],
+                    on_done=lambda error, job=job, host=host: self._finish(job, host, error)
+                )
+            else:
+                self._executor.submit(self._process, job, host)
+
+    def _process(self, job: Dict[str, Any], host: str):
+        """워커 스레드에서 작업 하나 처리"""
+        try:
+            self._handler(job['data'])
+            self._finish(job, host, None)
+
+        except Exception as e:
+            logger.error(f"URL 처리 중 오류: {e}", exc_info=True)
+            self._finish(job, host, e)
+
+    def _finish(self, job: Dict[str, Any], host: str, error: Optional[Exception]):
+        """작업 완료 처리: ack/nack 후 슬롯 반환"""
+        try:
+            if error is None:
+                ack_job(job['id'], job['lease_token'])
+            else:
+                nack_job(job['id'], job['lease_token'], str(error))
+
+        except Exception as e:
+            logger.error(f"큐 ack/nack 실패 (job {job['id']}): {e}")
+
+        finally:
+            with self._lock:
+                self._in_flight.discard((job['id'], job['lease_token']))
+                self._host_counts[host] -= 1
+                if self._host_counts[host] <= 0:
+                    del self._host_counts[host]
+            self._slots.release()
+            notify_new_work()  # 호스트 제한으로 밀린 작업이 있을 수 있음
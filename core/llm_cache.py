@@ -0,0 +1,258 @@
+"""
+LLM 응답 캐시 (content-addressed, SQLite)
+프롬프트가 입력만으로 결정되는 호출(분류, 저장 판단, 브리핑)의 응답을 저장해
+같은 페이지 재처리/백필 재실행/같은 데이터의 브리핑 재생성 시 LLM을 다시 호출하지 않음
+
+- 키: sha256(모델 + 파라미터 + 프롬프트)
+- 저장소: LLM_CACHE_PATH (stacknote.db와 분리, 지워도 안전)
+- 네임스페이스: 호출처별로 구분 (classify, url_gate, briefing) → 통계/삭제 단위
+- 정리: LLM_CACHE_TTL_DAYS보다 오래 안 쓴 항목 삭제, 전체 크기가 LLM_CACHE_MAX_MB를 넘으면
+  가장 오래 안 쓴 항목부터 삭제 (LLM_CACHE_EVICT_EVERY번 저장마다)
+"""
+import json
+import sqlite3
+import hashlib
+import threading
+import time
+from collections import defaultdict
+from typing import Optional, Dict, Any, Callable
+from config.settings import (
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_PATH,
+    LLM_CACHE_TTL_DAYS,
+    LLM_CACHE_MAX_MB,
+    LLM_CACHE_EVICT_EVERY
+)
+from utils import logger
+from .llm_client import invoke_llm
+
+_initialized = False
+_init_lock = threading.Lock()
+
+# 네임스페이스별 적중/미스 (프로세스 단위)
+_stats = defaultdict(lambda: {"hits": 0, "misses": 0})
+_stats_lock = threading.Lock()
+_puts_since_evict = 0
+
+def _connect() -> sqlite3.Connection:
+    global _initialized
+
+    conn = sqlite3.connect(LLM_CACHE_PATH, timeout=10)
+    if not _initialized:
+        with _init_lock:
+            if not _initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript("""
+                    CREATE TABLE IF NOT EXISTS llm_cache (
+                        key TEXT PRIMARY KEY,
+                        namespace TEXT NOT NULL,
+                        model TEXT,
+                        response TEXT NOT NULL,
+                        size INTEGER NOT NULL,
+                        created_at REAL NOT NULL,
+                        last_used_at REAL NOT NULL
+                    );
+
+                    CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used
+                    ON llm_cache(last_used_at);
+
+                    CREATE INDEX IF NOT EXISTS idx_llm_cache_namespace
+                    ON llm_cache(namespace);
+                """)
+                conn.commit()
+                _initialized = True
+    return conn
+
+def make_cache_key(model: str, params: Dict[str, Any], prompt: str) -> str:
+    """모델 + 파라미터 + 프롬프트의 sha256"""
+    payload = json.dumps(
+        {"model": model, "params": params, "prompt": prompt},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def get_cached_response(key: str, namespace: str) -> Optional[str]:
+    """캐시 조회 (TTL이 지난 항목은 미스)"""
+    response = None
+    try:
+        conn = _connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT response, last_used_at FROM llm_cache WHERE key = ?", (key,))
+        row = cursor.fetchone()
+
+        now = time.time()
+        if row is not None and now - row[1] <= LLM_CACHE_TTL_DAYS * 86400:
+            response = row[0]
+            cursor.execute("UPDATE llm_cache SET last_used_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+        conn.close()
+
+    except sqlite3.Error as e:
+        logger.warning(f"LLM 캐시 조회 실패: {e}")
+
+    _count(namespace, "hits" if response is not None else "misses")
+    return response
+
+def put_cached_response(key: str, namespace: str, model: str, response: str) -> None:
+    """캐시 저장 (LLM_CACHE_EVICT_EVERY번마다 오래된 항목 정리)"""
+    global _puts_since_evict
+
+    now = time.time()
+    try:
+        conn = _connect()
+        conn.execute("""
+            INSERT OR REPLACE INTO llm_cache
+                (key, namespace, model, response, size, created_at, last_used_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (key, namespace, model, response, len(response.encode('utf-8')), now, now))
+        conn.commit()
+        conn.close()
+
+    except sqlite3.Error as e:
+        logger.warning(f"LLM 캐시 저장 실패: {e}")
+        return
+
+    with _stats_lock:
+        _puts_since_evict += 1
+        should_evict = _puts_since_evict >= LLM_CACHE_EVICT_EVERY
+        if should_evict:
+            _puts_since_evict = 0
+
+    if should_evict:
+        evict_llm_cache()
+
+def _is_valid_response(response: str, validate: Optional[Callable[[str], Any]]) -> bool:
+    """validate가 예외 없이 참을 반환하면 유효 (validate가 없으면 항상 유효)"""
+    if validate is None:
+        return True
+    try:
+        return bool(validate(response))
+    except Exception:
+        return False
+
+def cached_invoke(
+    llm,
+    prompt: str,
+    namespace: str,
+    validate: Optional[Callable[[str], Any]] = None
+) -> str:
+    """
+    invoke_llm(llm, prompt).content 와 같지만, 같은 모델/파라미터/프롬프트면 캐시된 응답 반환
+
+    Args:
+        llm: get_llm() 결과
+        prompt: 프롬프트 문자열
+        namespace: 호출처 이름 (예: 'classify', 'url_gate', 'briefing')
+        validate: 응답 검사 함수, 예외를 던지거나 거짓을 반환하면 캐시하지 않음
+            (형식이 깨진 응답이 재시도 때 그대로 재사용되지 않도록, 캐시된 응답도 다시 검사)
+
+    Returns:
+        str: 응답 텍스트 (검사에 실패해도 그대로 반환, 처리는 호출처에서)
+    """
+    if not LLM_CACHE_ENABLED:
+        return invoke_llm(llm, prompt).content
+
+    params = getattr(llm, "_identifying_params", {})
+    model = params.get("model_name") or params.get("model") or type(llm).__name__
+    key = make_cache_key(model, params, prompt)
+
+    cached = get_cached_response(key, namespace)
+    if cached is not None and _is_valid_response(cached, validate):
+        logger.debug(f"[LLM 캐시] 적중: {namespace}")
+        return cached
+
+    response = invoke_llm(llm, prompt).content
+
+    if _is_valid_response(response, validate):
+        put_cached_response(key, namespace, model, response)
+    else:
+        logger.warning(f"[LLM 캐시] 형식이 맞지 않는 응답은 저장하지 않음: {namespace}")
+    return response
+
+def evict_llm_cache() -> int:
+    """
+    TTL이 지난 항목 삭제 후, 전체 크기가 LLM_CACHE_MAX_MB를 넘으면 오래 안 쓴 항목부터 삭제
+
+    Returns:
+        int: 삭제한 항목 수
+    """
+    max_bytes = LLM_CACHE_MAX_MB * 1024 * 1024
+    deleted = 0
+
+    try:
+        conn = _connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            "DELETE FROM llm_cache WHERE last_used_at < ?",
+            (time.time() - LLM_CACHE_TTL_DAYS * 86400,)
+        )
+        deleted += cursor.rowcount
+
+        cursor.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache")
+        total = cursor.fetchone()[0]
+
+        if total > max_bytes:
+            # 목표: 최대 크기의 90%까지 (매번 경계에서 정리하지 않도록)
+            excess = total - int(max_bytes * 0.9)
+            cursor.execute("SELECT key, size FROM llm_cache ORDER BY last_used_at")
+            victims = []
+            for key, size in cursor:
+                if excess <= 0:
+                    break
+                victims.append((key,))
+                excess -= size
+            cursor.executemany("DELETE FROM llm_cache WHERE key = ?", victims)
+            deleted += len(victims)
+
+        conn.commit()
+        conn.close()
+
+    except sqlite3.Error as e:
+        logger.warning(f"LLM 캐시 정리 실패: {e}")
+
+    if deleted:
+        logger.info(f"LLM 캐시 정리: {deleted}개 삭제")
+    return deleted
+
+def clear_llm_cache(namespace: Optional[str] = None) -> int:
+    """캐시 삭제 (namespace가 없으면 전체)"""
+    conn = _connect()
+    cursor = conn.cursor()
+    if namespace is None:
+        cursor.execute("DELETE FROM llm_cache")
+    else:
+        cursor.execute("DELETE FROM llm_cache WHERE namespace = ?", (namespace,))
+    deleted = cursor.rowcount
+    conn.commit()
+    conn.close()
+    return deleted
+
+def _count(namespace: str, key: str):
+    with _stats_lock:
+        _stats[namespace][key] += 1
+
+def get_llm_cache_stats() -> Dict[str, Any]:
+    """네임스페이스별 적중률과 저장 항목 수/크기"""
+    with _stats_lock:
+        stats = {namespace: dict(counts) for namespace, counts in _stats.items()}
+
+    try:
+        conn = _connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT namespace, COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache GROUP BY namespace")
+        for namespace, entries, size in cursor.fetchall():
+            stats.setdefault(namespace, {"hits": 0, "misses": 0})
+            stats[namespace]["entries"] = entries
+            stats[namespace]["bytes"] = size
+        conn.close()
+
+    except sqlite3.Error as e:
+        logger.warning(f"LLM 캐시 통계 조회 실패: {e}")
+
+    for counts in stats.values():
+        total = counts["hits"] + counts["misses"]
+        counts["hit_rate"] = round(counts["hits"] / total, 3) if total else 0.0
+
+    return {"enabled": LLM_CACHE_ENABLED, "namespaces": stats}
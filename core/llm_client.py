@@ -0,0 +1,227 @@
+"""
+LLM 클라이언트 레지스트리
+모델별로 오래 유지되는 ChatUpstage 클라이언트를 공유하고, 모든 호출을 모델별 제한기(ModelGuard)에 통과시킴
+→ 수집 워커(분류/저장 판단)와 채팅 Agent가 함께 API를 과부하시키지 않도록
+
+- 클라이언트: (모델, temperature)당 1개, 하나의 httpx 커넥션 풀 공유 (호출마다 생성/TLS 연결 비용 없음)
+- 속도 제한: 모델별 토큰 버킷 (LLM_RATE_PER_MIN, LLM_MODEL_RATES로 모델별 지정)
+- 백오프: 429/5xx/연결 오류 시 지수 백오프 + jitter, 그동안 같은 모델의 다른 호출도 대기
+- 동시성: AIMD - 성공하면 천천히 늘리고, 지연이 LLM_LATENCY_TARGET을 넘으면 조금, 429/5xx면 절반으로 줄임
+"""
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+import httpx
+from langchain_upstage import ChatUpstage
+from config.settings import (
+    UPSTAGE_API_KEY,
+    UPSTAGE_MODEL,
+    LLM_RATE_PER_MIN,
+    LLM_MODEL_RATES,
+    LLM_MAX_CONCURRENCY,
+    LLM_LATENCY_TARGET,
+    LLM_MAX_RETRIES,
+    LLM_BACKOFF_BASE,
+    LLM_BACKOFF_MAX,
+    LLM_HTTP_MAX_CONNECTIONS,
+    LLM_TIMEOUT
+)
+from utils import logger
+from utils.rate_limit import TokenBucket
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+def _is_retryable(error: Exception) -> bool:
+    """429/5xx, 타임아웃, 연결 오류면 재시도"""
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+
+    name = type(error).__name__
+    return isinstance(error, (httpx.TimeoutException, httpx.TransportError)) or name in (
+        "APIConnectionError", "APITimeoutError"
+    )
+
+class ModelGuard:
+    """모델 하나에 대한 속도 제한 + 적응형 동시성 + 백오프"""
+
+    def __init__(self, model: str, rate_per_min: float, max_concurrency: int):
+        self.model = model
+        self._bucket = TokenBucket(rate_per_min)
+        self._max_limit = max(1, max_concurrency)
+        self._limit = float(self._max_limit)
+        self._active = 0
+        self._cond = threading.Condition()
+
+        self._cooldown_until = 0.0
+        self._backoff = LLM_BACKOFF_BASE
+        self._latency_ewma: Optional[float] = None
+        self._stats = {"calls": 0, "retries": 0, "throttled": 0, "errors": 0}
+
+    def call(self, fn: Callable[[], Any]) -> Any:
+        """
+        fn()을 제한 안에서 실행, 재시도 가능한 오류는 백오프 후 최대 LLM_MAX_RETRIES번 재시도
+
+        Raises:
+            fn이 던진 마지막 예외
+        """
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            self._acquire()
+            started = time.monotonic()
+            try:
+                result = fn()
+
+            except Exception as e:
+                retryable = _is_retryable(e)
+                self._release(throttled=retryable)
+
+                if not retryable or attempt == LLM_MAX_RETRIES:
+                    with self._cond:
+                        self._stats["errors"] += 1
+                    raise
+
+                with self._cond:
+                    self._stats["retries"] += 1
+                logger.warning(
+                    f"[LLM:{self.model}] {_status_code(e) or type(e).__name__} → "
+                    f"{self._cooldown_until - time.monotonic():.1f}초 후 재시도 ({attempt + 1}/{LLM_MAX_RETRIES})"
+                )
+                continue
+
+            self._release(latency=time.monotonic() - started)
+            return result
+
+    def _acquire(self):
+        with self._cond:
+            while True:
+                wait = self._cooldown_until - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                if self._active < int(self._limit):
+                    self._active += 1
+                    break
+                self._cond.wait()
+
+        self._bucket.acquire()
+
+    def _release(self, latency: Optional[float] = None, throttled: bool = False):
+        with self._cond:
+            self._active -= 1
+
+            if throttled:
+                # 429/5xx: 동시성 절반, 백오프 시간 두 배 (같은 모델의 모든 호출이 대기)
+                self._stats["throttled"] += 1
+                self._limit = max(1.0, self._limit / 2)
+                delay = self._backoff * (0.5 + random.random())
+                self._cooldown_until = max(self._cooldown_until, time.monotonic() + delay)
+                self._backoff = min(LLM_BACKOFF_MAX, self._backoff * 2)
+
+            elif latency is not None:
+                self._stats["calls"] += 1
+                self._backoff = LLM_BACKOFF_BASE
+                self._latency_ewma = latency if self._latency_ewma is None else 0.8 * self._latency_ewma + 0.2 * latency
+
+                if latency > LLM_LATENCY_TARGET:
+                    self._limit = max(1.0, self._limit * 0.9)
+                else:
+                    self._limit = min(self._max_limit, self._limit + 1 / self._limit)
+
+            self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                **self._stats,
+                "concurrency_limit": round(self._limit, 2),
+                "active": self._active,
+                "latency_ewma": round(self._latency_ewma, 3) if self._latency_ewma is not None else None,
+                "cooling_down": self._cooldown_until > time.monotonic()
+            }
+
+_http_client: Optional[httpx.Client] = None
+_clients: Dict[tuple, ChatUpstage] = {}
+_guards: Dict[str, ModelGuard] = {}
+_lock = threading.Lock()
+
+def _get_http_client() -> httpx.Client:
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_HTTP_MAX_CONNECTIONS
+            ),
+            timeout=LLM_TIMEOUT
+        )
+    return _http_client
+
+def get_llm(model: Optional[str] = None, temperature: Optional[float] = None) -> ChatUpstage:
+    """
+    모델별 공유 클라이언트
+
+    Args:
+        model: 모델 이름 (None이면 UPSTAGE_MODEL)
+        temperature: None이면 모델 기본값
+
+    Returns:
+        ChatUpstage (재시도는 레지스트리가 하므로 max_retries=0)
+    """
+    model = model or UPSTAGE_MODEL
+    key = (model, temperature)
+
+    with _lock:
+        llm = _clients.get(key)
+        if llm is None:
+            kwargs = {"temperature": temperature} if temperature is not None else {}
+            llm = ChatUpstage(
+                api_key=UPSTAGE_API_KEY,
+                model=model,
+                http_client=_get_http_client(),
+                timeout=LLM_TIMEOUT,
+                max_retries=0,
+                **kwargs
+            )
+            _clients[key] = llm
+            logger.info(f"[LLM] 클라이언트 생성: {model} (temperature={temperature})")
+    return llm
+
+def get_guard(model: str) -> ModelGuard:
+    """모델별 제한기"""
+    with _lock:
+        guard = _guards.get(model)
+        if guard is None:
+            guard = ModelGuard(model, LLM_MODEL_RATES.get(model, LLM_RATE_PER_MIN), LLM_MAX_CONCURRENCY)
+            _guards[model] = guard
+    return guard
+
+def _model_name(llm) -> str:
+    """ChatUpstage 또는 bind_tools 결과(RunnableBinding)의 모델 이름"""
+    return (
+        getattr(llm, "model_name", None)
+        or getattr(getattr(llm, "bound", None), "model_name", None)
+        or UPSTAGE_MODEL
+    )
+
+def invoke_llm(llm, input: Any) -> Any:
+    """
+    llm.invoke(input)를 모델별 속도 제한/동시성/백오프 안에서 실행
+
+    Args:
+        llm: get_llm() 결과 또는 그 bind_tools() 결과
+        input: 프롬프트 문자열 또는 메시지 리스트
+    """
+    return get_guard(_model_name(llm)).call(lambda: llm.invoke(input))
+
+def get_llm_client_stats() -> Dict[str, Any]:
+    """모델별 호출/재시도/동시성 한도"""
+    with _lock:
+        guards = list(_guards.values())
+    return {guard.model: guard.snapshot() for guard in guards}
@@ -0,0 +1,127 @@
+"""
+근사 중복 콘텐츠 탐지 (SimHash + LSH)
+미러/재게시된 글(예: velog 글의 Medium 미러)을 찾아 LLM 분류와 임베딩을 다시 하지 않도록 함
+
+- 본문의 단어 3-shingle로 64비트 SimHash 계산
+- 64비트를 8비트 밴드 8개로 나눠 content_fingerprints 테이블에 인덱싱
+  → 해밍 거리 7 이하인 두 해시는 최소 한 밴드가 같으므로 밴드 일치 후보만 비교하면 됨
+"""
+import re
+import sqlite3
+import hashlib
+from collections import Counter
+from typing import Optional
+from config.settings import DB_PATH, NEAR_DUP_MAX_DISTANCE, NEAR_DUP_MIN_TOKENS
+from utils import logger
+
+_TOKEN_RE = re.compile(r"\w+")
+
+BANDS = 8
+BAND_BITS = 64 // BANDS
+SHINGLE_SIZE = 3
+
+def compute_simhash(text: Optional[str]) -> Optional[int]:
+    """
+    본문의 64비트 SimHash
+
+    Returns:
+        int: 0 ~ 2^64-1, 본문이 너무 짧으면 (NEAR_DUP_MIN_TOKENS 미만) None
+    """
+    if not text:
+        return None
+
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) < NEAR_DUP_MIN_TOKENS:
+        return None
+
+    shingles = Counter(
+        " ".join(tokens[i:i + SHINGLE_SIZE])
+        for i in range(len(tokens) - SHINGLE_SIZE + 1)
+    )
+
+    # 해시마다 64비트를 도는 대신 바이트(8개) 값별로 가중치를 모은 뒤 마지막에 비트로 펼침
+    byte_weights = [[0] * 256 for _ in range(8)]
+    total = 0
+    for shingle, weight in shingles.items():
+        digest = hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest()
+        total += weight
+        for position, value in enumerate(digest):
+            byte_weights[position][value] += weight
+
+    # 비트별 (켜진 해시의 가중치 합) - (꺼진 해시의 가중치 합) > 0 이면 1
+    set_weights = [0] * 64
+    for position, counts in enumerate(byte_weights):
+        base = (7 - position) * 8      # big-endian: 첫 바이트가 최상위 비트
+        for value, weight in enumerate(counts):
+            if weight:
+                for bit in range(8):
+                    if (value >> bit) & 1:
+                        set_weights[base + bit] += weight
+
+    return sum(1 << bit for bit in range(64) if 2 * set_weights[bit] > total)
+
+def _bands(simhash: int) -> list:
+    mask = (1 << BAND_BITS) - 1
+    return [(simhash >> (i * BAND_BITS)) & mask for i in range(BANDS)]
+
+def _to_signed(value: int) -> int:
+    """SQLite INTEGER(부호 있는 64비트)에 맞게 변환"""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+def _to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+def find_near_duplicate(simhash: Optional[int], max_distance: int = NEAR_DUP_MAX_DISTANCE) -> Optional[int]:
+    """
+    근사 중복 활동 찾기
+
+    Args:
+        simhash: compute_simhash 결과
+        max_distance: 허용 해밍 거리 (최대 BANDS - 1 까지 누락 없이 탐지)
+
+    Returns:
+        int: 가장 가까운 활동 ID, 없으면 None
+    """
+    if simhash is None:
+        return None
+
+    bands = _bands(simhash)
+
+    conditions = " OR ".join(f"band{i} = ?" for i in range(BANDS))
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT activity_id, simhash
+        FROM content_fingerprints
+        WHERE {conditions}
+    """, bands)
+    candidates = cursor.fetchall()
+    conn.close()
+
+    best_id, best_distance = None, max_distance + 1
+    for activity_id, candidate in candidates:
+        distance = bin(simhash ^ _to_unsigned(candidate)).count("1")
+        if distance < best_distance:
+            best_id, best_distance = activity_id, distance
+
+    if best_id is not None:
+        logger.debug(f"근사 중복 후보: activity {best_id} (거리 {best_distance})")
+    return best_id
+
+def save_fingerprint(activity_id: int, simhash: Optional[int]) -> None:
+    """활동의 SimHash를 LSH 인덱스에 저장"""
+    if simhash is None:
+        return
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    columns = ", ".join(f"band{i}" for i in range(BANDS))
+    placeholders = ", ".join("?" for _ in range(BANDS))
+    cursor.execute(f"""
+        INSERT OR REPLACE INTO content_fingerprints
+            (activity_id, simhash, {columns})
+        VALUES (?, ?, {placeholders})
+    """, (activity_id, _to_signed(simhash), *_bands(simhash)))
+    conn.commit()
+    conn.close()
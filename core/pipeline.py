@@ -0,0 +1,419 @@
+"""
+단계별 URL 수집 파이프라인
+gate → fetch → extract → classify → persist → embed
+
+각 단계는 자체 워커 수와 크기 제한이 있는 입력 큐를 가지므로 느린 단계가 다른 단계를
+막지 않고, 병목 단계만 따로 늘릴 수 있습니다. 단계별 처리량/큐 길이/지연 히스토그램은
+get_metrics() (또는 API의 /api/metrics)로 확인합니다.
+
+persist가 embed보다 앞에 있는 이유: 벡터 ID(activity_{id})가 DB의 activity_id에서 나오기 때문.
+"""
+import queue
+import threading
+import time
+from typing import Callable, Optional, Dict, Any, List
+from config.settings import (
+    NEAR_DUP_ACTION,
+    PIPELINE_QUEUE_SIZE,
+    PIPELINE_GATE_WORKERS,
+    PIPELINE_FETCH_WORKERS,
+    PIPELINE_CLASSIFY_WORKERS,
+    PIPELINE_CLASSIFY_BATCH,
+    PIPELINE_CLASSIFY_WAIT,
+    PIPELINE_EMBED_BATCH,
+    PIPELINE_EMBED_WAIT,
+    PIPELINE_METRICS_LOG_INTERVAL,
+    EXTRACT_PROCESSES
+)
+from utils import logger
+from .extractor import fetch_page, EXTRACTION_VERSION
+from .extraction_pool import run_parse_html
+from .http_cache import save_extraction
+from .classifier import classify_contents
+from .storage import save_activity
+from .url_index import is_known_url
+from .url_collector import (
+    quick_url_decision,
+    judge_url_with_llm,
+    build_activity_data,
+    find_reusable_classification
+)
+from .vector_store import add_activities_to_vector, ensure_activity_vector
+
+# 단계 워커 종료 신호
+_STOP = object()
+
+# 지연 히스토그램 버킷 상한 (ms)
+LATENCY_BUCKETS_MS = [10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+# 현재 실행 중인 파이프라인 (API 메트릭 조회용)
+_active_pipeline: Optional["IngestPipeline"] = None
+
+class StageMetrics:
+    """단계별 처리 건수와 지연 히스토그램"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self.processed = 0  # 다음 단계로 넘기거나 마지막 단계를 마친 건수
+        self.dropped = 0    # 조건에 맞지 않아 중단 (중복, 저장 불필요, 추출 실패 등)
+        self.failed = 0     # 예외
+        self._buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self._latency_sum = 0.0
+
+    def record(self, outcome: str, seconds: float, count: int = 1):
+        """
+        Args:
+            outcome: 'processed' / 'dropped' / 'failed'
+            seconds: 처리 시간 (배치는 배치 전체 시간)
+            count: 처리한 항목 수
+        """
+        ms = seconds * 1000
+        index = next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if ms <= bound), len(LATENCY_BUCKETS_MS))
+
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + count)
+            self._buckets[index] += 1
+            self._latency_sum += ms
+
+    def _percentile(self, p: float) -> Optional[int]:
+        """버킷 상한 기준 근사 백분위 (ms)"""
+        total = sum(self._buckets)
+        if total == 0:
+            return None
+
+        cumulative = 0
+        for i, count in enumerate(self._buckets):
+            cumulative += count
+            if cumulative >= total * p:
+                return LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else None
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = sum(self._buckets)
+            elapsed_min = (time.monotonic() - self._started) / 60
+            labels = [f"<={b}ms" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+
+            return {
+                "processed": self.processed,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "throughput_per_min": round((self.processed + self.dropped) / elapsed_min, 2) if elapsed_min else 0,
+                "avg_latency_ms": round(self._latency_sum / calls) if calls else None,
+                "p50_ms": self._percentile(0.5),
+                "p95_ms": self._percentile(0.95),
+                "histogram": dict(zip(labels, self._buckets))
+            }
+
+class Stage:
+    """
+    파이프라인 단계 하나: 입력 큐 + 워커 스레드
+
+    fn은 ctx(dict)를 받아 다음 단계로 넘길 ctx를 반환하고, None을 반환하면 해당 작업을 종료합니다.
+    batch_size > 1 이면 fn은 ctx 리스트를 받아 같은 길이의 리스트를 반환합니다.
+    결과가 Exception 인스턴스인 항목은 해당 작업만 실패로 끝납니다 (on_done에 예외 전달).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable,
+        workers: int = 1,
+        queue_size: int = PIPELINE_QUEUE_SIZE,
+        batch_size: int = 1,
+        batch_wait: float = 0.0
+    ):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.metrics = StageMetrics()
+        self.next_stage: Optional["Stage"] = None
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"pipeline-{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """큐에 남은 작업을 모두 처리한 뒤 워커 종료"""
+        for _ in self._threads:
+            self.queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _next_batch(self):
+        """
+        Returns:
+            (batch, stopping): 처리할 (ctx, on_done) 목록과 종료 신호 수신 여부
+        """
+        entry = self.queue.get()
+        if entry is _STOP:
+            return [], True
+
+        batch = [entry]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                entry = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                return batch, True
+            batch.append(entry)
+
+        return batch, False
+
+    def _run(self):
+        while True:
+            batch, stopping = self._next_batch()
+            if batch:
+                self._handle(batch)
+            if stopping:
+                return
+
+    def _handle(self, batch):
+        ctxs = [ctx for ctx, _ in batch]
+        started = time.monotonic()
+
+        try:
+            results = self.fn(ctxs) if self.batch_size > 1 else [self.fn(ctxs[0])]
+
+        except Exception as e:
+            self.metrics.record('failed', time.monotonic() - started, len(batch))
+            logger.error(f"[Pipeline:{self.name}] 처리 실패: {e}", exc_info=True)
+            for _, on_done in batch:
+                on_done(e)
+            return
+
+        elapsed = time.monotonic() - started
+        for (_, on_done), result in zip(batch, results):
+            if isinstance(result, Exception):
+                self.metrics.record('failed', elapsed)
+                on_done(result)
+            elif result is None:
+                self.metrics.record('dropped', elapsed)
+                on_done(None)
+            elif self.next_stage is None:
+                self.metrics.record('processed', elapsed)
+                on_done(None)
+            else:
+                self.metrics.record('processed', elapsed)
+                self.next_stage.queue.put((result, on_done))  # 다음 단계가 밀리면 여기서 대기 (backpressure)
+
+class IngestPipeline:
+    """URL 수집 파이프라인"""
+
+    def __init__(self, vectorstore):
+        self._vectorstore = vectorstore
+
+        self._stages = [
+            Stage("gate", self._gate, workers=PIPELINE_GATE_WORKERS),
+            Stage("fetch", self._fetch, workers=PIPELINE_FETCH_WORKERS),
+            Stage("extract", self._extract, workers=max(1, EXTRACT_PROCESSES)),
+            Stage(
+                "classify",
+                self._classify,
+                workers=PIPELINE_CLASSIFY_WORKERS,
+                batch_size=PIPELINE_CLASSIFY_BATCH,
+                batch_wait=PIPELINE_CLASSIFY_WAIT
+            ),
+            Stage("persist", self._persist, workers=1),
+            Stage(
+                "embed",
+                self._embed,
+                workers=1,
+                batch_size=PIPELINE_EMBED_BATCH,
+                batch_wait=PIPELINE_EMBED_WAIT
+            ),
+        ]
+        for stage, next_stage in zip(self._stages, self._stages[1:]):
+            stage.next_stage = next_stage
+
+        self._stop_event = threading.Event()
+
+    # ---------- 수명 주기 ----------
+
+    def start(self):
+        global _active_pipeline
+
+        for stage in self._stages:
+            stage.start()
+
+        threading.Thread(target=self._log_metrics_loop, name="pipeline-metrics", daemon=True).start()
+
+        _active_pipeline = self
+        logger.info(f"[Pipeline] 시작: {' → '.join(f'{s.name}({s.workers})' for s in self._stages)}")
+
+    def stop(self):
+        """앞 단계부터 차례로 비우며 종료"""
+        global _active_pipeline
+
+        self._stop_event.set()
+        for stage in self._stages:
+            stage.stop()
+
+        if _active_pipeline is self:
+            _active_pipeline = None
+        logger.info("[Pipeline] 종료")
+
+    def submit(self, data: Dict[str, Any], on_done: Callable[[Optional[Exception]], None]):
+        """
+        작업 투입 (첫 단계 큐가 가득 차면 대기)
+
+        Args:
+            data: {'url', 'title', ...}
+            on_done: 작업이 끝나면 호출됨. 정상 종료(저장/건너뜀)는 None, 실패는 예외 객체
+        """
+        ctx = {'url': data['url'], 'title': data.get('title', '')}
+        self._stages[0].queue.put((ctx, on_done))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """단계별 메트릭"""
+        return {
+            stage.name: {
+                "workers": stage.workers,
+                "queue_depth": stage.queue.qsize(),
+                **stage.metrics.snapshot()
+            }
+            for stage in self._stages
+        }
+
+    def _log_metrics_loop(self):
+        while not self._stop_event.wait(PIPELINE_METRICS_LOG_INTERVAL):
+            metrics = self.get_metrics()
+            if not any(m['processed'] or m['dropped'] or m['failed'] for m in metrics.values()):
+                continue
+
+            logger.info("[Pipeline] " + " | ".join(
+                f"{name}: q={m['queue_depth']} ok={m['processed']} drop={m['dropped']} "
+                f"fail={m['failed']} p50={m['p50_ms']}ms p95={m['p95_ms']}ms"
+                for name, m in metrics.items()
+            ))
+
+    # ---------- 단계 ----------
+
+    def _gate(self, ctx):
+        """중복 확인 (LLM 호출 전) + 저장 여부 판단 (LLM)"""
+        if is_known_url(ctx['url']):
+            # 저장 후 임베딩에 실패해 재시도된 작업이면 벡터만 다시 저장
+            if not ensure_activity_vector(self._vectorstore, ctx['url']):
+                raise RuntimeError(f"벡터 db 저장 실패: {ctx['url']}")
+            logger.info(f"[SKIP] DB에 이미 존재 : {ctx['url']}")
+            return None
+
+        # 키워드 필터/판단 캐시/로컬 모델로 결정되지 않을 때만 LLM 호출 (다른 워커 요청과 배치로 묶임)
+        decision = quick_url_decision(ctx['url'], ctx['title'])
+        if decision is None:
+            decision = judge_url_with_llm(ctx['url'], ctx['title'])
+        if not decision['should_save']:
+            logger.info(f"저장 건너뜀: {decision['reason']}")
+            return None
+
+        return ctx
+
+    def _fetch(self, ctx):
+        """HTML 다운로드 (I/O 스레드)"""
+        page = fetch_page(ctx['url'])
+        if page is None:
+            logger.info(f"다운로드 실패: {ctx['url']}")
+            return None
+
+        ctx['html'] = page['html']
+        ctx['cached_extraction'] = page['extracted']
+        return ctx
+
+    def _extract(self, ctx):
+        """본문/메타데이터 추출 (프로세스 풀, GIL 우회)"""
+        html = ctx.pop('html')
+        extracted = ctx.pop('cached_extraction', None)   # 본문이 바뀌지 않았으면 HTTP 캐시의 추출 결과
+
+        if extracted is None:
+            extracted = run_parse_html(ctx['url'], html)
+            if extracted:
+                save_extraction(ctx['url'], extracted, EXTRACTION_VERSION)
+
+        # 본문이 없으면 분류/임베딩할 내용이 없으므로 제목이 없을 때처럼 건너뜀
+        if not extracted or extracted['title'] is None or not extracted['content']:
+            logger.info(f"추출 내용 없음: {ctx['url']}")
+            return None
+
+        ctx['extracted'] = extracted
+        return ctx
+
+    def _classify(self, ctxs):
+        """카테고리/태그/요약 생성 (배치 단위로 LLM 호출, 근사 중복이면 기존 결과 재사용)"""
+        results = list(ctxs)
+        pending = []
+
+        for i, ctx in enumerate(ctxs):
+            reused = find_reusable_classification(ctx['extracted'])
+            if reused is None:
+                pending.append(i)
+            elif NEAR_DUP_ACTION == 'skip':
+                logger.info(f"[SKIP] 근사 중복 글: {ctx['url']}")
+                results[i] = None
+            else:
+                ctx['classified'] = reused
+
+        if pending:
+            classified = classify_contents([
+                {'title': ctxs[i]['extracted']['title'], 'content': ctxs[i]['extracted']['content']}
+                for i in pending
+            ])
+            for i, result in zip(pending, classified):
+                ctxs[i]['classified'] = result
+
+        return results
+
+    def _persist(self, ctx):
+        """SQLite 저장"""
+        activity_data = build_activity_data(ctx['url'], ctx['extracted'], ctx['classified'])
+        activity_id = save_activity(data=activity_data)
+        if activity_id is None:
+            return None
+
+        ctx['activity_id'] = activity_id
+        logger.info(f"저장 완료: {ctx['extracted']['title']}")
+        return ctx
+
+    def _embed(self, ctxs):
+        """
+        벡터 db 저장 (쓰기 큐에서 다른 저장과 묶여 임베딩, 근사 중복은 원본 벡터로 검색되므로 제외)
+        저장에 실패한 활동은 예외로 돌려줘 작업이 nack 되도록
+        """
+        results = list(ctxs)
+        pending = [i for i, ctx in enumerate(ctxs) if not ctx['classified'].get('near_duplicate_of')]
+
+        saved = add_activities_to_vector(self._vectorstore, [
+            {
+                'activity_id': ctxs[i]['activity_id'],
+                'content': ctxs[i]['extracted']['content'],
+                'metadata': {
+                    'title': ctxs[i]['extracted']['title'],
+                    'category': ctxs[i]['classified']['category'],
+                    'url': ctxs[i]['url']
+                }
+            }
+            for i in pending
+        ])
+        for i, ok in zip(pending, saved):
+            if not ok:
+                results[i] = RuntimeError(f"벡터 db 저장 실패: activity_{ctxs[i]['activity_id']}")
+
+        return results
+
+def get_pipeline_metrics() -> Dict[str, Any]:
+    """실행 중인 파이프라인의 메트릭 (없으면 빈 dict)"""
+    if _active_pipeline is None:
+        return {}
+    return _active_pipeline.get_metrics()
@@ -0,0 +1,174 @@
+"""
+소스 유형 분류 규칙 엔진 (detect_source_type)
+규칙은 core/source_rules.json에 두고, 처음 사용할 때 한 번만 컴파일합니다.
+
+- 도메인: 라벨을 뒤집은 접미사 트라이 (com → youtube → 'video')
+  → 호스트 라벨 수만큼만 탐색, 가장 긴(구체적인) 접미사가 우선 (news.naver.com은 naver.com 규칙보다 우선)
+  → 부분 문자열이 아니라 라벨 경계로 비교 (예: 'api.'가 호스트 중간에 있어도 매칭되지 않음)
+- 첫 라벨: docs.*, developer.* 처럼 호스트의 맨 앞 라벨로 판단하는 규칙 (도메인 규칙이 없을 때)
+- 경로: 유형별 정규식을 우선순위 순서로 하나의 정규식으로 합쳐 '호스트 + 경로'에 한 번 적용
+- 도메인 결과와 경로 결과 중 order에서 앞선 유형 사용, 둘 다 없으면 default
+
+사용자 규칙: SOURCE_RULES_PATH의 JSON (같은 형식)이 있으면 기본 규칙 위에 덧붙입니다.
+같은 도메인이면 사용자 규칙이 우선하고, order/default를 지정하면 덮어씁니다.
+"""
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+from config.settings import SOURCE_RULES_PATH
+from utils import logger
+
+DEFAULT_RULES_PATH = Path(__file__).with_name("source_rules.json")
+
+_URL_RE = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.\-]*://([^/?#]*)([^?#]*)")
+_TYPE = "$"                     # 트라이 노드에서 유형을 저장하는 키 (라벨에는 '$'가 없음)
+_SKIP_FIRST_LABELS = ("www", "m")
+
+class SourceRules:
+    """컴파일된 소스 유형 규칙"""
+
+    def __init__(self, layers: List[Dict[str, Any]]):
+        self.order: List[str] = []
+        self.default = "article"
+        self._trie: Dict[str, Any] = {}
+        self._first_labels: Dict[str, str] = {}
+        patterns: Dict[str, List[str]] = {}
+
+        # 기본 규칙 → 사용자 규칙 순서로 적용 (뒤의 규칙이 같은 도메인을 덮어씀)
+        for layer in layers:
+            self.order = list(layer.get("order", self.order))
+            self.default = layer.get("default", self.default)
+
+            for source_type, rules in layer.get("types", {}).items():
+                if source_type not in self.order:
+                    self.order.append(source_type)
+                for domain in rules.get("domains", []):
+                    self._add_domain(domain, source_type)
+                for label in rules.get("first_labels", []):
+                    self._first_labels[label.lower()] = source_type
+                patterns.setdefault(source_type, []).extend(rules.get("patterns", []))
+
+        self._rank = {source_type: i for i, source_type in enumerate(self.order)}
+
+        # 유형별 대안을 order 순서로 나열 → 앞의 대안이 먼저 시도되므로 매칭된 그룹이 가장 앞선 유형
+        alternatives, self._group_types = [], {}
+        for i, source_type in enumerate(self.order):
+            if patterns.get(source_type):
+                group = f"t{i}"
+                self._group_types[group] = source_type
+                alternatives.append(f"(?P<{group}>.*?(?:{'|'.join(patterns[source_type])}))")
+        self._pattern = re.compile(f"^(?:{'|'.join(alternatives)})") if alternatives else None
+
+    def _add_domain(self, domain: str, source_type: str):
+        node = self._trie
+        for label in reversed(domain.lower().strip(".").split(".")):
+            node = node.setdefault(label, {})
+        node[_TYPE] = source_type
+
+    def domain_type(self, host: str) -> Optional[str]:
+        """호스트의 도메인 규칙 유형 (가장 긴 접미사 → 첫 라벨 순), 없으면 None"""
+        labels = host.split(".")
+
+        node, found = self._trie, None
+        for label in reversed(labels):
+            node = node.get(label)
+            if node is None:
+                break
+            found = node.get(_TYPE, found)
+        if found is not None:
+            return found
+
+        while len(labels) > 2 and labels[0] in _SKIP_FIRST_LABELS:
+            labels = labels[1:]
+        return self._first_labels.get(labels[0]) if len(labels) > 2 else None
+
+    def classify(self, host: str, path: str, domain_type: Optional[str] = None) -> str:
+        """정규화된 호스트/경로의 유형 (domain_type을 이미 구했으면 전달)"""
+        best = domain_type
+        if self._pattern is not None and self._rank.get(best, len(self.order)) > 0:
+            match = self._pattern.match(host + path)
+            if match is not None:
+                pattern_type = self._group_types[match.lastgroup]
+                if best is None or self._rank[pattern_type] < self._rank[best]:
+                    best = pattern_type
+        return best or self.default
+
+def _split_url(url: str):
+    """URL → (호스트, 경로) 소문자, 포트/사용자 정보 제거 (http(s) 형식이 아니면 None)"""
+    match = _URL_RE.match(url.strip())
+    if match is None:
+        return None
+    host = match.group(1).rpartition("@")[2].lower()
+    if not host.startswith("["):
+        host = host.partition(":")[0]
+    return host.rstrip("."), match.group(2).lower()
+
+def _read_rules(path: Path) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+@lru_cache(maxsize=1)
+def get_source_rules() -> SourceRules:
+    """기본 규칙 + 사용자 규칙 파일을 컴파일 (처음 한 번)"""
+    layers = [_read_rules(DEFAULT_RULES_PATH)]
+
+    if SOURCE_RULES_PATH.exists():
+        try:
+            user_rules = _read_rules(SOURCE_RULES_PATH)
+            rules = SourceRules(layers + [user_rules])
+            logger.info(f"소스 유형 규칙 로드: {SOURCE_RULES_PATH}")
+            return rules
+        except (json.JSONDecodeError, OSError, AttributeError, TypeError, re.error) as e:
+            logger.error(f"소스 유형 사용자 규칙 로드 실패, 기본값 사용: {e}")
+
+    return SourceRules(layers)
+
+def reload_source_rules():
+    """규칙 파일을 수정한 뒤 다시 컴파일"""
+    get_source_rules.cache_clear()
+
+def classify_url(url: str) -> str:
+    """
+    URL의 소스 유형
+
+    Returns:
+        'video', 'blog', 'docs', 'news', 'forum' (규칙 파일의 유형) 또는 default('article')
+    """
+    rules = get_source_rules()
+    parts = _split_url(url)
+    if parts is None:
+        return rules.default
+
+    host, path = parts
+    return rules.classify(host, path, rules.domain_type(host))
+
+def classify_urls(urls: Iterable[str]) -> List[str]:
+    """
+    여러 URL의 소스 유형 (방문 기록 가져오기 등 대량 처리용, 같은 호스트의 도메인 조회는 한 번만)
+
+    Args:
+        urls: URL 이터러블
+
+    Returns:
+        urls 순서대로 classify_url과 같은 결과
+    """
+    rules = get_source_rules()
+    domain_types: Dict[str, Optional[str]] = {}
+    results = []
+
+    for url in urls:
+        parts = _split_url(url)
+        if parts is None:
+            results.append(rules.default)
+            continue
+
+        host, path = parts
+        if host in domain_types:
+            domain_type = domain_types[host]
+        else:
+            domain_type = domain_types[host] = rules.domain_type(host)
+        results.append(rules.classify(host, path, domain_type))
+
+    return results
@@ -3,12 +3,16 @@
 """
 import sqlite3
 import json
+import hashlib
 from pathlib import Path
 from datetime import datetime, timedelta
 from config.settings import DB_PATH
 from utils import logger
 from typing import Optional, Dict, List, Any
 from .classifier import classify_content
+from .url_index import remember_url, forget_url
+from .url_canonical import canonicalize_url
+from .near_duplicate import save_fingerprint
 
 def init_db():
     """데이터베이스 초기화"""
@@ -20,15 +24,20 @@ def init_db():
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
+    # WAL 모드 (API 스레드의 큐 쓰기와 소비자 읽기가 서로 막지 않도록, DB 파일에 영구 적용)
+    cursor.execute("PRAGMA journal_mode=WAL")
+
     # 테이블 생성
     cursor.executescript("""
         -- 메인 활동 테이블
         CREATE TABLE IF NOT EXISTS browsing_activity (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,  -- 마지막 수정 (트리거로 갱신, 일별 요약/브리핑 변경 감지용)
             
             -- URL 정보
             url TEXT NOT NULL UNIQUE,
+            canonical_url TEXT,  -- 정규화 URL (중복 판단용, core/url_canonical.py)
             domain TEXT,
                          
             -- 메타데이터 
@@ -70,11 +79,23 @@ def init_db():
             period_end DATE,        -- 종료 날짜
             content TEXT,           -- Markdown 형식
             activity_count INTEGER, -- 포함된 활동 수
-            metadata TEXT           -- JSON, 통계 등
+            metadata TEXT,          -- JSON, 통계 등
+            fingerprint TEXT        -- 기간 + 포함 활동 (id, updated_at) 해시 (같으면 재사용)
         );
                          
         CREATE INDEX IF NOT EXISTS idx_briefing_created 
             ON briefing_history(created_at);
+
+        -- 일별 요약 (브리핑 map 단계 결과, core/briefing.py)
+        CREATE TABLE IF NOT EXISTS daily_digests (
+            day DATE PRIMARY KEY,
+            summary TEXT NOT NULL,   -- 그날 활동 요약 (Markdown)
+            activity_count INTEGER,
+            category_counts TEXT,    -- JSON {카테고리: 수}
+            top_tags TEXT,           -- JSON [[태그, 수], ...]
+            source_hash TEXT,        -- 그날 활동들의 (id, updated_at) 해시 (바뀌면 다시 생성)
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
                     
         -- 사용자 설정 
         CREATE TABLE IF NOT EXISTS user_settings (
@@ -82,22 +103,193 @@ def init_db():
             value TEXT,
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
+
+        -- 본문 SimHash LSH 인덱스 (core/near_duplicate.py)
+        CREATE TABLE IF NOT EXISTS content_fingerprints (
+            activity_id INTEGER PRIMARY KEY,  -- browsing_activity.id
+            simhash INTEGER NOT NULL,         -- 64비트 SimHash (부호 있는 정수로 저장)
+            band0 INTEGER NOT NULL,           -- 8비트 밴드 8개
+            band1 INTEGER NOT NULL,
+            band2 INTEGER NOT NULL,
+            band3 INTEGER NOT NULL,
+            band4 INTEGER NOT NULL,
+            band5 INTEGER NOT NULL,
+            band6 INTEGER NOT NULL,
+            band7 INTEGER NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_fingerprint_band0 ON content_fingerprints(band0);
+        CREATE INDEX IF NOT EXISTS idx_fingerprint_band1 ON content_fingerprints(band1);
+        CREATE INDEX IF NOT EXISTS idx_fingerprint_band2 ON content_fingerprints(band2);
+        CREATE INDEX IF NOT EXISTS idx_fingerprint_band3 ON content_fingerprints(band3);
+        CREATE INDEX IF NOT EXISTS idx_fingerprint_band4 ON content_fingerprints(band4);
+        CREATE INDEX IF NOT EXISTS idx_fingerprint_band5 ON content_fingerprints(band5);
+        CREATE INDEX IF NOT EXISTS idx_fingerprint_band6 ON content_fingerprints(band6);
+        CREATE INDEX IF NOT EXISTS idx_fingerprint_band7 ON content_fingerprints(band7);
+
+        -- URL 저장 여부 판단 캐시 (core/decision_cache.py)
+        CREATE TABLE IF NOT EXISTS url_decisions (
+            pattern TEXT PRIMARY KEY,                 -- host 또는 host/경로패턴
+            save_count INTEGER NOT NULL DEFAULT 0,
+            skip_count INTEGER NOT NULL DEFAULT 0,
+            override INTEGER,                         -- 수동 지정: 1 저장 / 0 건너뜀 / NULL 자동
+            last_reason TEXT,
+            updated_at REAL NOT NULL                  -- epoch
+        );
+
+        -- LLM이 저장하지 않기로 한 URL (이전 버전의 gate_model 학습 데이터, gate_labels로 옮겨짐)
+        CREATE TABLE IF NOT EXISTS url_rejections (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            url TEXT NOT NULL,
+            title TEXT,
+            reason TEXT
+        );
+
+        -- URL 수집 큐 (core/ingest_queue.py)
+        CREATE TABLE IF NOT EXISTS ingest_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            url TEXT NOT NULL,
+            payload TEXT,                             -- JSON, 확장에서 받은 원본 데이터
+            status TEXT NOT NULL DEFAULT 'pending',   -- pending / leased / failed
+            attempts INTEGER NOT NULL DEFAULT 0,
+            available_at REAL NOT NULL,               -- epoch, 이 시각 이후 lease 가능
+            lease_until REAL,                         -- epoch, lease 만료 시각
+            lease_token TEXT,                         -- 현재 lease 소유자 (ack/nack/release 검증용)
+            last_error TEXT
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_ingest_jobs_status
+            ON ingest_jobs(status, available_at);
+
+        CREATE INDEX IF NOT EXISTS idx_ingest_jobs_url
+            ON ingest_jobs(url);
     """)
 
+    _migrate_db(cursor)
+
     conn.commit()
     conn.close()
 
     logger.info(f"데이터 베이스 생성 완료: {DB_PATH}")
 
+def _migrate_db(cursor: sqlite3.Cursor):
+    """기존 DB에 새 컬럼/인덱스 추가"""
+    tables = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+    # 저장 판단 로컬 모델 학습 데이터: LLM/사용자가 내린 판단만 (모델/캐시가 스스로 통과시킨 글 제외)
+    # 테이블을 처음 만들 때 이미 저장된 활동은 모두 LLM 판단을 거쳐 저장됐으므로 저장(1)으로 채움
+    # (판단 캐시/로컬 모델이 생긴 뒤 저장된 활동은 그 판단을 스스로 강화하므로 이후에는 gate_labels에만 기록)
+    # 이전 활동에는 탭 제목이 없어 추출한 제목으로 대신함
+    if 'gate_labels' not in tables:
+        cursor.executescript("""
+            CREATE TABLE gate_labels (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                url TEXT NOT NULL,
+                title TEXT,            -- 판단할 때 받은 탭 제목 (추출한 제목 아님)
+                should_save INTEGER NOT NULL,
+                source TEXT NOT NULL,  -- 'llm' / 'user'
+                reason TEXT
+            );
+
+            INSERT INTO gate_labels (created_at, url, title, should_save, source, reason)
+            SELECT created_at, url, title, 1, 'llm', NULL FROM browsing_activity ORDER BY id;
+
+            INSERT INTO gate_labels (created_at, url, title, should_save, source, reason)
+            SELECT created_at, url, title, 0, 'llm', reason FROM url_rejections ORDER BY id;
+        """)
+
+    # ingest_jobs.lease_token 추가
+    job_columns = {row[1] for row in cursor.execute("PRAGMA table_info(ingest_jobs)")}
+    if 'lease_token' not in job_columns:
+        logger.info("마이그레이션: ingest_jobs.lease_token 추가")
+        cursor.execute("ALTER TABLE ingest_jobs ADD COLUMN lease_token TEXT")
+
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(browsing_activity)")}
+
+    # canonical_url 추가 + 기존 행 채우기
+    if 'canonical_url' not in columns:
+        logger.info("마이그레이션: browsing_activity.canonical_url 추가")
+        cursor.execute("ALTER TABLE browsing_activity ADD COLUMN canonical_url TEXT")
+        _backfill_canonical_urls(cursor)
+
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_canonical_url
+            ON browsing_activity(canonical_url)
+    """)
+
+    # updated_at 추가 (ALTER TABLE은 CURRENT_TIMESTAMP 기본값을 못 쓰므로 트리거로 채움)
+    if 'updated_at' not in columns:
+        logger.info("마이그레이션: browsing_activity.updated_at 추가")
+        cursor.execute("ALTER TABLE browsing_activity ADD COLUMN updated_at TIMESTAMP")
+        cursor.execute("UPDATE browsing_activity SET updated_at = created_at")
+
+    cursor.executescript("""
+        CREATE TRIGGER IF NOT EXISTS trg_activity_inserted
+        AFTER INSERT ON browsing_activity
+        WHEN NEW.updated_at IS NULL
+        BEGIN
+            UPDATE browsing_activity SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_activity_updated
+        AFTER UPDATE OF title, content, summary, category, tags, source_type, metadata ON browsing_activity
+        BEGIN
+            UPDATE browsing_activity SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+        END;
+    """)
+
+    # briefing_history.fingerprint 추가
+    briefing_columns = {row[1] for row in cursor.execute("PRAGMA table_info(briefing_history)")}
+    if 'fingerprint' not in briefing_columns:
+        logger.info("마이그레이션: briefing_history.fingerprint 추가")
+        cursor.execute("ALTER TABLE briefing_history ADD COLUMN fingerprint TEXT")
+
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_briefing_fingerprint
+            ON briefing_history(fingerprint)
+    """)
+
+    # daily_digests 통계 컬럼 추가
+    digest_columns = {row[1] for row in cursor.execute("PRAGMA table_info(daily_digests)")}
+    for column in ('category_counts', 'top_tags'):
+        if column not in digest_columns:
+            cursor.execute(f"ALTER TABLE daily_digests ADD COLUMN {column} TEXT")
+
+def _backfill_canonical_urls(cursor: sqlite3.Cursor):
+    """
+    기존 행의 canonical_url 채우기
+    정규화 후 겹치는 행은 가장 먼저 저장된 행만 canonical_url을 갖고, 나머지는 NULL로 둠
+    """
+    rows = cursor.execute("SELECT id, url FROM browsing_activity ORDER BY id").fetchall()
+
+    seen = set()
+    duplicates = 0
+    for activity_id, url in rows:
+        canonical = canonicalize_url(url)
+        if canonical in seen:
+            duplicates += 1
+            continue
+
+        seen.add(canonical)
+        cursor.execute(
+            "UPDATE browsing_activity SET canonical_url = ? WHERE id = ?",
+            (canonical, activity_id)
+        )
+
+    logger.info(f"canonical_url 채움: {len(seen)}개 (중복 {duplicates}개)")
+
 def check_existing_activity(url: str) -> Optional[int]:
-    """URL이 DB에 있는지 확인하고 ID 반환"""
+    """URL(정규화 기준)이 DB에 있는지 확인하고 ID 반환"""
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
 
     # 중복 체크
     cursor.execute(
-        "SELECT id FROM browsing_activity WHERE url = ?",
-        (url,)
+        "SELECT id FROM browsing_activity WHERE canonical_url = ? OR url = ?",
+        (canonicalize_url(url), url)
     )
     existing = cursor.fetchone()
     conn.close()
@@ -125,11 +317,12 @@ def save_activity(data: Dict[str, Any]) -> Optional[int]:
     try:
         cursor.execute("""
             INSERT INTO browsing_activity 
-               (url, domain, title, content, summary, author, publish_date,
+               (url, canonical_url, domain, title, content, summary, author, publish_date,
                 category, tags, source_type, metadata)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (
             data['url'],
+            canonicalize_url(data['url']),
             data.get('domain'),
             data.get('title'),
             data.get('content'),
@@ -144,6 +337,11 @@ def save_activity(data: Dict[str, Any]) -> Optional[int]:
 
         conn.commit()
         activity_id = cursor.lastrowid
+        remember_url(data['url'])
+
+        # 근사 중복 탐지용 지문 (다른 글의 사본으로 저장된 경우 제외)
+        if not data.get('metadata', {}).get('near_duplicate_of'):
+            save_fingerprint(activity_id, data.get('simhash'))
 
         logger.info(f"[OK] 저장 완료: ID {activity_id}")
 
@@ -238,7 +436,8 @@ def save_briefing(
     period_end: str,
     content: str,
     activity_count: int,
-    metadata: dict = None
+    metadata: dict = None,
+    fingerprint: str = None
 ) -> int:
     """브리핑 저장"""
     conn = sqlite3.connect(DB_PATH)
@@ -248,9 +447,9 @@ def save_briefing(
     try:
         cursor.execute("""
             INSERT INTO briefing_history
-            (period_start, period_end, content, activity_count, metadata)
-            VALUES (?, ?, ?, ?, ?)
-        """, (period_start, period_end, content, activity_count, metadata_json))
+            (period_start, period_end, content, activity_count, metadata, fingerprint)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (period_start, period_end, content, activity_count, metadata_json, fingerprint))
     except Exception as e:
         logger.error(f"브리핑 저장 실패: {e}")
     conn.commit()
@@ -284,6 +483,141 @@ def get_briefings(limit: int = 10) -> List[Dict[str, Any]]:
 
     return briefings
 
+def find_briefing_by_fingerprint(fingerprint: str) -> Optional[Dict[str, Any]]:
+    """입력(기간 + 활동)이 같은 가장 최근 브리핑"""
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT *
+        FROM briefing_history
+        WHERE fingerprint = ?
+        ORDER BY created_at DESC
+        LIMIT 1
+    """, (fingerprint,))
+    row = cursor.fetchone()
+    conn.close()
+
+    if row is None:
+        return None
+
+    briefing = dict(row)
+    briefing['metadata'] = json.loads(briefing['metadata']) if briefing['metadata'] else {}
+    return briefing
+
+def get_daily_digests(days: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    일별 요약 조회
+
+    Args:
+        days: ['YYYY-MM-DD', ...]
+
+    Returns:
+        {day: {'day', 'summary', 'activity_count', 'category_counts', 'top_tags', 'source_hash', 'created_at'}}
+    """
+    if not days:
+        return {}
+
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute(
+        f"SELECT * FROM daily_digests WHERE day IN ({', '.join('?' for _ in days)})",
+        days
+    )
+    rows = cursor.fetchall()
+    conn.close()
+
+    digests = {}
+    for row in rows:
+        digest = dict(row)
+        digest['category_counts'] = json.loads(digest['category_counts']) if digest['category_counts'] else {}
+        digest['top_tags'] = json.loads(digest['top_tags']) if digest['top_tags'] else []
+        digests[digest['day']] = digest
+
+    return digests
+
+def save_daily_digest(
+    day: str,
+    summary: str,
+    activity_count: int,
+    category_counts: Dict[str, int],
+    top_tags: List[List[Any]],
+    source_hash: str
+) -> None:
+    """일별 요약 저장 (같은 날이면 덮어씀)"""
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT OR REPLACE INTO daily_digests
+            (day, summary, activity_count, category_counts, top_tags, source_hash, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    """, (
+        day,
+        summary,
+        activity_count,
+        json.dumps(category_counts, ensure_ascii=False),
+        json.dumps(top_tags, ensure_ascii=False),
+        source_hash
+    ))
+    conn.commit()
+    conn.close()
+
+def get_daily_activity_signatures(start_day: str) -> Dict[str, Dict[str, Any]]:
+    """
+    start_day 이후 날짜별 활동 수와 (id, updated_at) 해시 (본문은 읽지 않음)
+
+    Returns:
+        {day: {'count': int, 'signature': str}}
+    """
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT substr(created_at, 1, 10) AS day, id, updated_at
+        FROM browsing_activity
+        WHERE created_at >= ?
+        ORDER BY day, id
+    """, (start_day,))
+    rows = cursor.fetchall()
+    conn.close()
+
+    grouped = {}
+    for day, activity_id, updated_at in rows:
+        grouped.setdefault(day, []).append(f"{activity_id}:{updated_at}")
+
+    return {
+        day: {
+            'count': len(items),
+            'signature': hashlib.sha256("|".join(items).encode('utf-8')).hexdigest()
+        }
+        for day, items in grouped.items()
+    }
+
+def get_activities_by_day(day: str) -> List[Dict[str, Any]]:
+    """하루 활동 조회 (일별 요약용, 본문 제외)"""
+    next_day = (datetime.fromisoformat(day) + timedelta(days=1)).date().isoformat()
+
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT id, created_at, updated_at, title, summary, category, tags
+        FROM browsing_activity
+        WHERE created_at >= ? AND created_at < ?
+        ORDER BY created_at
+    """, (day, next_day))
+    rows = cursor.fetchall()
+    conn.close()
+
+    activities = []
+    for row in rows:
+        activity = dict(row)
+        activity['created_at'] = activity['created_at'].split(' ')[0]
+        activity['tags'] = json.loads(activity['tags']) if activity['tags'] else []
+        activities.append(activity)
+
+    return activities
+
 def get_activities_for_briefing(days: int=7) -> List[Dict[str, Any]]:
     """
     브리핑 생성을 위해 최근 활동 데이터 조회
@@ -375,6 +709,44 @@ def search_by_keyword(keyword: str, limit: int = 10) -> List[Dict[str, Any]]:
     logger.info(f"검색 완료: '{keyword}' - {len(activities)}개 결과")
     return activities
 
+def get_activities_for_indexing(after_id: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+    """
+    벡터 db 재구축용 활동 조회 (ID 순)
+
+    Args:
+        after_id: 이 ID 다음부터 조회 (이전 페이지의 마지막 ID)
+        limit: 최대 개수
+
+    Returns:
+        [{'id', 'url', 'title', 'category', 'content', 'near_duplicate_of'}, ...]
+        near_duplicate_of: 근사 중복 사본이면 원본 활동 ID, 아니면 None
+    """
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    # 원본이 이미 없는 사본은 사본으로 보지 않음 (원본 삭제 전에 저장된 데이터)
+    cursor.execute("""
+        SELECT a.id, a.url, a.title, a.category, a.content, a.metadata,
+               o.id AS original_id
+        FROM browsing_activity a
+        LEFT JOIN browsing_activity o
+            ON o.id = json_extract(a.metadata, '$.near_duplicate_of')
+        WHERE a.id > ?
+        ORDER BY a.id
+        LIMIT ?
+    """, (after_id, limit))
+    rows = cursor.fetchall()
+    conn.close()
+
+    activities = []
+    for row in rows:
+        activity = dict(row)
+        activity.pop('metadata')
+        activity['near_duplicate_of'] = activity.pop('original_id')
+        activities.append(activity)
+
+    return activities
+
 def get_activity_by_id(activity_id: int) -> Optional[Dict[str, Any]]:
     """ID로 활동 조회"""
     conn = sqlite3.connect(DB_PATH)
@@ -455,10 +827,29 @@ def delete_activity(activity_id: int) -> bool:
     cursor = conn.cursor()
     
     try:
+        cursor.execute("SELECT url, canonical_url FROM browsing_activity WHERE id = ?", (activity_id,))
+        row = cursor.fetchone()
+
         cursor.execute("DELETE FROM browsing_activity WHERE id = ?", (activity_id,))
+        deleted = cursor.rowcount
+
+        # 근사 중복 사본이 있으면 가장 오래된 사본이 원본과 지문을 이어받음
+        heir = _promote_near_duplicate(cursor, activity_id) if deleted > 0 else None
+        if heir is not None:
+            cursor.execute("UPDATE content_fingerprints SET activity_id = ? WHERE activity_id = ?", (heir, activity_id))
+        else:
+            cursor.execute("DELETE FROM content_fingerprints WHERE activity_id = ?", (activity_id,))
+
+        # 같은 글이 남아 있으면 URL 인덱스에서 지우지 않음
+        # (백필 때 정규화 URL이 겹쳐 canonical_url을 비워 둔 행이 있으면 가장 오래된 행이 이어받음)
+        still_known = False
+        if deleted > 0:
+            still_known = _reassign_canonical_url(cursor, row[1] or canonicalize_url(row[0]))
         conn.commit()
         
-        if cursor.rowcount > 0:
+        if deleted > 0:
+            if not still_known:
+                forget_url(row[0])
             logger.info(f"활동 삭제: ID {activity_id}")
             conn.close()
             return True
@@ -472,6 +863,69 @@ def delete_activity(activity_id: int) -> bool:
         conn.close()
         return False
     
+def get_near_duplicate_copies(activity_id: int) -> List[int]:
+    """활동을 원본으로 하는 근사 중복 사본 ID (오래된 순)"""
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT id FROM browsing_activity
+        WHERE json_extract(metadata, '$.near_duplicate_of') = ?
+        ORDER BY id
+    """, (activity_id,))
+    copies = [row[0] for row in cursor.fetchall()]
+    conn.close()
+    return copies
+
+def _promote_near_duplicate(cursor: sqlite3.Cursor, activity_id: int) -> Optional[int]:
+    """
+    삭제한 원본의 가장 오래된 사본을 원본으로 올리고, 나머지 사본은 그 사본을 가리키게 함
+
+    Returns:
+        원본이 된 사본 ID, 사본이 없으면 None
+    """
+    cursor.execute("""
+        SELECT id, metadata FROM browsing_activity
+        WHERE json_extract(metadata, '$.near_duplicate_of') = ?
+        ORDER BY id
+    """, (activity_id,))
+    rows = cursor.fetchall()
+    if not rows:
+        return None
+
+    heir = rows[0][0]
+    for copy_id, metadata_json in rows:
+        metadata = json.loads(metadata_json)
+        if copy_id == heir:
+            metadata.pop('near_duplicate_of', None)
+        else:
+            metadata['near_duplicate_of'] = heir
+        cursor.execute(
+            "UPDATE browsing_activity SET metadata = ? WHERE id = ?",
+            (json.dumps(metadata, ensure_ascii=False), copy_id)
+        )
+
+    logger.info(f"근사 중복 사본을 원본으로 변경: ID {heir} (삭제된 원본 ID {activity_id})")
+    return heir
+
+def _reassign_canonical_url(cursor: sqlite3.Cursor, canonical: str) -> bool:
+    """
+    canonical_url을 가진 행이 없으면, canonical_url이 비어 있고 정규화 결과가 같은 행 중 가장 오래된 행에 지정
+
+    Returns:
+        bool: 이 정규화 URL을 가진 행이 남아 있는지
+    """
+    cursor.execute("SELECT 1 FROM browsing_activity WHERE canonical_url = ? LIMIT 1", (canonical,))
+    if cursor.fetchone() is not None:
+        return True
+
+    cursor.execute("SELECT id, url FROM browsing_activity WHERE canonical_url IS NULL ORDER BY id")
+    heir = next((row_id for row_id, url in cursor.fetchall() if canonicalize_url(url) == canonical), None)
+    if heir is None:
+        return False
+
+    cursor.execute("UPDATE browsing_activity SET canonical_url = ? WHERE id = ?", (canonical, heir))
+    return True
+
 def get_categories(date: Optional[str] = None) -> List[str]:
     """카테고리 목록 조회
     
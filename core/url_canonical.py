@@ -0,0 +1,102 @@
+"""
+URL 정규화
+같은 글이 추적 파라미터, #fragment, 끝 슬래시, www./m. 호스트 차이로 여러 번 저장되지 않도록
+비교용 canonical URL을 만듭니다. (원본 URL은 그대로 저장/다운로드에 사용)
+
+규칙은 DEFAULT_RULES를 기본으로, URL_CANONICAL_RULES_PATH의 JSON 파일이 있으면 키 단위로 덮어씁니다.
+"""
+import json
+from fnmatch import fnmatch
+from functools import lru_cache
+from typing import Dict, Any
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from config.settings import URL_CANONICAL_RULES_PATH
+from utils import logger
+
+DEFAULT_RULES: Dict[str, Any] = {
+    # 제거할 쿼리 파라미터 (fnmatch 패턴, 대소문자 무시)
+    "strip_params": [
+        "utm_*", "fbclid", "gclid", "dclid", "gbraid", "wbraid", "msclkid", "yclid",
+        "igshid", "mc_cid", "mc_eid", "_hsenc", "_hsmkt", "mkt_tok", "ref_src",
+        "spm", "si", "trk", "trkCampaign", "share_source", "from_share"
+    ],
+    "sort_query": True,            # 쿼리 파라미터 정렬
+    "force_https": True,           # http → https
+    "strip_www": True,             # www.example.com → example.com
+    "mobile_prefixes": ["m.", "mobile."],  # m.blog.naver.com → blog.naver.com
+    "strip_fragment": True,        # #section 제거 (#/route, #!route 같은 SPA 라우트는 유지)
+    "strip_trailing_slash": True,  # /path/ → /path (루트 제외)
+}
+
+@lru_cache(maxsize=1)
+def get_rules() -> Dict[str, Any]:
+    """기본 규칙 + 사용자 규칙 파일"""
+    rules = dict(DEFAULT_RULES)
+
+    if URL_CANONICAL_RULES_PATH.exists():
+        try:
+            with open(URL_CANONICAL_RULES_PATH, 'r', encoding='utf-8') as f:
+                rules.update(json.load(f))
+            logger.info(f"URL 정규화 규칙 로드: {URL_CANONICAL_RULES_PATH}")
+        except (json.JSONDecodeError, OSError) as e:
+            logger.error(f"URL 정규화 규칙 로드 실패, 기본값 사용: {e}")
+
+    return rules
+
+def canonicalize_url(url: str) -> str:
+    """
+    비교용 canonical URL 생성
+
+    Args:
+        url: 원본 URL
+
+    Returns:
+        str: 정규화된 URL (http(s)가 아니면 원본 그대로)
+    """
+    url = url.strip()
+    parts = urlsplit(url)
+    if parts.scheme.lower() not in ("http", "https") or not parts.hostname:
+        return url
+
+    rules = get_rules()
+
+    # scheme
+    scheme = parts.scheme.lower()
+    if rules["force_https"]:
+        scheme = "https"
+
+    # host (소문자, 기본 포트 제거, www./m. 제거)
+    host = parts.hostname.lower().rstrip(".")
+    if rules["strip_www"] and host.startswith("www."):
+        host = host[4:]
+    for prefix in rules["mobile_prefixes"]:
+        if host.startswith(prefix) and host.count(".") >= 2:
+            host = host[len(prefix):]
+            break
+
+    port = parts.port
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+
+    # path
+    path = parts.path or "/"
+    if rules["strip_trailing_slash"] and len(path) > 1:
+        path = path.rstrip("/") or "/"
+
+    # query
+    strip_patterns = [p.lower() for p in rules["strip_params"]]
+    params = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not any(fnmatch(key.lower(), pattern) for pattern in strip_patterns)
+    ]
+    if rules["sort_query"]:
+        params.sort()
+    query = urlencode(params, doseq=True)
+
+    # fragment
+    fragment = parts.fragment
+    if rules["strip_fragment"] and not fragment.startswith(("/", "!")):
+        fragment = ""
+
+    return urlunsplit((scheme, host, path, query, fragment))
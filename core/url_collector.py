@@ -1,26 +1,97 @@
-from langchain_upstage import ChatUpstage
 from utils.logging import logger
-from config.settings import UPSTAGE_API_KEY
+from config.settings import (
+    NEAR_DUP_ACTION,
+    GATE_MODEL_ENABLED,
+    GATE_BATCH_SIZE,
+    GATE_BATCH_WAIT
+)
+from utils.batching import MicroBatcher
 from .extractor import extract_content  
 from .classifier import classify_content  
-from .storage import save_activity, check_existing_activity
-from .vector_store import add_activity_to_vector 
-import json
+from .storage import save_activity, get_activity_by_id
+from .near_duplicate import find_near_duplicate
+from .url_index import is_known_url
+from .decision_cache import lookup_decision, record_decision
+from .gate_model import predict_decision, learn_decision
+from .vector_store import add_activity_to_vector, ensure_activity_vector
+from .llm_client import get_llm
+from .llm_cache import cached_invoke
+from utils.text import parse_json_response
+from typing import Optional, List, Tuple, Any
 
-llm = ChatUpstage(
-    api_key=UPSTAGE_API_KEY,
-    model="solar-mini"   # 빠른 모델 사용
-)
+GATE_LLM_MODEL = "solar-mini"   # 빠른 모델 사용
 
 def should_save_url(url:str, title:str) -> dict:
     """agent가 저장 여부 판단"""
+    decision = quick_url_decision(url, title)
+    if decision is not None:
+        return decision
+
+    return judge_url_with_llm(url, title)
+
+def quick_url_decision(url: str, title: str) -> Optional[dict]:
+    """
+    네트워크 호출 없이 내릴 수 있는 저장 여부 판단
+
+    Returns:
+        {'should_save': bool, 'reason': str}, 판단할 수 없으면 None (LLM 필요)
+    """
     # 1차 빠른 필터 (조건문)
     exclude = ['bank', 'facebook', 'instagram', 'login', 'auth']
     if any(kw in url.lower() for kw in exclude):
         logger.info("url 걸러짐")
         return {"should_save": False, "reason": "개인정보/보안"}
 
-    # LLM 판단
+    # 2차: 도메인/경로 패턴별로 일관되게 판단된 적이 있으면 LLM 생략
+    cached = lookup_decision(url)
+    if cached is not None:
+        return cached
+
+    # 3차: 이력으로 학습한 로컬 모델이 확신할 때만 결정
+    if GATE_MODEL_ENABLED:
+        return predict_decision(url, title)
+    return None
+
+# 저장 기준 (단일/배치 프롬프트 공통)
+GATE_CRITERIA = """
+    - 저장 (true): 기술 블로그, 프로그래밍 튜토리얼, 공식 문서, 유용한 지식/경험 공유 글, 인터넷 강의 등
+    - 무시 (false): 쇼핑몰, 은행/금융 서비스, 로그인/인증 페이지, 개인 정보가 포함된 페이지, 광고 페이지, 검색 페이지 등"""
+
+def judge_url_with_llm(url: str, title: str) -> dict:
+    """
+    LLM(solar-mini)으로 저장 여부 판단 후 판단 캐시/로컬 모델에 기록
+    동시에 들어온 요청은 GATE_BATCH_WAIT초 동안 모아 한 프롬프트로 판단 (judge_urls_with_llm)
+    """
+    return _gate_batcher.submit((url, title)).result()
+
+def judge_urls_with_llm(items: List[Tuple[str, str]]) -> List[Any]:
+    """
+    여러 URL을 한 번의 LLM 호출로 판단
+
+    Args:
+        items: [(url, title), ...]
+
+    Returns:
+        items 순서대로 {'should_save', 'reason'} (개별 재시도도 실패한 항목은 Exception)
+    """
+    if len(items) == 1:
+        results = [_judge_single_url(*items[0])]
+    else:
+        results = _judge_url_batch(items)
+
+    for (url, title), result in zip(items, results):
+        if isinstance(result, dict):
+            record_decision(url, result['should_save'], result.get('reason', ''))
+            learn_decision(url, title, result['should_save'], result.get('reason', ''))
+
+    return results
+
+def _is_valid_decision(response_text: str) -> bool:
+    result = parse_json_response(response_text)
+    return isinstance(result, dict) and isinstance(result.get('should_save'), bool)
+
+def _judge_single_url(url: str, title: str) -> dict:
+    """URL 하나 판단"""
     prompt = f"""
     URL: {url}
     제목: {title}
@@ -30,9 +101,7 @@ def should_save_url(url:str, title:str) -> dict:
     </role>
 
     <instruction>
-    주어진 URL과 제목을 분석하여 다음 기준에 따라 저장 여부를 결정해줘. 은행, 로그인, 결제 등과 같이 개인정보 및 보안과 관련된 것은 저장하면 안돼.
-    - 저장 (true): 기술 블로그, 프로그래밍 튜토리얼, 공식 문서, 유용한 지식/경험 공유 글, 인터넷 강의 등
-    - 무시 (false): 쇼핑몰, 은행/금융 서비스, 로그인/인증 페이지, 개인 정보가 포함된 페이지, 광고 페이지, 검색 페이지 등
+    주어진 URL과 제목을 분석하여 다음 기준에 따라 저장 여부를 결정해줘. 은행, 로그인, 결제 등과 같이 개인정보 및 보안과 관련된 것은 저장하면 안돼.{GATE_CRITERIA}
     판단 후, 반드시 아래의 output formatT을 따르는 JSON 객체 하나만을 반환해야해. 추가적인 해설, 설명, 주석 등은 필요없어. 
     </instruction>
 
@@ -41,24 +110,122 @@ def should_save_url(url:str, title:str) -> dict:
     </output format>
     """
     
-    response = llm.invoke(prompt)
-    response_text = response.content.strip()
-    # json 파싱
-    if response_text.startswith("```"):
-        response_text = response_text.split("```")[1]
-        if response_text.startswith("json"):
-            response_text = response_text[4:]
-        response_text = response_text.strip()
-
-    result = json.loads(response_text)
-    return result
+    response_text = cached_invoke(get_llm(GATE_LLM_MODEL), prompt, "url_gate", validate=_is_valid_decision)
+    return parse_json_response(response_text)
+
+def _judge_url_batch(items: List[Tuple[str, str]]) -> List[Any]:
+    """URL 여러 개를 한 프롬프트로 판단, 응답에서 빠지거나 깨진 항목은 개별 재시도"""
+    url_list = "\n".join(
+        f"    {i}. URL: {url} | 제목: {title}"
+        for i, (url, title) in enumerate(items, 1)
+    )
+    prompt = f"""
+    <urls>
+{url_list}
+    </urls>
+
+    <role>
+    너는 사용자의 지식 저장소(Stacknote)에 보관할 가치가 있는 URL을 선별하는 전문 큐레이터 Agent야.
+    </role>
+
+    <instruction>
+    위 목록의 URL과 제목을 각각 분석하여 다음 기준에 따라 저장 여부를 결정해줘. 은행, 로그인, 결제 등과 같이 개인정보 및 보안과 관련된 것은 저장하면 안돼.{GATE_CRITERIA}
+    모든 항목을 판단한 후, 반드시 아래의 output format을 따르는 JSON 배열 하나만을 반환해야해. 배열에는 목록의 모든 번호가 한 번씩 들어가야 해. 추가적인 해설, 설명, 주석 등은 필요없어.
+    </instruction>
+
+    <output format>
+    [{{"index": 번호, "should_save": true/false, "reason": "결정을 내린 구체적인 이유를 한 문장으로 설명해."}}, ...]
+    </output format>
+    """
+
+    decisions = {}
+    try:
+        response_text = cached_invoke(
+            get_llm(GATE_LLM_MODEL), prompt, "url_gate",
+            validate=lambda text: isinstance(parse_json_response(text), list)
+        )
+        for entry in parse_json_response(response_text):
+            if isinstance(entry, dict) and isinstance(entry.get('should_save'), bool):
+                decisions[entry.get('index')] = {
+                    'should_save': entry['should_save'],
+                    'reason': entry.get('reason', '')
+                }
+
+    except Exception as e:
+        logger.warning(f"배치 판단 응답 파싱 실패, 개별 판단으로 전환: {e}")
+
+    results = []
+    for i, (url, title) in enumerate(items, 1):
+        if i in decisions:
+            results.append(decisions[i])
+            continue
+
+        # 폴백: 개별 요청
+        try:
+            results.append(_judge_single_url(url, title))
+        except Exception as e:
+            logger.error(f"저장 판단 실패: {url} ({e})")
+            results.append(e)
+
+    logger.info(f"배치 저장 판단: {len(items)}개 중 {len(decisions)}개 한 번에 처리")
+    return results
+
+_gate_batcher = MicroBatcher(
+    judge_urls_with_llm,
+    max_batch_size=GATE_BATCH_SIZE,
+    max_wait=GATE_BATCH_WAIT,
+    name="url-gate",
+    concurrency=2
+)
+
+def find_reusable_classification(extracted: dict) -> Optional[dict]:
+    """
+    근사 중복 글이 이미 저장돼 있으면 그 분류 결과를 재사용 (LLM 호출 생략)
+
+    Returns:
+        classify_content와 같은 형식 + 'near_duplicate_of': 원본 활동 ID, 없으면 None
+    """
+    original_id = find_near_duplicate(extracted.get('simhash'))
+    if original_id is None:
+        return None
+
+    original = get_activity_by_id(original_id)
+    if not original:
+        return None
+
+    logger.info(f"근사 중복: {extracted['url']} ≈ activity {original_id} ({original['title']})")
+    return {
+        'category': original['category'],
+        'tags': original['tags'],
+        'summary': original['summary'],
+        'near_duplicate_of': original_id
+    }
+
+def build_activity_data(url: str, extracted: dict, classified: dict) -> dict:
+    """추출/분류 결과를 save_activity 입력 형식으로 변환"""
+    activity_data = {
+        'url': url,
+        'title': extracted['title'],
+        'content': extracted['content'],
+        'summary': classified['summary'],
+        'category': classified['category'],
+        'tags': classified['tags'],
+        'source_type': extracted.get('source_type', 'article'),
+        'simhash': extracted.get('simhash')
+    }
+
+    if classified.get('near_duplicate_of'):
+        activity_data['metadata'] = {'near_duplicate_of': classified['near_duplicate_of']}
+
+    return activity_data
 
 def process_url_auto(url:str, vectorstore):
-    """자동 수집 URL 처리"""
+    """자동 수집 URL 처리 (단일 스레드 직렬 경로, 백그라운드 수집은 core/pipeline.py 사용)"""
     
-    # db 중복 체크
-    existing_id = check_existing_activity(url)
-    if existing_id is not None:
+    # db 중복 체크 (저장 후 임베딩에 실패했던 URL이면 벡터만 다시 저장)
+    if is_known_url(url):
+        if not ensure_activity_vector(vectorstore, url):
+            raise RuntimeError(f"벡터 db 저장 실패: {url}")
         logger.warning(f"[SKIP] DB에 이미 존재 : {url}. 추출 건너뜀")
         return None
 
@@ -66,40 +233,44 @@ def process_url_auto(url:str, vectorstore):
 
     # 본문 추출
     extracted = extract_content(url)
-    if not extracted or extracted['title'] == None:
+    if not extracted or extracted['title'] == None or not extracted['content']:
         logger.info(f"추출 내용 없음: {url}")
         return None
     
-    # 기존 classifier 사용!
-    classified = classify_content(
-        extracted['title'],
-        extracted['content']
-    )
+    # 근사 중복이면 기존 분류 재사용, 아니면 classifier 사용!
+    classified = find_reusable_classification(extracted)
+    if classified and NEAR_DUP_ACTION == 'skip':
+        logger.info(f"[SKIP] 근사 중복 글: {url}")
+        return None
+
+    if classified is None:
+        classified = classify_content(
+            extracted['title'],
+            extracted['content']
+        )
     
-    activity_data = {
-        'url': url,
-        'title': extracted['title'],
-        'content': extracted['content'],
-        'summary': classified['summary'],
-        'category': classified['category'],
-        'tags': classified['tags'],
-        'source_type': extracted.get('source_type', 'article')
-    }
+    activity_data = build_activity_data(url, extracted, classified)
 
     # DB 저장
     activity_id = save_activity(data=activity_data)
+    if activity_id is None:
+        return None
     
-    # vectorestore 저장
-    add_activity_to_vector(
-        vectorstore,
-        activity_id,
-        extracted['content'],
-        {
-            'title': extracted['title'],
-            'category': classified['category'],
-            'url': url
-        }
-    )
+    # vectorestore 저장 (근사 중복은 원본 벡터로 검색되므로 생략)
+    # 실패하면 예외로 작업을 nack → 재시도 때 ensure_activity_vector가 벡터만 다시 저장
+    if not classified.get('near_duplicate_of'):
+        saved = add_activity_to_vector(
+            vectorstore,
+            activity_id,
+            extracted['content'],
+            {
+                'title': extracted['title'],
+                'category': classified['category'],
+                'url': url
+            }
+        )
+        if not saved:
+            raise RuntimeError(f"벡터 db 저장 실패: activity_{activity_id}")
     
     return {
         'id': activity_id,
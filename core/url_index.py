@@ -0,0 +1,74 @@
+"""
+저장된 URL 인메모리 인덱스
+LLM 저장 판단(should_save_url) 전에 이미 저장한 URL을 네트워크 호출 없이 걸러냄
+
+- 시작 시 browsing_activity에서 전체 URL을 읽어 채움 (warm_url_index)
+- save_activity / delete_activity에서 갱신
+- 인덱스에 없으면 SQLite를 한 번 더 확인 (다른 프로세스에서 저장된 경우 대비)
+- URL은 정규화(canonicalize_url)한 형태로 비교
+"""
+import sqlite3
+import threading
+from config.settings import DB_PATH
+from utils import logger
+from .url_canonical import canonicalize_url
+
+_known_urls = set()
+_lock = threading.Lock()
+_warmed = False
+
+def warm_url_index() -> int:
+    """
+    browsing_activity의 URL로 인덱스 채우기
+
+    Returns:
+        int: 인덱스에 올라간 URL 수
+    """
+    global _warmed
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute("SELECT canonical_url FROM browsing_activity WHERE canonical_url IS NOT NULL")
+    urls = {row[0] for row in cursor.fetchall()}
+    conn.close()
+
+    with _lock:
+        _known_urls.update(urls)
+        _warmed = True
+        count = len(_known_urls)
+
+    logger.info(f"URL 인덱스 준비 완료: {count}개")
+    return count
+
+def is_known_url(url: str) -> bool:
+    """이미 저장된 URL인지 확인 (인메모리 → SQLite 순)"""
+    if not _warmed:
+        warm_url_index()
+
+    canonical = canonicalize_url(url)
+    if canonical in _known_urls:
+        return True
+
+    # 폴백: 인덱스 밖에서 저장된 행
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT 1 FROM browsing_activity WHERE canonical_url = ? OR url = ?",
+        (canonical, url)
+    )
+    exists = cursor.fetchone() is not None
+    conn.close()
+
+    if exists:
+        remember_url(url)
+    return exists
+
+def remember_url(url: str) -> None:
+    """저장된 URL 등록"""
+    with _lock:
+        _known_urls.add(canonicalize_url(url))
+
+def forget_url(url: str) -> None:
+    """삭제된 URL 제거"""
+    with _lock:
+        _known_urls.discard(canonicalize_url(url))
@@ -1,9 +1,46 @@
-"""벡터 스토어 관리"""
+"""
+벡터 스토어 관리
+
+긴 본문은 문단/제목 경계에서 EMBED_CHUNK_TOKENS 이하 청크로 나눠(utils.text.chunk_text) 청크마다 임베딩
+- ID: activity_{id}_{n}, 메타데이터: 부모 활동 메타데이터 + activity_id, chunk_index, chunk_count
+- 검색: 청크 단위로 찾은 뒤 활동별로 묶어 반환 (이전 형식의 activity_{id} 벡터도 같은 방식으로 처리)
+- 저장: 벡터스토어별 쓰기 큐(MicroBatcher)가 여러 스레드의 활동을 EMBED_WRITE_WAIT초 동안 모아
+  한 번의 add_texts로 임베딩(EMBED_BATCH_SIZE개씩 요청) + upsert, 호출자에게는 활동별 성공 여부 반환
+- 임베딩: CachedEmbeddings로 감싸 같은 텍스트는 임베딩 캐시(core/embedding_cache.py)에서 재사용
+  → 재수집/청크 설정 변경 후 reindex_vectorstore는 바뀐 청크만 API 호출
+"""
+import threading
+from concurrent.futures import Future
 from langchain_chroma import Chroma
 from langchain_upstage import UpstageEmbeddings
-from config.settings import CHROMA_PATH, UPSTAGE_API_KEY
+from config.settings import (
+    CHROMA_PATH,
+    UPSTAGE_API_KEY,
+    EMBED_CHUNK_TOKENS,
+    EMBED_CHUNK_OVERLAP,
+    SEARCH_CHUNK_CANDIDATES,
+    EMBED_BATCH_SIZE,
+    EMBED_WRITE_BATCH,
+    EMBED_WRITE_WAIT,
+    REINDEX_BATCH
+)
 from utils import logger
-from typing import List, Dict, Any, Optional
+from utils.batching import MicroBatcher
+from .embedding_cache import CachedEmbeddings
+from .storage import (
+    get_activities_for_indexing,
+    check_existing_activity,
+    get_activity_by_id,
+    get_near_duplicate_copies,
+    delete_activity
+)
+from utils.text import chunk_text
+from typing import List, Dict, Any, Optional, Tuple
+
+# 검색 결과 하나에 붙일 최대 청크 수
+MAX_CHUNKS_PER_RESULT = 3
+
+EMBEDDING_MODEL = "solar-embedding-1-large"
 
 def init_vectorstore(collection_name="activities"):
     """chromadb 초기화"""
@@ -12,10 +49,14 @@ def init_vectorstore(collection_name="activities"):
     # 폴더 생성
     CHROMA_PATH.parent.mkdir(parents=True, exist_ok=True)
 
-    # 임베딩
-    embeddings = UpstageEmbeddings(
-        api_key=UPSTAGE_API_KEY,
-        model="solar-embedding-1-large"
+    # 임베딩 (같은 텍스트는 캐시된 벡터 사용)
+    embeddings = CachedEmbeddings(
+        UpstageEmbeddings(
+            api_key=UPSTAGE_API_KEY,
+            model=EMBEDDING_MODEL,
+            embed_batch_size=EMBED_BATCH_SIZE
+        ),
+        model=EMBEDDING_MODEL
     )
 
     # 클라이언트 생성
@@ -28,29 +69,147 @@ def init_vectorstore(collection_name="activities"):
     logger.info(f"벡터스토어 초기화 완료 : {CHROMA_PATH}")
     return vectorstore
 
+def _chunk_activity(
+    activity_id: int,
+    content: str,
+    metadata: Dict[str, Any]
+) -> Tuple[List[str], List[Dict[str, Any]], List[str]]:
+    """
+    활동 하나를 청크로 나눠 add_texts 인자 생성
+
+    Returns:
+        (texts, metadatas, ids)
+    """
+    chunks = chunk_text(content, EMBED_CHUNK_TOKENS, EMBED_CHUNK_OVERLAP) or [metadata.get('title') or ""]
+
+    texts, metadatas, ids = [], [], []
+    for index, chunk in enumerate(chunks):
+        chunk_metadata = dict(metadata)
+        chunk_metadata['activity_id'] = activity_id
+        chunk_metadata['chunk_index'] = index
+        chunk_metadata['chunk_count'] = len(chunks)
+
+        texts.append(chunk)
+        metadatas.append(chunk_metadata)
+        ids.append(f"activity_{activity_id}_{index}")
+
+    return texts, metadatas, ids
+
+_writers: Dict[int, MicroBatcher] = {}
+_writers_lock = threading.Lock()
+
+def _get_writer(vectorstore: Chroma) -> MicroBatcher:
+    """벡터스토어별 쓰기 큐 (처음 사용할 때 생성)"""
+    with _writers_lock:
+        writer = _writers.get(id(vectorstore))
+        if writer is None:
+            writer = MicroBatcher(
+                lambda items: _write_activities(vectorstore, items),
+                max_batch_size=EMBED_WRITE_BATCH,
+                max_wait=EMBED_WRITE_WAIT,
+                name="vector-writer"
+            )
+            _writers[id(vectorstore)] = writer
+    return writer
+
+def _delete_stale_chunks(vectorstore: Chroma, chunk_counts: Dict[int, int]):
+    """
+    다시 저장한 활동의 남은 옛 벡터 삭제 (새 청크 수 이상 번호의 청크 + 이전 형식 activity_{id})
+    새 청크를 저장한 뒤에 지우므로 그 사이에도 검색 결과에서 빠지지 않음
+
+    Args:
+        chunk_counts: {activity_id: 새 청크 수}
+    """
+    try:
+        existing = vectorstore.get(
+            where={"activity_id": {"$in": list(chunk_counts)}},
+            include=["metadatas"]
+        )
+        stale = [
+            chunk_id
+            for chunk_id, metadata in zip(existing['ids'], existing['metadatas'])
+            if metadata.get('chunk_index', 0) >= chunk_counts.get(metadata.get('activity_id'), 0)
+        ]
+        stale.extend(f"activity_{activity_id}" for activity_id in chunk_counts)
+        vectorstore.delete(ids=stale)
+
+    except Exception as e:
+        logger.warning(f"옛 청크 삭제 실패 ({len(chunk_counts)}개 활동): {e}")
+
+def _write_activities(vectorstore: Chroma, items: List[Dict[str, Any]]) -> List[Any]:
+    """
+    쓰기 큐의 배치 처리: 모든 활동의 청크를 한 번의 add_texts로 저장 (upsert 후 남은 옛 청크 삭제)
+    배치 전체가 실패하면 활동별로 다시 시도해 실패한 활동만 예외로 돌려줌
+
+    Returns:
+        items 순서대로 청크 수 또는 Exception
+    """
+    chunked = [
+        _chunk_activity(item['activity_id'], item['content'], item['metadata'])
+        for item in items
+    ]
+
+    texts, metadatas, ids = [], [], []
+    for item_texts, item_metadatas, item_ids in chunked:
+        texts.extend(item_texts)
+        metadatas.extend(item_metadatas)
+        ids.extend(item_ids)
+
+    try:
+        vectorstore.add_texts(texts=texts, metadatas=metadatas, ids=ids)
+        _delete_stale_chunks(vectorstore, {
+            item['activity_id']: len(item_ids) for item, (_, _, item_ids) in zip(items, chunked)
+        })
+        logger.info(f"벡터 db 일괄 저장: {len(items)}개 (청크 {len(ids)}개)")
+        return [len(item_ids) for _, _, item_ids in chunked]
+
+    except Exception as e:
+        if len(items) == 1:
+            return [e]
+        logger.warning(f"벡터 db 일괄 저장 실패, 개별 저장으로 전환 ({len(items)}개): {e}")
+
+    # 폴백: 활동별 저장
+    results = []
+    for item, (item_texts, item_metadatas, item_ids) in zip(items, chunked):
+        try:
+            vectorstore.add_texts(texts=item_texts, metadatas=item_metadatas, ids=item_ids)
+            _delete_stale_chunks(vectorstore, {item['activity_id']: len(item_ids)})
+            results.append(len(item_ids))
+        except Exception as e:
+            logger.error(f"벡터 DB 저장 실패: activity_{item['activity_id']} ({e})")
+            results.append(e)
+    return results
+
+def submit_activity_to_vector(
+    vectorstore: Chroma,
+    activity_id: int,
+    content: str,
+    metadata: Dict[str, Any]
+) -> Future:
+    """
+    활동을 쓰기 큐에 넣고 바로 반환
+
+    Returns:
+        Future: 저장된 청크 수 (실패하면 예외)
+    """
+    return _get_writer(vectorstore).submit({
+        'activity_id': activity_id,
+        'content': content,
+        'metadata': metadata
+    })
+
 def add_activity_to_vector(
     vectorstore: Chroma,
     activity_id : int,
     content: str,
     metadata: Dict[str, Any]
-):
-    """활동을 벡터 db에 추가"""
+) -> bool:
+    """활동을 청크로 나눠 벡터 db에 추가 (다른 스레드의 저장과 묶여 처리될 때까지 대기)"""
 
     try:
-        # ID를 메타데이터에 포함
-        metadata['activity_id'] = activity_id
-
-        # content 토큰 제한 
-        safe_content = content[:3800]
+        chunk_count = submit_activity_to_vector(vectorstore, activity_id, content, metadata).result()
 
-        # 추가, 자동 임베딩 -> add_documents는 하나의 문서리스트를 변환, 우리는 url 하나하나를 추가
-        vectorstore.add_texts(
-            texts=[content],
-            metadatas=[metadata],
-            ids=[f"activity_{activity_id}"]
-        )
-
-        logger.info(f"벡터 db 저장: activity_{activity_id}")
+        logger.info(f"벡터 db 저장: activity_{activity_id} (청크 {chunk_count}개)")
         return True
     
     except Exception as e:
@@ -58,30 +217,192 @@ def add_activity_to_vector(
         return False
     
 
+def add_activities_to_vector(
+    vectorstore: Chroma,
+    items: List[Dict[str, Any]]
+) -> List[bool]:
+    """
+    여러 활동을 쓰기 큐에 넣고 모두 처리될 때까지 대기
+
+    Args:
+        items: [{'activity_id': int, 'content': str, 'metadata': dict}, ...]
+
+    Returns:
+        items 순서대로 저장 성공 여부
+    """
+    futures = [
+        submit_activity_to_vector(vectorstore, item['activity_id'], item['content'], item['metadata'])
+        for item in items
+    ]
+
+    results = []
+    for item, future in zip(items, futures):
+        try:
+            future.result()
+            results.append(True)
+        except Exception as e:
+            logger.error(f"벡터 DB 저장 실패: activity_{item['activity_id']} ({e})")
+            results.append(False)
+    return results
+
+def reindex_vectorstore(vectorstore: Chroma) -> Dict[str, int]:
+    """
+    SQLite의 활동 본문으로 벡터 db 재구축 (청크 설정 변경, 컬렉션 삭제 후 등)
+    REINDEX_BATCH개씩 읽어 쓰기 큐로 저장, 바뀌지 않은 청크는 임베딩 캐시에서 가져옴
+    끝나면 다시 저장하지 않은 벡터(삭제된 활동, 근사 중복 사본, ID 없는 이전 형식)를 삭제
+    (실패한 활동의 기존 벡터와 재구축 중에 새로 저장된 활동은 유지)
+
+    Returns:
+        {'indexed': 저장한 활동 수, 'failed': 실패 수, 'skipped': 근사 중복으로 제외한 수,
+         'removed': 삭제한 옛 벡터 수}
+    """
+    result = {'indexed': 0, 'failed': 0, 'skipped': 0, 'removed': 0}
+    after_id = 0
+    keep = set()
+
+    while True:
+        activities = get_activities_for_indexing(after_id, REINDEX_BATCH)
+        if not activities:
+            break
+        after_id = activities[-1]['id']
+
+        items = []
+        for activity in activities:
+            if activity['near_duplicate_of'] or not (activity['content'] or activity['title']):
+                result['skipped'] += 1
+                continue
+            items.append({
+                'activity_id': activity['id'],
+                'content': activity['content'] or "",
+                'metadata': {
+                    'title': activity['title'] or "",
+                    'category': activity['category'] or "",
+                    'url': activity['url']
+                }
+            })
+
+        for item, ok in zip(items, add_activities_to_vector(vectorstore, items)):
+            result['indexed' if ok else 'failed'] += 1
+            keep.add(item['activity_id'])
+
+        logger.info(f"벡터 db 재구축 진행: ID {after_id}까지 {result}")
+
+    result['removed'] = _remove_unindexed_vectors(vectorstore, keep, after_id)
+
+    logger.info(f"벡터 db 재구축 완료: {result}")
+    return result
+
+def _remove_unindexed_vectors(vectorstore: Chroma, keep: set, last_id: int) -> int:
+    """
+    재구축 대상이 아니었던 벡터 삭제
+
+    Args:
+        keep: 재구축에서 저장(또는 시도)한 activity_id
+        last_id: 재구축에서 읽은 마지막 ID (이후에 저장된 활동은 유지)
+
+    Returns:
+        int: 삭제한 벡터 수
+    """
+    stale, offset = [], 0
+    while True:
+        page = vectorstore.get(include=["metadatas"], limit=REINDEX_BATCH * 10, offset=offset)
+        if not page['ids']:
+            break
+        offset += len(page['ids'])
+
+        for vector_id, metadata in zip(page['ids'], page['metadatas']):
+            activity_id = (metadata or {}).get('activity_id')
+            if activity_id is None or (activity_id <= last_id and activity_id not in keep):
+                stale.append(vector_id)
+
+    for start in range(0, len(stale), REINDEX_BATCH * 10):
+        vectorstore.delete(ids=stale[start:start + REINDEX_BATCH * 10])
+    return len(stale)
+
+def has_activity_vector(vectorstore: Chroma, activity_id: int) -> bool:
+    """활동의 벡터(청크 또는 이전 형식 activity_{id})가 저장돼 있는지"""
+    if vectorstore.get(where={"activity_id": activity_id}, limit=1, include=[])['ids']:
+        return True
+    return bool(vectorstore.get(ids=[f"activity_{activity_id}"], include=[])['ids'])
+
+def ensure_activity_vector(vectorstore: Chroma, url: str) -> bool:
+    """
+    이미 저장된 URL의 벡터가 없으면 (이전 임베딩 실패) SQLite의 본문으로 다시 저장
+
+    Returns:
+        벡터가 있거나 필요 없으면(근사 중복 사본) True, 다시 저장에 실패하면 False
+    """
+    activity_id = check_existing_activity(url)
+    if activity_id is None or has_activity_vector(vectorstore, activity_id):
+        return True
+
+    logger.info(f"벡터 없는 활동 다시 임베딩: activity_{activity_id}")
+    return _embed_stored_activity(vectorstore, activity_id)
+
+def _embed_stored_activity(vectorstore: Chroma, activity_id: int) -> bool:
+    """SQLite에 저장된 활동 본문을 벡터 db에 저장 (근사 중복 사본이면 건너뜀)"""
+    activity = get_activity_by_id(activity_id)
+    if activity is None or activity['metadata'].get('near_duplicate_of'):
+        return True
+
+    return add_activity_to_vector(
+        vectorstore,
+        activity_id,
+        activity['content'] or "",
+        {
+            'title': activity['title'] or "",
+            'category': activity['category'] or "",
+            'url': activity['url']
+        }
+    )
+
 def search_similar(
     vectorstore: Chroma,
     query: str,
     k: int = 5,
     filter_metadata: Optional[Dict] = None  
 ) -> List[Dict[str, Any]]:
-    """유사 문서 검색"""
+    """
+    유사 문서 검색 (청크 단위로 찾아 활동별로 묶음)
+
+    Returns:
+        [{'content': 일치한 청크들(문서 순서), 'metadata': 부모 메타데이터 + 'matched_chunks'}, ...]
+        가장 가까운 청크 순으로 최대 k개 활동
+    """
     try:
-        # 유사도 검색
+        # 유사도 검색 (한 활동의 청크가 여러 개 걸릴 수 있으므로 넉넉히)
+        fetch_k = k * max(1, SEARCH_CHUNK_CANDIDATES)
         if filter_metadata:
             results = vectorstore.similarity_search(
                 query,
-                k=k,
+                k=fetch_k,
                 filter=filter_metadata
             )
         else:
-            results = vectorstore.similarity_search(query, k=k)
+            results = vectorstore.similarity_search(query, k=fetch_k)
 
         # 결과 파싱 - add text를 썼기 때문에 텍스틀 리스트로! (Document 객체 안씀)
-        documents = []
+        grouped: Dict[Any, Dict[str, Any]] = {}
         for doc in results:
+            # 이전 형식 벡터는 activity_id가 없으므로 url로 구분
+            key = doc.metadata.get('activity_id', doc.metadata.get('url'))
+            group = grouped.get(key)
+            if group is None:
+                if len(grouped) >= k:
+                    continue
+                group = grouped[key] = {'metadata': dict(doc.metadata), 'chunks': []}
+            if len(group['chunks']) < MAX_CHUNKS_PER_RESULT:
+                group['chunks'].append((doc.metadata.get('chunk_index', 0), doc.page_content))
+
+        documents = []
+        for group in grouped.values():
+            chunks = sorted(group['chunks'])
+            metadata = group['metadata']
+            metadata.pop('chunk_index', None)
+            metadata['matched_chunks'] = [index for index, _ in chunks]
             documents.append({
-                'content': doc.page_content,
-                'metadata': doc.metadata
+                'content': "\n...\n".join(text for _, text in chunks),
+                'metadata': metadata
             })
 
         logger.info(f"벡터 검색 완료: '{query}' - {len(documents)}개 결과")
@@ -91,11 +412,30 @@ def search_similar(
         logger.error(f"벡터 검색 에러: {e}")
         return []
     
+def delete_activity_with_vector(vectorstore: Chroma, activity_id: int) -> bool:
+    """
+    SQLite와 벡터 db에서 활동 삭제
+    근사 중복 사본이 있으면 원본이 된 사본(delete_activity에서 지정)을 임베딩해 검색되게 함
+
+    Returns:
+        SQLite에서 삭제했으면 True
+    """
+    copies = get_near_duplicate_copies(activity_id)
+    if not delete_activity(activity_id):
+        return False
+
+    delete_activity_from_vector(vectorstore, activity_id)
+    if copies and not _embed_stored_activity(vectorstore, copies[0]):
+        logger.warning(f"원본이 된 사본 임베딩 실패: activity_{copies[0]} (다음 방문 또는 reindex.py에서 다시 저장)")
+    return True
+
 def delete_activity_from_vector(vectorstore: Chroma, activity_id: int):
-    """벡터 db에서 삭제"""
+    """벡터 db에서 활동의 모든 청크 삭제 (이전 형식 activity_{id} 포함)"""
     try:
+        vectorstore.delete(where={"activity_id": activity_id})
         vectorstore.delete(ids=[f"activity_{activity_id}"])
         logger.info(f"벡터 db에서 삭제: activity_{activity_id}")
+        return True
     except Exception as e:
         logger.error(f"벡터 db 삭제 실패: {e}")
         return False
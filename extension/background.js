@@ -36,7 +36,13 @@ chrome.tabs.onUpdated.addListener((tabId, changeInfo, tab) => {
           timestamp: new Date().toISOString()
         })
       })
-        .then(response => response.json())
+        .then(response => {
+          // 큐가 가득 차면(429) 다음 방문 때 다시 전송하도록 기록 제거
+          if (response.status === 429) {
+            delete sentTabs[tabKey];
+          }
+          return response.json();
+        })
         .then(data => {
           if (data.saved) {
             // 저장되면 알림
@@ -0,0 +1,27 @@
+"""
+벡터 db 재구축 (SQLite의 활동 본문 → ChromaDB)
+청크 설정(EMBED_CHUNK_TOKENS/EMBED_CHUNK_OVERLAP)을 바꿨거나 벡터 db가 손상/삭제됐을 때 실행
+바뀌지 않은 청크는 임베딩 캐시에서 가져오므로 API는 새 청크만 호출
+
+앱(Streamlit)을 종료한 상태에서 실행:
+    uv run python reindex.py
+"""
+from core.storage import init_db
+from core.vector_store import init_vectorstore, reindex_vectorstore
+from core.embedding_cache import get_embedding_cache_stats
+
+def main():
+    init_db()
+    vectorstore = init_vectorstore()
+
+    result = reindex_vectorstore(vectorstore)
+    cache = get_embedding_cache_stats()
+
+    print(
+        f"재구축 완료: 저장 {result['indexed']}개, 실패 {result['failed']}개, "
+        f"제외 {result['skipped']}개, 옛 벡터 삭제 {result['removed']}개"
+    )
+    print(f"임베딩 캐시: 적중 {cache['hits']}개, 미스 {cache['misses']}개 (적중률 {cache['hit_rate']:.0%})")
+
+if __name__ == "__main__":
+    main()
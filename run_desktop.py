@@ -1,5 +1,6 @@
 import webview
 import signal
+import multiprocessing
 import time
 import threading
 from streamlit.web import cli as stcli
@@ -64,6 +65,9 @@ def start_streamlit():
     sys.exit(stcli.main())
 
 if __name__ == '__main__':
+    # PyInstaller 빌드에서 추출 프로세스 풀(spawn)의 워커가 앱을 다시 띄우지 않도록
+    multiprocessing.freeze_support()
+
     # Streamlit 서버를 시작하는 스레드를 분리
     threading.Thread(target=start_streamlit, daemon=True).start()
 
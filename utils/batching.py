@@ -0,0 +1,80 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Any
+from .logging import logger
+
+class MicroBatcher:
+    """
+    여러 스레드의 요청을 짧은 시간 모아 한 번에 처리
+
+    submit()은 Future를 반환하고, 첫 요청 후 max_wait초가 지나거나 max_batch_size개가 모이면
+    fn(items)를 호출합니다. fn은 items와 같은 순서/길이의 결과 리스트를 반환해야 하며,
+    결과가 Exception 인스턴스인 항목은 해당 Future에만 예외로 전달됩니다.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: int,
+        max_wait: float,
+        name: str = "batcher",
+        concurrency: int = 1
+    ):
+        """
+        Args:
+            fn: 배치 처리 함수
+            max_batch_size: 배치 최대 크기
+            max_wait: 첫 요청 후 배치를 모으는 최대 시간 (초)
+            name: 로그/스레드 이름
+            concurrency: 동시에 처리할 배치 수 (처리 중에도 다음 배치를 모음)
+        """
+        self._fn = fn
+        self._max_batch_size = max(1, max_batch_size)
+        self._max_wait = max_wait
+        self._name = name
+        self._queue = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=name)
+        self._thread = threading.Thread(target=self._run, name=f"{name}-collector", daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Any) -> Future:
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self._max_wait
+
+            while len(batch) < self._max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._executor.submit(self._process, batch)
+
+    def _process(self, batch):
+        items = [item for item, _ in batch]
+        try:
+            results = self._fn(items)
+            if len(results) != len(items):
+                raise ValueError(f"배치 결과 수 불일치: {len(results)} != {len(items)}")
+
+        except Exception as e:
+            logger.error(f"[{self._name}] 배치 처리 실패 ({len(items)}개): {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
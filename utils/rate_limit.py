@@ -0,0 +1,37 @@
+import threading
+import time
+
+class TokenBucket:
+    """
+    스레드 안전 토큰 버킷
+
+    분당 rate_per_min개의 토큰이 채워지며, 최대 capacity개까지 모아 둘 수 있습니다.
+    rate_per_min <= 0 이면 제한 없음.
+    """
+
+    def __init__(self, rate_per_min: float, capacity: float = None):
+        self._rate = rate_per_min / 60.0  # 초당 토큰
+        self._capacity = capacity if capacity is not None else max(1.0, rate_per_min / 6)  # 기본 10초치 버스트
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0):
+        """토큰을 얻을 때까지 대기"""
+        if self._rate <= 0:
+            return
+
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self._rate
+
+            time.sleep(wait)
@@ -0,0 +1,140 @@
+import re
+import json
+from typing import Any, List
+
+_SENTENCE_END = re.compile(r"(?<=[.!?。！？])\s+")
+_LIST_MARKERS = ("-", "*", "•", "|", ">")
+_SENTENCE_PUNCTUATION = (".", "!", "?", "。", "！", "？", ":", ";", ",", ")")
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 대략 추정 (한글/영문 혼합 기준 약 2자당 1토큰, 보수적으로)"""
+    return len(text or "") // 2 + 1
+
+def parse_json_response(response_text: str) -> Any:
+    """LLM 응답에서 JSON 파싱 (```json 코드 블록 허용)"""
+    response_text = response_text.strip()
+    if response_text.startswith("```"):
+        response_text = response_text.split("```")[1]
+        if response_text.startswith("json"):
+            response_text = response_text[4:]
+        response_text = response_text.strip()
+
+    return json.loads(response_text)
+
+def chunk_text(text: str, max_tokens: int, overlap_tokens: int = 0) -> List[str]:
+    """
+    본문을 문단/제목 경계에서 max_tokens 이하 청크로 나눔 (임베딩용)
+
+    - 문단(줄) 단위로 채우고, 예산을 넘는 문단은 문장 → 글자 단위로 나눔
+    - 청크가 절반 이상 찼을 때 제목을 만나면 거기서 새 청크 시작 (청크가 제목으로 끝나지 않도록)
+    - 섹션 중간에서 이어지는 청크는 앞 청크의 끝 overlap_tokens만큼과 섹션 제목을 앞에 붙임
+
+    Args:
+        text: 본문 (trafilatura 출력처럼 문단이 줄바꿈으로 구분된 텍스트)
+        max_tokens: 청크 하나의 최대 토큰 수 (estimate_tokens 기준)
+        overlap_tokens: 이어지는 청크에 겹쳐 넣을 토큰 수
+
+    Returns:
+        청크 리스트 (빈 본문이면 [])
+    """
+    text = (text or "").strip()
+    if not text:
+        return []
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+
+    pieces = []     # (문단, 제목 여부)
+    for block in (b.strip() for b in text.split("\n")):
+        if not block:
+            continue
+        if estimate_tokens(block) <= max_tokens:
+            pieces.append((block, _is_heading(block)))
+        else:
+            pieces.extend((part, False) for part in _split_long_block(block, max_tokens))
+
+    chunks: List[str] = []
+    current: List[tuple] = []
+    used = 0
+    section = None      # 진행 중인 섹션 제목
+
+    for piece, is_heading in pieces:
+        cost = estimate_tokens(piece)
+
+        if current and (used + cost > max_tokens or (is_heading and used >= max_tokens // 2)):
+            # 끝에 붙은 제목은 다음 청크로 넘김
+            moved = []
+            while len(current) > 1 and current[-1][1]:
+                moved.insert(0, current.pop())
+            chunks.append("\n".join(block for block, _ in current))
+
+            carry = []
+            if not is_heading and not moved:
+                carry = [(block, False) for block in _tail_blocks([b for b, _ in current], overlap_tokens)]
+                if section and all(block != section for block, _ in carry):
+                    carry.insert(0, (section, True))
+                # 예산을 넘으면 겹침 문단부터 앞에서부터 버리고, 그래도 넘으면 섹션 제목도 버림
+                while carry and sum(estimate_tokens(b) for b, _ in carry) + cost > max_tokens:
+                    overlap = [i for i, (_, heading) in enumerate(carry) if not heading]
+                    carry.pop(overlap[0] if overlap else 0)
+
+            current = carry + moved
+            used = sum(estimate_tokens(block) for block, _ in current)
+
+        if is_heading:
+            section = piece
+        current.append((piece, is_heading))
+        used += cost
+
+    if current:
+        chunks.append("\n".join(block for block, _ in current))
+
+    return chunks
+
+def _is_heading(block: str) -> bool:
+    """마크다운 제목(#) 또는 문장 부호로 끝나지 않는 짧은 한 줄"""
+    if block.startswith("#"):
+        return True
+    return len(block) <= 80 and not block.startswith(_LIST_MARKERS) and not block.endswith(_SENTENCE_PUNCTUATION)
+
+def _split_long_block(block: str, max_tokens: int) -> List[str]:
+    """예산을 넘는 문단을 문장 단위로 묶어 나눔 (문장 하나가 넘으면 글자 수로 자름)"""
+    max_chars = max(1, (max_tokens - 1) * 2)
+    parts, current = [], ""
+
+    for sentence in _SENTENCE_END.split(block):
+        while len(sentence) > max_chars:
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+
+        candidate = f"{current} {sentence}" if current else sentence
+        if estimate_tokens(candidate) > max_tokens:
+            parts.append(current)
+            current = sentence
+        else:
+            current = candidate
+
+    if current:
+        parts.append(current)
+    return parts
+
+def _tail_blocks(blocks: List[str], overlap_tokens: int) -> List[str]:
+    """끝에서부터 overlap_tokens 안에 들어가는 문단들 (마지막 문단이 더 길면 그 끝부분만)"""
+    if overlap_tokens <= 0 or not blocks:
+        return []
+
+    tail, used = [], 0
+    for block in reversed(blocks):
+        cost = estimate_tokens(block)
+        if used + cost > overlap_tokens:
+            break
+        tail.insert(0, block)
+        used += cost
+
+    if not tail:
+        cut = blocks[-1][-overlap_tokens * 2:]
+        space = cut.find(" ")
+        tail = [cut[space + 1:] if 0 <= space < len(cut) // 2 else cut]
+    return tail